@@ -0,0 +1,54 @@
+"""
+Times off-target index construction and per-guide query latency on a
+synthetic genome.
+
+    python -m benchmarks.bench_offtarget --megabases 5 --guides 200
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src.analysis.offtarget_index import build_offtarget_index
+
+
+def write_synthetic_genome(path, megabases, n_chroms=4, seed=0):
+    rng = random.Random(seed)
+    per_chrom = int(megabases * 1_000_000 / n_chroms)
+    with open(path, "w") as fh:
+        for c in range(n_chroms):
+            fh.write(f">chr{c + 1}\n")
+            for _ in range(0, per_chrom, 60):
+                fh.write("".join(rng.choices("ACGT", k=60)) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--megabases", type=float, default=5)
+    parser.add_argument("--guides", type=int, default=200)
+    parser.add_argument("--mismatches", type=int, default=3)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fasta = os.path.join(tmp, "genome.fa")
+        write_synthetic_genome(fasta, args.megabases)
+
+        t0 = time.perf_counter()
+        index = build_offtarget_index(fasta, os.path.join(tmp, "index"), k=args.k)
+        build_s = time.perf_counter() - t0
+
+        rng = random.Random(1)
+        guides = ["".join(rng.choices("ACGT", k=20)) for _ in range(args.guides)]
+        t0 = time.perf_counter()
+        index.score_guides(guides, max_mismatches=args.mismatches)
+        query_s = time.perf_counter() - t0
+
+    print(f"genome: {args.megabases:g} Mb, k={args.k}")
+    print(f"index build: {build_s:.2f} s")
+    print(f"query: {query_s / args.guides * 1000:.2f} ms/guide (<= {args.mismatches} mismatches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Recorded API responses and a localhost stub that replays them.
+
+    python -m benchmarks.replay --record          # refresh fixtures (needs network)
+
+Recordings live in benchmarks/fixtures/<source>/. When none are present the
+stub falls back to synthetic entries with the same shape, so the fetcher
+benchmarks always run offline.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# A spread of small/large, ordered/disordered TFs
+RECORD_ACCESSIONS = ["P01106", "P05412", "P10275", "P04637", "Q92908", "P15407", "P03372", "P61244"]
+RECORD_GENES = ["MYC", "JUN", "AR", "TP53"]
+
+
+def synthetic_uniprot_entry(accession, length=450, seed=0):
+    """An entry with the fields and rough size of a real UniProtKB TF record."""
+    rng = random.Random(f"{accession}:{seed}")
+    features = []
+    for i in range(12):
+        start = rng.randint(1, length - 40)
+        features.append({"type": rng.choice(["Domain", "Region", "Motif", "Compositional bias", "Modified residue"]),
+                         "description": f"Feature {i}", "evidences": [{"evidenceCode": "ECO:0000255"}],
+                         "location": {"start": {"value": start, "modifier": "EXACT"},
+                                      "end": {"value": start + rng.randint(5, 40), "modifier": "EXACT"}}})
+    xrefs = [{"database": rng.choice(["InterPro", "Pfam", "PDB", "GO"]), "id": f"IPR{i:06d}",
+              "properties": [{"key": "EntryName", "value": f"Entry {i}"},
+                             {"key": "MatchRegion", "value": f"{i * 10 + 1}..{i * 10 + 30}"}]} for i in range(25)]
+    return {
+        "primaryAccession": accession,
+        "proteinDescription": {"recommendedName": {"fullName": {"value": f"Protein {accession}"}}},
+        "genes": [{"geneName": {"value": f"G{accession}"}}],
+        "organism": {"taxonId": 9606},
+        "sequence": {"value": "".join(rng.choices("ACDEFGHIKLMNPQRSTVWY", k=length)), "length": length},
+        "features": features,
+        "uniProtKBCrossReferences": xrefs,
+    }
+
+
+def _load_dir(source):
+    path = os.path.join(FIXTURE_DIR, source)
+    if not os.path.isdir(path):
+        return {}
+    recorded = {}
+    for name in sorted(os.listdir(path)):
+        if name.endswith(".json"):
+            with open(os.path.join(path, name)) as fh:
+                recorded[name[:-5]] = json.load(fh)
+    return recorded
+
+
+def load_uniprot_entries():
+    """Recorded UniProt entries, or synthetic stand-ins if nothing was recorded."""
+    return list(_load_dir("uniprot").values()) or [synthetic_uniprot_entry(a) for a in RECORD_ACCESSIONS]
+
+
+def load_payloads(source):
+    """Recorded STRING / JASPAR payloads keyed by query (empty if none were recorded)."""
+    return _load_dir(source)
+
+
+class ReplayServer:
+    """
+    Serves the single-entry and multi-accession UniProt endpoints on localhost.
+    Any accession is answered with one of the recorded entries (relabelled),
+    so arbitrarily large batches replay real payload sizes.
+    """
+
+    def __init__(self, entries=None):
+        self.entries = entries or load_uniprot_entries()
+        self.requests = 0
+        self._server = None
+
+    def _entry(self, accession):
+        template = self.entries[sum(map(ord, accession)) % len(self.entries)]
+        return dict(template, primaryAccession=accession)
+
+    def __enter__(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                stub.requests += 1
+                if parsed.path == "/uniprotkb/accessions":
+                    query = parse_qs(parsed.query)
+                    accs = query["accessions"][0].split(",")
+                    # Like UniProt, return one page (25 entries unless `size` asks for more)
+                    body = {"results": [stub._entry(a) for a in accs[:int(query.get("size", ["25"])[0])]]}
+                elif parsed.path.startswith("/uniprotkb/") and parsed.path.endswith(".json"):
+                    body = stub._entry(parsed.path.rsplit("/", 1)[-1][:-5])
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                raw = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def record(accessions=RECORD_ACCESSIONS, genes=RECORD_GENES):
+    """Fetches live responses and writes them to the fixture directory."""
+    from src.api.http_client import fetch_json
+    from src.api.uniprot_fetcher import UNIPROT_REST
+
+    def save(source, name, payload):
+        os.makedirs(os.path.join(FIXTURE_DIR, source), exist_ok=True)
+        with open(os.path.join(FIXTURE_DIR, source, f"{name}.json"), "w") as fh:
+            json.dump(payload, fh)
+
+    for acc in accessions:
+        save("uniprot", acc, fetch_json(f"{UNIPROT_REST}/uniprotkb/{acc}.json", timeout=30))
+    for gene in genes:
+        save("string", gene, fetch_json("https://string-db.org/api/json/network",
+                                        params={"identifiers": gene, "species": "9606", "limit": 5}, timeout=30))
+        save("jaspar", gene, fetch_json("https://jaspar.elixir.no/api/v1/matrix/",
+                                        params={"name": gene, "tax_id": "9606", "is_latest": True}, timeout=30))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record or inspect benchmark API fixtures.")
+    parser.add_argument("--record", action="store_true", help="Fetch live responses into benchmarks/fixtures")
+    args = parser.parse_args(argv)
+    if args.record:
+        record()
+    counts = {source: len(_load_dir(source)) for source in ("uniprot", "string", "jaspar")}
+    print("recorded fixtures: " + ", ".join(f"{s}={n}" for s, n in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
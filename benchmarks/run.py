@@ -0,0 +1,127 @@
+"""
+Runs the offline benchmark suite and compares it against stored baselines.
+
+    python -m benchmarks.run                          # print timings (inputs up to 1 Mb)
+    python -m benchmarks.run --max-size 100000000     # full sweep up to 100 Mb
+    python -m benchmarks.run --save-baseline          # record benchmarks/baseline.json
+    python -m benchmarks.run --compare --threshold 0.25   # exit 1 on >25% regressions
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from benchmarks.suite import BENCHMARKS, cleanup
+from src.api import bulk_store
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Differences below this many seconds are timer noise, whatever the ratio
+NOISE_FLOOR_S = 0.002
+
+# Best-of-N runs; fewer than this is too noisy to compare against a baseline
+DEFAULT_REPEAT = 5
+
+
+def time_callable(fn, repeat=DEFAULT_REPEAT, budget_s=2.0):
+    """Best-of-`repeat` wall time, stopping early once `budget_s` is spent (at least one run)."""
+    best, spent = float("inf"), 0.0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        best, spent = min(best, elapsed), spent + elapsed
+        if spent >= budget_s:
+            break
+    return best
+
+
+def run_suite(max_size=1_000_000, only=None, repeat=DEFAULT_REPEAT, budget_s=2.0, log=print):
+    """Times every benchmark at every size up to `max_size`. Returns {"name[size]": seconds}."""
+    results = {}
+    for name, (setup, sizes) in BENCHMARKS.items():
+        if only and not any(pattern in name for pattern in only):
+            continue
+        for size in sizes:
+            if size > max_size:
+                continue
+            fn = setup(size)
+            try:
+                fn()  # warm-up: imports, lazy tables, JIT-free but cache-sensitive paths
+                results[f"{name}[{size}]"] = seconds = time_callable(fn, repeat=repeat, budget_s=budget_s)
+            finally:
+                cleanup(fn)
+            log(f"{name:<24} {size:>12,}  {seconds * 1000:>11.3f} ms")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Regressions as (key, baseline s, current s) where current exceeds baseline by more than `threshold`."""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if current > base * (1 + threshold) and current - base > NOISE_FLOOR_S:
+            regressions.append((key, base, current))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline Gene Weaving benchmarks.")
+    parser.add_argument("--max-size", type=int, default=1_000_000, help="Largest input size to run")
+    parser.add_argument("-k", "--only", action="append", help="Run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write (merge) results into the baseline")
+    parser.add_argument("--compare", action="store_true", help="Fail on regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown, as a fraction")
+    parser.add_argument("--json", help="Also write raw results to this path")
+    args = parser.parse_args(argv)
+    if args.compare and args.repeat < DEFAULT_REPEAT:
+        parser.error(f"--compare needs --repeat {DEFAULT_REPEAT} or more; fewer runs report noise as regressions")
+
+    # Measure the network/cache code paths, not whatever bulk data this machine has ingested
+    with tempfile.TemporaryDirectory() as empty:
+        bulk_store.configure_bulk_store(empty)
+        try:
+            results = run_suite(max_size=args.max_size, only=args.only, repeat=args.repeat)
+        finally:
+            bulk_store.configure_bulk_store()
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=1, sort_keys=True)
+
+    status = 0
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+            return 2
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for key, base, current in regressions:
+            print(f"REGRESSION {key}: {base * 1000:.3f} ms -> {current * 1000:.3f} ms ({current / base:.2f}x)")
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} across {len(results)} timings")
+        status = 1 if regressions else 0
+
+    if args.save_baseline:
+        merged = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as fh:
+                merged = json.load(fh)["results"]
+        merged.update(results)
+        with open(args.baseline, "w") as fh:
+            json.dump({"machine": platform.platform(), "python": platform.python_version(),
+                       "results": dict(sorted(merged.items()))}, fh, indent=1)
+            fh.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""
+Benchmark definitions. Each one is a setup function taking an input size and
+returning the zero-argument callable to time; inputs are synthetic and seeded
+so runs are comparable. DNA sizes are in bp and span 100 bp to 100 Mb for the
+streaming scanners; the per-residue algorithms stop where a single call would
+take minutes.
+"""
+import ast
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+BENCHMARKS = {}
+
+DNA_SIZES = (100, 10_000, 1_000_000, 100_000_000)
+
+
+def benchmark(*sizes):
+    def register(setup):
+        BENCHMARKS[setup.__name__] = (setup, sizes)
+        return setup
+    return register
+
+
+def random_dna(n, seed=0):
+    codes = np.random.default_rng(seed).integers(0, 4, n, dtype=np.uint8)
+    return np.frombuffer(b"ACGT", dtype=np.uint8)[codes].tobytes().decode("ascii")
+
+
+def random_protein(n, seed=0):
+    codes = np.random.default_rng(seed).integers(0, 20, n, dtype=np.uint8)
+    return np.frombuffer(b"ACDEFGHIKLMNPQRSTVWY", dtype=np.uint8)[codes].tobytes().decode("ascii")
+
+
+def disorder_like_scores(n, seed=0):
+    """Scores oscillating around 0.5 with a jittered period, giving runs of ~100-300 residues per side."""
+    phase = np.cumsum(np.random.default_rng(seed).normal(0.02, 0.01, n))
+    return (0.5 + 0.4 * np.sin(phase)).astype(np.float32)
+
+
+# --- Sequence design ---
+
+@benchmark(*DNA_SIZES)
+def design_grnas(size):
+    from src.analysis.crispr_designer import design_grnas
+
+    dna = random_dna(size)
+    return lambda: design_grnas(dna, limit=None) if size <= 1_000_000 else _count_guides(dna)
+
+
+def _count_guides(dna):
+    from src.analysis.crispr_designer import scan_guides
+
+    return sum(1 for _ in scan_guides(dna))
+
+
+@benchmark(*DNA_SIZES)
+def scan_guides_packed(size):
+    """Guide scan over a 2-bit `PackedSeq` (a quarter of the memory of the string)."""
+    from src.analysis.encoded_seq import PackedSeq
+
+    dna = PackedSeq(random_dna(size))
+    return lambda: _count_guides(dna)
+
+
+@benchmark(*DNA_SIZES)
+def gc_windows(size):
+    """GC count of every 20-nt window via the `EncodedSeq` prefix sums."""
+    from src.analysis.encoded_seq import EncodedSeq
+
+    dna = random_dna(size)
+    return lambda: EncodedSeq(dna).window_counts("GC", 20)
+
+
+@benchmark(*DNA_SIZES)
+def scan_restriction_sites(size):
+    from src.analysis import primer_designer
+
+    dna = random_dna(size)
+
+    return lambda: primer_designer.scan_restriction_sites(dna)
+
+
+@benchmark(100, 1_000, 10_000, 100_000)
+def get_optimized_dna(size):
+    from src.analysis.codon_optimizer import codon_options
+    from src.analysis.primer_designer import get_optimized_dna
+
+    protein = random_protein(size // 3)
+    codon_options.cache_clear()
+    return lambda: get_optimized_dna(protein)
+
+
+@benchmark(1, 100, 10_000)
+def generate_primers(size):
+    """`size` constructs of 1.5 kb each, designed in one batch."""
+    from src.analysis.primer_designer import generate_primers_many
+
+    dnas = [random_dna(1500, seed=i) for i in range(size)]
+    return lambda: generate_primers_many(dnas, "GAATTC", "GGATCC")
+
+
+@benchmark(100, 10_000)
+def calculate_tm(size):
+    """`size` primers of 18-35 nt, one call each."""
+    from src.analysis.primer_designer import calculate_tm
+
+    primers = [random_dna(18 + i % 18, seed=i) for i in range(size)]
+    return lambda: [calculate_tm(p) for p in primers]
+
+
+@benchmark(100, 3_000)
+def check_primer_set(size):
+    """3' dimer check of a `size`-primer pool (18-35 nt), built one primer at a time."""
+    from src.analysis.primer_pool import check_primer_set
+
+    primers = {f"p{i}": random_dna(18 + i % 18, seed=i) for i in range(size)}
+    return lambda: check_primer_set(primers)
+
+
+# --- Disorder ---
+
+@benchmark(100, 10_000, 1_000_000, 100_000_000)
+def find_idrs(size):
+    """IDR segmentation of `size` precomputed per-residue scores."""
+    from src.analysis.disorder_analyzer import find_idrs
+
+    scores = disorder_like_scores(size)
+    return lambda: find_idrs(scores)
+
+
+@benchmark(1_000, 100_000, 10_000_000)
+def idr_grid(size):
+    """11 thresholds x 9 minimum lengths over `size` scores, with hysteresis, smoothing and gap merging."""
+    from src.analysis.disorder_analyzer import idr_grid
+
+    scores = disorder_like_scores(size)
+    thresholds = [round(0.3 + 0.05 * i, 2) for i in range(11)]
+    return lambda: idr_grid(scores, thresholds, (5, 10, 15, 20, 30, 40, 50, 75, 100), hysteresis=0.1, smooth=5,
+                            max_gap=3)
+
+
+@benchmark(20, 100)
+def saturation_scan(size):
+    """All 19 substitutions at `size` residues of a 500-residue protein, through metapredict."""
+    from src.analysis.mutagenesis import saturation_scan
+
+    protein = random_protein(500)
+    return lambda: saturation_scan(protein, 201, 200 + size)
+
+
+# --- API parsing and fetching (offline) ---
+
+@benchmark(10, 1_000)
+def parse_uniprot_entry(size):
+    """Parsing of `size` recorded UniProt entries."""
+    from benchmarks.replay import load_uniprot_entries
+    from src.api.uniprot_fetcher import parse_uniprot_entry
+
+    recorded = load_uniprot_entries()
+    entries = [recorded[i % len(recorded)] for i in range(size)]
+    return lambda: [parse_uniprot_entry(e) for e in entries]
+
+
+@benchmark(10, 1_000)
+def uniprot_fetch_replay(size):
+    """Cold-cache batch fetch of `size` accessions from the replay stub, cache writes included."""
+    from benchmarks.replay import ReplayServer
+    from src.api import cache
+    from src.api.http_client import RateLimiter
+    from src.api.uniprot_fetcher import get_uniprot_data_many
+
+    ids = [f"P{i:05d}" for i in range(size)]
+    scratch = tempfile.mkdtemp(prefix="gw-bench-")
+    server = ReplayServer().__enter__()
+
+    def run():
+        cache.configure_cache(cache_dir=tempfile.mkdtemp(dir=scratch))
+        try:
+            return get_uniprot_data_many(ids, base_url=server.base_url, limiter=RateLimiter(10_000))
+        finally:
+            cache.configure_cache()
+
+    def teardown():
+        server.__exit__(None, None, None)
+        shutil.rmtree(scratch, ignore_errors=True)
+    run.teardown = teardown
+    return run
+
+
+@benchmark(10, 1_000)
+def string_jaspar_cached(size):
+    """`size` interaction + motif lookups answered from recorded payloads in the response cache."""
+    from benchmarks.replay import RECORD_GENES, load_payloads
+    from src.api import cache
+    from src.api.jaspar_fetcher import search_jaspar_motifs
+    from src.api.string_fetcher import get_interactions
+
+    scratch = tempfile.mkdtemp(prefix="gw-bench-")
+    store = cache.ResponseCache(cache_dir=scratch)
+    string_payloads, jaspar_payloads = load_payloads("string"), load_payloads("jaspar")
+    for gene in RECORD_GENES:
+        partners = string_payloads.get(gene) or [{"preferredName_A": gene, "preferredName_B": f"{gene}{i}"}
+                                                 for i in range(10)]
+        motifs = jaspar_payloads.get(gene) or {"results": [{"matrix_id": f"MA{i:04d}.1", "name": gene}
+                                                           for i in range(3)]}
+        store.put("string", "https://string-db.org/api/json/network", partners,
+                  params={"identifiers": gene, "species": "9606", "limit": 5})
+        store.put("jaspar", "https://jaspar.elixir.no/api/v1/matrix/", motifs,
+                  params={"name": gene, "tax_id": "9606", "is_latest": True})
+    genes = [RECORD_GENES[i % len(RECORD_GENES)] for i in range(size)]
+
+    def run():
+        previous, cache._default_cache = cache._default_cache, store
+        try:
+            return [(get_interactions(g), search_jaspar_motifs(g)) for g in genes]
+        finally:
+            cache._default_cache = previous
+    run.teardown = lambda: shutil.rmtree(scratch, ignore_errors=True)
+    return run
+
+
+# --- Startup ---
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Loaded on first use only; a cold import must not pull any of these in
+HEAVY_MODULES = ("metapredict", "torch", "matplotlib", "logomaker", "Bio")
+
+
+def module_imports(path):
+    """Top-level modules imported at module scope by the script at `path`."""
+    with open(path) as fh:
+        tree = ast.parse(fh.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names.append(node.module)
+    return names
+
+
+def _cold_import(modules):
+    """Imports `modules` in a fresh interpreter; fails if a heavy dependency came along."""
+    code = (f"import sys; sys.path.insert(0, {SRC_DIR!r})\n"
+            + "".join(f"import {m}\n" for m in modules)
+            + f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+            + "assert not heavy, heavy")
+
+    def run():
+        subprocess.run([sys.executable, "-c", code], check=True)
+    return run
+
+
+@benchmark(1)
+def cold_import_app(size):
+    """Module-level imports of the Streamlit app (installed ones), before the first widget renders."""
+    modules = [m for m in module_imports(os.path.join(SRC_DIR, "gui", "app.py"))
+               if m.split(".")[0] in ("api", "analysis", "gui") or importlib.util.find_spec(m.split(".")[0])]
+    return _cold_import(modules)
+
+
+@benchmark(1)
+def cold_import_core_logic(size):
+    return _cold_import(["core_logic"])
+
+
+def cleanup(fn):
+    teardown = getattr(fn, "teardown", None)
+    if teardown:
+        teardown()
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Headless counterpart to main.py: batch construct-library design without the GUI
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from library_designer import main
+
+if __name__ == "__main__":
+    main()
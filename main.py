@@ -1,10 +1,16 @@
 import os
-import subprocess
+import sys
+import time
 
 def launch():
     # Points to the app.py location
-    path = os.path.join("src", "gui", "app.py")
-    subprocess.run(["streamlit", "run", path])
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "gui", "app.py")
+    os.environ.setdefault("GENE_WEAVING_LAUNCH_TIME", repr(time.time()))
+    # Run Streamlit in this interpreter instead of paying for a second one
+    from streamlit.web import cli as stcli
+
+    sys.argv = ["streamlit", "run", path]
+    sys.exit(stcli.main())
 
 if __name__ == "__main__":
-    launch()
\ No newline at end of file
+    launch()
@@ -0,0 +1,101 @@
+import numpy as np
+
+
+class AnnotationTrack:
+    """
+    Static interval index over one protein's annotations (1-based, inclusive).
+
+    Intervals are kept sorted by start alongside a running maximum of their
+    ends. For a query [qs, qe], every overlapping interval lies between the
+    first index whose running max end reaches qs and the last index whose start
+    is <= qe, so a batch of queries is answered with two `searchsorted` calls
+    and one vectorized gather/filter instead of a loop per query.
+    """
+
+    def __init__(self, intervals, length=None):
+        items = [dict(iv) for iv in intervals]
+        order = sorted(range(len(items)), key=lambda i: (items[i]['start'], items[i]['end']))
+        self.intervals = [items[i] for i in order]
+        self.starts = np.array([iv['start'] for iv in self.intervals], dtype=np.int64)
+        self.ends = np.array([iv['end'] for iv in self.intervals], dtype=np.int64)
+        self._max_end = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+        self.length = length if length is not None else int(self.ends.max(initial=0))
+
+    @classmethod
+    def from_protein(cls, data, idrs=()):
+        """Track of the UniProt domains (`get_uniprot_data`) and IDRs (`analyze_disorder`) of a protein."""
+        intervals = list(data.get('domains', []))
+        intervals += [{'label': 'IDR', 'start': r['start'], 'end': r['end'], 'type': 'IDR'} for r in idrs]
+        return cls(intervals, length=len(data.get('sequence', '')) or None)
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def overlap_pairs(self, starts, ends=None):
+        """
+        All (query index, interval index) pairs where query range i overlaps an
+        interval; `ends` defaults to `starts` for point queries. Sorted by query.
+        """
+        qs = np.asarray(starts, dtype=np.int64).ravel()
+        qe = qs if ends is None else np.asarray(ends, dtype=np.int64).ravel()
+        lo = np.searchsorted(self._max_end, qs, side="left")
+        hi = np.searchsorted(self.starts, qe, side="right")
+        counts = np.maximum(hi - lo, 0)
+        total = int(counts.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        query = np.repeat(np.arange(len(qs)), counts)
+        cand = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(total)
+        keep = self.ends[cand] >= qs[query]
+        return query[keep], cand[keep]
+
+    def _group(self, n, query, cand):
+        hits = [[] for _ in range(n)]
+        for q, c in zip(query.tolist(), cand.tolist()):
+            hits[q].append(self.intervals[c])
+        return hits
+
+    def query_points(self, positions):
+        """For each residue position, every interval containing it (not just the last)."""
+        positions = np.asarray(positions, dtype=np.int64).ravel()
+        return self._group(len(positions), *self.overlap_pairs(positions))
+
+    def query_ranges(self, starts, ends):
+        """For each [start, end] range, every interval overlapping it."""
+        starts = np.asarray(starts, dtype=np.int64).ravel()
+        return self._group(len(starts), *self.overlap_pairs(starts, ends))
+
+    def select(self, types):
+        """Sub-track of the intervals whose 'type' is in `types`."""
+        return AnnotationTrack([iv for iv in self.intervals if iv.get('type') in types], length=self.length)
+
+    def overlap_join(self, other):
+        """
+        Every overlapping (interval of self, interval of other) pair with the
+        shared span, e.g. domains that reach into IDRs.
+        """
+        a, b = other.overlap_pairs(self.starts, self.ends)
+        return [{'a': self.intervals[i], 'b': other.intervals[j],
+                 'start': int(max(self.starts[i], other.starts[j])), 'end': int(min(self.ends[i], other.ends[j]))}
+                for i, j in zip(a.tolist(), b.tolist())]
+
+    def merged(self):
+        """Union of all intervals as (starts, ends) arrays of disjoint, sorted blocks."""
+        if not len(self):
+            return self.starts, self.ends
+        # A new block starts wherever an interval begins after everything before it has ended
+        new_block = np.ones(len(self), dtype=bool)
+        new_block[1:] = self.starts[1:] > self._max_end[:-1] + 1
+        block_ids = np.cumsum(new_block) - 1
+        block_ends = np.zeros(block_ids[-1] + 1, dtype=np.int64)
+        np.maximum.at(block_ends, block_ids, self.ends)
+        return self.starts[new_block], block_ends
+
+    def complement(self, min_length=1):
+        """Uncovered stretches of 1..length (linkers), as interval dicts."""
+        starts, ends = self.merged()
+        gap_starts = np.concatenate([[1], ends + 1])
+        gap_ends = np.concatenate([starts - 1, [self.length]])
+        keep = gap_ends - gap_starts + 1 >= min_length
+        return [{'label': 'Linker', 'start': int(s), 'end': int(e), 'type': 'Linker'}
+                for s, e in zip(gap_starts[keep].tolist(), gap_ends[keep].tolist())]
@@ -0,0 +1,179 @@
+import heapq
+import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from .restriction_sites import CLONING_ENZYMES, ENZYMES, RestrictionAutomaton, site_anchor
+from .tracing import traced
+
+_BASES = "TCAG"
+_AMINO_ACIDS = "FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"
+GENETIC_CODE = {a + b + c: _AMINO_ACIDS[16 * i + 4 * j + k]
+                for i, a in enumerate(_BASES) for j, b in enumerate(_BASES) for k, c in enumerate(_BASES)}
+
+# Codon usage, frequency per thousand codons (Kazusa codon usage database)
+CODON_USAGE = {
+    "Human": {
+        'TTT': 17.6, 'TTC': 20.3, 'TTA': 7.7, 'TTG': 12.9, 'CTT': 13.2, 'CTC': 19.6, 'CTA': 7.2, 'CTG': 39.6,
+        'ATT': 16.0, 'ATC': 20.8, 'ATA': 7.5, 'ATG': 22.0, 'GTT': 11.0, 'GTC': 14.5, 'GTA': 7.1, 'GTG': 28.1,
+        'TCT': 15.2, 'TCC': 17.7, 'TCA': 12.2, 'TCG': 4.4, 'CCT': 17.5, 'CCC': 19.8, 'CCA': 16.9, 'CCG': 6.9,
+        'ACT': 13.1, 'ACC': 18.9, 'ACA': 15.1, 'ACG': 6.1, 'GCT': 18.4, 'GCC': 27.7, 'GCA': 15.8, 'GCG': 7.4,
+        'TAT': 12.2, 'TAC': 15.3, 'TAA': 1.0, 'TAG': 0.8, 'CAT': 10.9, 'CAC': 15.1, 'CAA': 12.3, 'CAG': 34.2,
+        'AAT': 17.0, 'AAC': 19.1, 'AAA': 24.4, 'AAG': 31.9, 'GAT': 21.8, 'GAC': 25.1, 'GAA': 29.0, 'GAG': 39.6,
+        'TGT': 10.6, 'TGC': 12.6, 'TGA': 1.6, 'TGG': 13.2, 'CGT': 4.5, 'CGC': 10.4, 'CGA': 6.2, 'CGG': 11.4,
+        'AGT': 12.1, 'AGC': 19.5, 'AGA': 12.2, 'AGG': 12.0, 'GGT': 10.8, 'GGC': 22.2, 'GGA': 16.5, 'GGG': 16.5,
+    },
+    "Yeast": {
+        'TTT': 26.1, 'TTC': 18.4, 'TTA': 26.2, 'TTG': 27.2, 'CTT': 12.3, 'CTC': 5.4, 'CTA': 13.4, 'CTG': 10.5,
+        'ATT': 30.1, 'ATC': 17.2, 'ATA': 17.8, 'ATG': 20.9, 'GTT': 22.1, 'GTC': 11.8, 'GTA': 11.8, 'GTG': 10.8,
+        'TCT': 23.5, 'TCC': 14.2, 'TCA': 18.7, 'TCG': 8.6, 'CCT': 13.5, 'CCC': 6.8, 'CCA': 18.3, 'CCG': 5.3,
+        'ACT': 20.3, 'ACC': 12.7, 'ACA': 17.8, 'ACG': 8.0, 'GCT': 21.2, 'GCC': 12.6, 'GCA': 16.2, 'GCG': 6.2,
+        'TAT': 18.8, 'TAC': 14.8, 'TAA': 1.1, 'TAG': 0.5, 'CAT': 13.6, 'CAC': 7.8, 'CAA': 27.3, 'CAG': 12.1,
+        'AAT': 35.7, 'AAC': 24.8, 'AAA': 41.9, 'AAG': 30.8, 'GAT': 37.6, 'GAC': 20.2, 'GAA': 45.6, 'GAG': 19.2,
+        'TGT': 8.1, 'TGC': 4.8, 'TGA': 0.7, 'TGG': 10.4, 'CGT': 6.4, 'CGC': 2.6, 'CGA': 3.0, 'CGG': 1.7,
+        'AGT': 14.2, 'AGC': 9.8, 'AGA': 21.3, 'AGG': 9.2, 'GGT': 23.9, 'GGC': 9.8, 'GGA': 10.9, 'GGG': 6.0,
+    },
+}
+
+SITE_PENALTY = 1000.0
+GC_PENALTY = 5.0  # per base outside the GC bounds
+
+
+@lru_cache(maxsize=None)
+def codon_options(organism="Human"):
+    """
+    Synonymous codons per amino acid as (codon, log relative adaptiveness, GC count),
+    best codon first. Built once per organism.
+    """
+    usage = CODON_USAGE.get(organism, CODON_USAGE["Human"])
+    options = {}
+    for codon, aa in GENETIC_CODE.items():
+        options.setdefault(aa, []).append(codon)
+    table = {}
+    for aa, codons in options.items():
+        best = max(usage[c] for c in codons)
+        table[aa] = tuple(sorted(((c, math.log(usage[c] / best), c.count('G') + c.count('C')) for c in codons),
+                                 key=lambda o: -o[1]))
+    return table
+
+
+@lru_cache(maxsize=64)
+def _site_automaton(sites):
+    """Aho-Corasick automaton over the given sites (enzyme names or IUPAC strings), both strands."""
+    patterns = {}
+    for site in sites:
+        site = ENZYMES[site][0] if site in ENZYMES else site.upper()
+        if site_anchor(site)[1] != site:
+            raise ValueError(f"Site {site} is too degenerate to avoid during codon optimization.")
+        patterns[site] = (site, 0, 0)
+    return RestrictionAutomaton(patterns)
+
+
+def _moves(automaton, options, state):
+    """
+    Each codon option from automaton `state` as (codon, next state, weight minus
+    site penalties for sites ending in its three bases, GC count, G/C mask).
+    """
+    moves = []
+    for codon, weight, gc, mask in options:
+        hits, next_state = 0, state
+        for ch in codon:
+            sym = "ACGT".find(ch)
+            next_state = automaton.delta[next_state][sym] if sym >= 0 else 0
+            hits += len(automaton.outputs[next_state])
+        moves.append((codon, next_state, weight - SITE_PENALTY * hits, gc, mask))
+    return tuple(moves)
+
+
+@lru_cache(maxsize=None)
+def _beam_options(organism):
+    """`codon_options` plus a 3-bit mask of the G/C positions of each codon."""
+    return {aa: tuple((codon, weight, gc, sum(4 >> k for k, b in enumerate(codon) if b in "GC"))
+                      for codon, weight, gc in options)
+            for aa, options in codon_options(organism).items()}
+
+
+_UNKNOWN_RESIDUE = (("NNN", 0.0, 0, 0),)
+_POPCOUNT = (0, 1, 1, 2, 1, 2, 2, 3)
+
+
+@traced()
+def optimize_codons(protein_seq, organism="Human", forbidden_sites=None, gc_bounds=(0.25, 0.75),
+                    gc_window=48, beam_width=16):
+    """
+    Back-translates a protein with a single left-to-right beam search.
+
+    Each step extends the best partial sequences by every synonymous codon,
+    scoring codon adaptation (sum of log relative adaptiveness) and penalising
+    forbidden sites (either strand, including those spanning codon junctions)
+    and each base of sliding-window GC outside `gc_bounds`. A partial sequence
+    carries its state in an Aho-Corasick automaton over the forbidden sites
+    and a bitmask of the G/C bases in its last `gc_window` bases; the codon
+    moves out of each (state, residue) pair are computed once. Partial sequences with the same
+    automaton state and window GC are merged, so the pass is linear in protein
+    length.
+    `forbidden_sites` takes enzyme names or IUPAC sites; None means the
+    cloning enzymes offered in the GUI.
+    """
+    if forbidden_sites is None:
+        forbidden_sites = tuple(CLONING_ENZYMES)
+    automaton = _site_automaton(tuple(forbidden_sites))
+    moves = {}
+    table = _beam_options(organism)
+    window_mask = (1 << gc_window) - 1
+
+    # beam item: (score, automaton state, G/C bits of the last gc_window bases, their GC count, path)
+    beam = [(0.0, 0, 0, 0, None)]
+    for i, aa in enumerate(protein_seq):
+        options = table.get(aa, _UNKNOWN_RESIDUE)
+        filled = min((i + 1) * 3, gc_window)
+        gc_lo, gc_hi = filled * gc_bounds[0], filled * gc_bounds[1]
+        check_gc = filled * 2 >= gc_window
+        best = {}
+        for score, state, bits, gc, path in beam:
+            state_moves = moves.get((state, aa))
+            if state_moves is None:
+                state_moves = moves[state, aa] = _moves(automaton, options, state)
+            for codon, new_state, gain, codon_gc, codon_bits in state_moves:
+                new_score = score + gain
+                shifted = (bits << 3) | codon_bits
+                new_gc = gc + codon_gc - _POPCOUNT[shifted >> gc_window]  # bases leaving the window
+                if check_gc:
+                    if new_gc < gc_lo:
+                        new_score -= GC_PENALTY * (gc_lo - new_gc)
+                    elif new_gc > gc_hi:
+                        new_score -= GC_PENALTY * (new_gc - gc_hi)
+                key = (new_state, new_gc)
+                kept = best.get(key)
+                if kept is None or kept[0] < new_score:
+                    best[key] = (new_score, new_state, shifted & window_mask, new_gc, (codon, path))
+        beam = heapq.nlargest(beam_width, best.values(), key=lambda item: item[0])
+
+    codons, path = [], beam[0][4]
+    while path is not None:
+        codons.append(path[0])
+        path = path[1]
+    return "".join(reversed(codons))
+
+
+def codon_adaptation_index(dna, organism="Human"):
+    """Geometric mean relative adaptiveness of the codons in `dna` (0-1)."""
+    table = codon_options(organism)
+    weights = {codon: w for options in table.values() for codon, w, _ in options}
+    logs = [weights[dna[i:i + 3]] for i in range(0, len(dna) - 2, 3) if dna[i:i + 3] in weights]
+    return math.exp(sum(logs) / len(logs)) if logs else 0.0
+
+
+def _optimize_one(args):
+    protein_seq, kwargs = args
+    return optimize_codons(protein_seq, **kwargs)
+
+
+@traced()
+def optimize_codons_many(protein_seqs, workers=None, **kwargs):
+    """Optimizes a library of proteins in a process pool; results keep input order."""
+    jobs = [(seq, kwargs) for seq in protein_seqs]
+    if workers == 0 or len(jobs) < 2:
+        return [_optimize_one(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_optimize_one, jobs, chunksize=max(1, len(jobs) // 64)))
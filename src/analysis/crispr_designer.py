@@ -1,21 +1,178 @@
-def design_grnas(dna_seq):
+from itertools import groupby, islice
+
+import numpy as np
+
+from .encoded_seq import EncodedSeq, PackedSeq
+from .fasta_reader import iter_fasta_chunks
+from .tracing import traced
+
+# Bitmask per nucleotide; IUPAC codes are the OR of the bases they stand for
+IUPAC = {
+    'A': 1, 'C': 2, 'G': 4, 'T': 8,
+    'R': 5, 'Y': 10, 'S': 6, 'W': 9, 'K': 12, 'M': 3,
+    'B': 14, 'D': 13, 'H': 11, 'V': 7, 'N': 15,
+}
+IUPAC_COMPLEMENT = str.maketrans("ACGTRYSWKMBDHVN", "TGCAYRSWMKVHDBN")
+DNA_COMPLEMENT = str.maketrans("ACGTNacgtn", "TGCANtgcan")
+
+# Genome bases encode to a single bit; anything else (N, gaps) encodes to 0 and never matches
+_BASE_CODE = np.zeros(256, dtype=np.uint8)
+for _base, _bit in (('A', 1), ('C', 2), ('G', 4), ('T', 8)):
+    _BASE_CODE[ord(_base)] = _BASE_CODE[ord(_base.lower())] = _bit
+
+# side: where the PAM sits relative to the protospacer on the guide strand.
+# cut: cut offset in bp, from the PAM start (3') or from the spacer start (5').
+NUCLEASES = {
+    "SpCas9": {"pam": "NGG", "side": "3prime", "spacer": 20, "cut": -3},
+    "SpCas9-NAG": {"pam": "NAG", "side": "3prime", "spacer": 20, "cut": -3},
+    "SaCas9": {"pam": "NNGRRT", "side": "3prime", "spacer": 21, "cut": -3},
+    "Cas12a": {"pam": "TTTV", "side": "5prime", "spacer": 23, "cut": 18},
+}
+
+
+def encode_dna(seq):
+    """Encodes DNA as one bitmask byte per base (A=1, C=2, G=4, T=8, other=0)."""
+    if isinstance(seq, EncodedSeq):
+        return _BASE_CODE[seq.codes]
+    return _BASE_CODE[np.frombuffer(seq.encode("ascii"), dtype=np.uint8)]
+
+
+def _site_layout(nuclease):
+    spec = NUCLEASES[nuclease] if isinstance(nuclease, str) else nuclease
+    pam, spacer = spec["pam"].upper(), spec["spacer"]
+    if spec["side"] == "3prime":
+        site, spacer_off, cut = "N" * spacer + pam, 0, spacer + spec["cut"]
+    else:
+        site, spacer_off, cut = pam + "N" * spacer, len(pam), len(pam) + spec["cut"]
+    return spec, site, spacer_off, cut
+
+
+def _match(enc, pattern):
+    """Boolean array: True where `pattern` (IUPAC) matches starting at each position."""
+    n = len(enc) - len(pattern) + 1
+    if n <= 0:
+        return np.zeros(0, dtype=bool)
+    hit = np.ones(n, dtype=bool)
+    for j, code in enumerate(pattern):
+        mask = IUPAC[code]
+        if mask != 15:
+            hit &= (enc[j:j + n] & mask) != 0
+    return hit
+
+
+def _window_sum(flags, width):
+    cum = np.concatenate(([0], np.cumsum(flags, dtype=np.int64)))
+    return cum[width:] - cum[:-width]
+
+
+def _scan_buffer(buf, offset, spec, site, spacer_off, cut, strands):
+    """Finds every complete site in `buf`; coordinates are shifted by `offset`."""
+    enc = encode_dna(buf)
+    width, spacer = len(site), spec["spacer"]
+    n = len(enc) - width + 1
+    if n <= 0:
+        return
+
+    valid = enc != 0
+    gc_flags = (enc & 6) != 0
+    bad = _window_sum(~valid, spacer)
+    gc = _window_sum(gc_flags, spacer)
+    run_t = _window_sum(enc == 8, 4) == 4 if len(enc) >= 4 else np.zeros(0, dtype=bool)
+    run_a = _window_sum(enc == 1, 4) == 4 if len(enc) >= 4 else np.zeros(0, dtype=bool)
+    poly_t_runs = _window_sum(run_t, spacer - 3) if len(run_t) >= spacer - 3 else np.zeros(0, dtype=int)
+    poly_a_runs = _window_sum(run_a, spacer - 3) if len(run_a) >= spacer - 3 else np.zeros(0, dtype=int)
+
+    hits = []
+    if strands in ("both", "+"):
+        starts = np.flatnonzero(_match(enc, site))
+        sp = starts + spacer_off
+        keep = bad[sp] == 0
+        hits.append((starts[keep], sp[keep], starts[keep] + cut, "+", poly_t_runs))
+    if strands in ("both", "-"):
+        starts = np.flatnonzero(_match(enc, site.translate(IUPAC_COMPLEMENT)[::-1]))
+        sp = starts + width - spacer_off - spacer
+        keep = bad[sp] == 0
+        hits.append((starts[keep], sp[keep], starts[keep] + width - cut, "-", poly_a_runs))
+
+    rows = []
+    for site_starts, sp_starts, cuts, strand, runs in hits:
+        for s, p, c in zip(site_starts.tolist(), sp_starts.tolist(), cuts.tolist()):
+            rows.append((s, strand, p, c, runs))
+    rows.sort(key=lambda r: (r[0], r[1]))
+
+    buf = buf if isinstance(buf, str) else str(buf)
+    for s, strand, p, c, runs in rows:
+        if strand == "+":
+            guide = buf[p:p + spacer].upper()
+            pam_seq = buf[s + width - len(spec["pam"]):s + width] if spec["side"] == "3prime" else buf[s:s + len(spec["pam"])]
+        else:
+            guide = buf[p:p + spacer].upper().translate(DNA_COMPLEMENT)[::-1]
+            fwd_site = buf[s:s + width].upper().translate(DNA_COMPLEMENT)[::-1]
+            pam_seq = fwd_site[-len(spec["pam"]):] if spec["side"] == "3prime" else fwd_site[:len(spec["pam"])]
+        yield {
+            "sequence": guide,
+            "pam_seq": pam_seq.upper(),
+            "strand": strand,
+            "start": offset + p,
+            "end": offset + p + spacer,
+            "cut_site": offset + c,
+            "gc": int(gc[p]) / spacer * 100,
+            "poly_t": bool(runs[p]) if p < len(runs) else False,
+        }
+
+
+def _scan_stream(chunks, nuclease, strands):
+    spec, site, spacer_off, cut = _site_layout(nuclease)
+    tail, offset = "", 0
+    for chunk in chunks:
+        buf = tail + chunk
+        yield from _scan_buffer(buf, offset, spec, site, spacer_off, cut, strands)
+        # Keep enough overlap for sites that straddle the chunk boundary
+        keep = min(len(buf), len(site) - 1)
+        offset += len(buf) - keep
+        tail = buf[len(buf) - keep:]
+
+
+def scan_guides(dna_seq, nuclease="SpCas9", strands="both", chunk_size=1_000_000):
+    """
+    Yields every gRNA candidate in `dna_seq` for the given nuclease.
+
+    Each candidate has the guide sequence (5'->3' on its own strand), the PAM
+    bases, strand, 0-based forward coordinates of the protospacer, cut site,
+    GC% and a poly-T flag (TTTT terminates Pol III transcription).
+    `dna_seq` may be a str, `EncodedSeq` or `PackedSeq`; the latter two are
+    scanned through overlapping views instead of concatenated string chunks.
+    """
+    if isinstance(dna_seq, (EncodedSeq, PackedSeq)):
+        spec, site, spacer_off, cut = _site_layout(nuclease)
+        overlap = len(site) - 1
+        for end in range(chunk_size, len(dna_seq) + chunk_size, chunk_size):
+            start = max(0, end - chunk_size - overlap)
+            yield from _scan_buffer(dna_seq[start:end], start, spec, site, spacer_off, cut, strands)
+        return
+    chunks = (dna_seq[i:i + chunk_size] for i in range(0, len(dna_seq), chunk_size))
+    yield from _scan_stream(chunks, nuclease, strands)
+
+
+def scan_fasta_guides(path, nuclease="SpCas9", strands="both", chunk_size=1_000_000):
+    """Streams a (possibly chromosome-sized) FASTA and yields candidates tagged with their record ID."""
+    for record_id, pieces in groupby(iter_fasta_chunks(path, chunk_size), key=lambda rc: rc[0]):
+        for guide in _scan_stream((chunk for _, chunk in pieces), nuclease, strands):
+            guide["chrom"] = record_id
+            yield guide
+
+
+@traced()
+def design_grnas(dna_seq, nuclease="SpCas9", strands="both", limit=5):
     """
-    Finds NGG PAM sites and returns gRNA candidates with coordinates.
+    Finds PAM sites and returns gRNA candidates with coordinates.
+    `limit=None` returns every candidate.
     """
+    spec, _, _, _ = _site_layout(nuclease)
     results = []
-    # Scan DNA for PAM (NGG)
-    for i in range(len(dna_seq) - 23):
-        # Check if the 21st and 22nd bases are 'GG'
-        if dna_seq[i + 21:i + 23] == "GG":
-            guide = dna_seq[i:i + 20]
-            gc = (guide.count('G') + guide.count('C')) / 20 * 100
-
-            results.append({
-                "label": f"gRNA_{i + 1}",
-                "sequence": guide,
-                "pam": "NGG",
-                "gc": gc,
-                "start_index": i  
-            })
-
-    return results[:5]
+    for g in islice(scan_guides(dna_seq, nuclease=nuclease, strands=strands), limit):
+        g["label"] = f"gRNA_{g['start'] + 1}" if g["strand"] == "+" else f"gRNA_rc_{g['start'] + 1}"
+        g["pam"] = spec["pam"]
+        g["start_index"] = g["start"]
+        results.append(g)
+    return results
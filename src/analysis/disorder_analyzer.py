@@ -1,52 +1,118 @@
-import metapredict as mp
+import numpy as np
 
+from .disorder_model import is_remote, predict_disorder
+from .encoded_seq import as_text
+from .score_store import get_score_store
+from .tracing import count, span, traced
 
+
+@traced()
 def get_disorder_scores(sequence: str):
-    """Returns the per-residue disorder scores using metapredict."""
+    """
+    Returns the per-residue disorder scores using metapredict.
+    Scores already in the persistent score store are returned without predicting.
+    With a remote analysis service the service stores what it predicts, so
+    this process only reads the store.
+    `sequence` may be a str or an `EncodedSeq`.
+    """
     if not sequence:
         return []
-    return mp.predict_disorder(sequence)
+    store = get_score_store()
+    scores = store.get(sequence)
+    if scores is None:
+        count("score_store_misses")
+        with span("metapredict.predict", residues=len(sequence)):
+            scores = predict_disorder(as_text(sequence))
+        if not is_remote():
+            store.put(sequence, scores)
+    else:
+        count("score_store_hits")
+    return scores
 
 
-def analyze_disorder(sequence: str):
+@traced()
+def analyze_disorder(sequence: str, **params):
     """
     Finds IDRs by checking metapredict scores against a threshold.
     Returns 1-based coordinates for UniProt compatibility.
+    `params` go to `find_idrs`; callers that also need the scores should call
+    `get_disorder_scores` once and pass them to `find_idrs` themselves.
     """
     if not sequence:
         return []
 
-    scores = mp.predict_disorder(sequence)
-    threshold = 0.5
-    min_length = 30
-
-    idrs = []
-    current_idr_start = None
-
-    for i, score in enumerate(scores):
-        if score >= threshold:
-            if current_idr_start is None:
-                current_idr_start = i + 1  
-        else:
-            if current_idr_start is not None:
-                current_idr_end = i
-                if (current_idr_end - current_idr_start + 1) >= min_length:
-                    idrs.append({
-                        "start": current_idr_start,
-                        "end": current_idr_end,
-                        "type": "IDR"
-                    })
-                current_idr_start = None
-
-    # Handle C-terminal IDR
-    if current_idr_start is not None:
-        current_idr_end = len(scores)
-        if (current_idr_end - current_idr_start + 1) >= min_length:
-            idrs.append({
-                "start": current_idr_start,
-                "end": current_idr_end,
-                "type": "IDR"
-            })
-
-
-    return idrs
+    return find_idrs(get_disorder_scores(sequence), **params)
+
+
+def smooth_scores(scores, window):
+    """Centered moving average over `window` residues; the window shrinks at the termini."""
+    scores = np.asarray(scores, dtype=np.float32)
+    if window <= 1 or len(scores) == 0:
+        return scores
+    half = window // 2
+    cum = np.concatenate(([0.0], np.cumsum(scores, dtype=np.float64)))
+    idx = np.arange(len(scores))
+    lo, hi = np.maximum(idx - half, 0), np.minimum(idx + half + 1, len(scores))
+    return ((cum[hi] - cum[lo]) / (hi - lo)).astype(np.float32)
+
+
+def _runs(mask):
+    """[start, end) index arrays of the True runs of a boolean array."""
+    if len(mask) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    bounds = np.concatenate(([0], np.flatnonzero(mask[1:] != mask[:-1]) + 1, [len(mask)]))
+    first = 0 if mask[0] else 1  # runs alternate True/False starting with mask[0]
+    return bounds[first:-1:2], bounds[first + 1::2]
+
+
+def _segments(scores, threshold, hysteresis, max_gap):
+    """Disordered runs before the length filter, as [start, end) arrays."""
+    starts, ends = _runs(scores >= threshold - hysteresis)
+    if hysteresis > 0 and len(starts):
+        # A run counts only if it reaches `threshold` somewhere; each high run lies inside one low run
+        high_starts, _ = _runs(scores >= threshold)
+        entered = np.searchsorted(high_starts, starts) < np.searchsorted(high_starts, ends)
+        starts, ends = starts[entered], ends[entered]
+    if max_gap > 0 and len(starts) > 1:
+        split = (starts[1:] - ends[:-1]) > max_gap
+        starts, ends = starts[np.concatenate(([True], split))], ends[np.concatenate((split, [True]))]
+    return starts, ends
+
+
+def _as_idrs(starts, ends):
+    return [{"start": s + 1, "end": e, "type": "IDR"} for s, e in zip(starts.tolist(), ends.tolist())]
+
+
+@traced()
+def find_idrs(scores, threshold=0.5, min_length=30, hysteresis=0.0, smooth=1, max_gap=0):
+    """
+    Calls IDRs from precomputed per-residue scores (1-based, inclusive).
+
+    A region opens at a residue scoring >= `threshold` and, with `hysteresis`,
+    extends while scores stay >= `threshold - hysteresis`. `smooth` averages
+    the scores over that many residues first. IDRs separated by at most
+    `max_gap` ordered residues are merged before the `min_length` filter.
+    """
+    scores = smooth_scores(scores, smooth)
+    starts, ends = _segments(scores, threshold, hysteresis, max_gap)
+    keep = (ends - starts) >= min_length
+    return _as_idrs(starts[keep], ends[keep])
+
+
+@traced()
+def idr_grid(scores, thresholds, min_lengths, hysteresis=0.0, smooth=1, max_gap=0):
+    """
+    `find_idrs` for every (threshold, min_length) combination from one set of
+    scores: smoothing runs once, segmentation once per threshold, and each
+    min_length is only a filter on the segment lengths. Returns a dict keyed
+    by (threshold, min_length).
+    """
+    scores = smooth_scores(scores, smooth)
+    grid = {}
+    for threshold in thresholds:
+        starts, ends = _segments(scores, threshold, hysteresis, max_gap)
+        lengths = ends - starts
+        for min_length in min_lengths:
+            keep = lengths >= min_length
+            grid[threshold, min_length] = _as_idrs(starts[keep], ends[keep])
+    return grid
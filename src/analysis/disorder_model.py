@@ -0,0 +1,108 @@
+"""
+Process-wide metapredict handle.
+
+metapredict pulls in PyTorch and loads its network on first prediction, which
+takes seconds. Nothing imports it at module load: the first caller
+(or `warm_in_background`) imports it once per process and runs one tiny
+prediction so the weights are resident before real work arrives.
+
+With GENE_WEAVING_SERVICE (or `configure_remote`) pointing at a running
+`analysis_service`, predictions go to that service's shared model instead and
+nothing is loaded here.
+"""
+import os
+import threading
+import time
+
+from .tracing import span
+
+WARMUP_SEQUENCE = "MSTNPKPQRKTKRNTNRRPQDVKFPGG"
+
+# GENE_WEAVING_WARMUP=0 leaves the model unloaded until the first prediction
+WARMUP_ON_START = os.environ.get("GENE_WEAVING_WARMUP", "1").lower() not in ("0", "false", "no")
+
+_lock = threading.Lock()
+_metapredict = None
+_warmup_thread = None
+_remote = None
+service_url = None
+load_times = {}  # {"import_s": ..., "warmup_s": ...} once loaded
+
+
+def configure_remote(url):
+    """Sends predictions to the analysis service at `url`; None predicts in-process again."""
+    global _remote, service_url
+    if url:
+        from .service_client import ServiceClient
+
+        _remote, service_url = ServiceClient(url).disorder_scores, url
+    else:
+        _remote, service_url = None, None
+
+
+def load_metapredict():
+    """Imports metapredict and loads its network, once per process (thread-safe)."""
+    global _metapredict
+    if _metapredict is not None:
+        return _metapredict
+    with _lock:
+        if _metapredict is None:
+            with span("metapredict.load"):
+                t0 = time.perf_counter()
+                import metapredict
+                t1 = time.perf_counter()
+                metapredict.predict_disorder(WARMUP_SEQUENCE)
+                load_times.update(import_s=t1 - t0, warmup_s=time.perf_counter() - t1)
+            _metapredict = metapredict
+    return _metapredict
+
+
+def warm():
+    """Loads the model now, unless predictions go to a service."""
+    if _remote is None:
+        load_metapredict()
+
+
+def warm_in_background():
+    """Starts loading the model on a daemon thread; returns the thread (None if already loaded)."""
+    global _warmup_thread
+    with _lock:
+        if _metapredict is not None or _remote is not None:
+            return None
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=load_metapredict, name="gw-metapredict-warmup", daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
+
+
+def is_loaded():
+    return _metapredict is not None
+
+
+def is_remote():
+    """True when predictions go to an analysis service (which then owns the score store writes)."""
+    return _remote is not None
+
+
+def predict_disorder(sequence):
+    """Per-residue disorder scores for one sequence."""
+    if _remote is not None:
+        return _remote([sequence])[0]
+    return load_metapredict().predict_disorder(sequence)
+
+
+def predict_disorder_batch(sequences, persist=True):
+    """
+    Score arrays for many sequences, using metapredict's batch mode when available.
+    `persist=False` asks a remote service not to store them (in-process
+    predictions are never stored here).
+    """
+    if _remote is not None:
+        return _remote(list(sequences), persist=persist)
+    mp = load_metapredict()
+    if hasattr(mp, "predict_disorder_batch"):
+        return [entry[1] for entry in mp.predict_disorder_batch(list(sequences), show_progress_bar=False)]
+    return [mp.predict_disorder(seq) for seq in sequences]
+
+
+configure_remote(os.environ.get("GENE_WEAVING_SERVICE"))
@@ -0,0 +1,206 @@
+"""
+Compact sequence types shared by the analysis modules.
+
+`EncodedSeq` holds a sequence once as uppercase ASCII bytes (one uint8 per
+residue). Slicing returns a view over the same buffer, `codes` exposes it to
+NumPy without a copy, the reverse complement is a single `bytes.translate`, and
+GC / base counts over any window come from lazily built prefix sums in O(1).
+`PackedSeq` stores DNA at 2 bits per base (non-ACGT runs kept aside) for
+chromosome-sized inputs and unpacks only the windows that are asked for.
+
+Every analyzer that accepts a sequence string also accepts these.
+"""
+import numpy as np
+
+_UPPER = bytes.maketrans(b"abcdefghijklmnopqrstuvwxyz", b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+DNA_COMPLEMENT = bytes.maketrans(b"ACGTRYSWKMBDHVNacgtryswkmbdhvn", b"TGCAYRSWMKVHDBNTGCAYRSWMKVHDBN")
+
+_TWO_BIT = np.zeros(256, dtype=np.uint8)
+_IS_ACGT = np.zeros(256, dtype=bool)
+for _i, _b in enumerate(b"ACGT"):
+    _TWO_BIT[_b] = _i
+    _IS_ACGT[_b] = True
+_BASES = np.frombuffer(b"ACGT", dtype=np.uint8)
+
+
+class EncodedSeq:
+    """An uppercase ASCII sequence buffer; slices share it (zero-copy)."""
+
+    __slots__ = ("_data", "_root", "_offset", "_prefix")
+
+    def __init__(self, seq):
+        if isinstance(seq, EncodedSeq):
+            self._data, self._root, self._offset = seq._data, seq._root, seq._offset
+        else:
+            raw = seq.encode("ascii") if isinstance(seq, str) else bytes(seq)
+            self._data, self._root, self._offset = memoryview(raw.translate(_UPPER)), None, 0
+        self._prefix = {}
+
+    @classmethod
+    def _view(cls, parent, start, stop):
+        view = cls.__new__(cls)
+        view._data = parent._data[start:stop]
+        view._root = parent if parent._root is None else parent._root
+        view._offset = parent._offset + start
+        view._prefix = None
+        return view
+
+    # --- sequence protocol ---
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self._data))
+            if step == 1:
+                return EncodedSeq._view(self, start, max(start, stop))
+            return EncodedSeq(bytes(self._data[item]))
+        return chr(self._data[item])
+
+    def __str__(self):
+        return str(self._data, "ascii")
+
+    def __bytes__(self):
+        return self._data.tobytes()
+
+    def __repr__(self):
+        text = str(self[:40]) + ("..." if len(self) > 40 else "")
+        return f"EncodedSeq({text!r}, length={len(self)})"
+
+    def __eq__(self, other):
+        if isinstance(other, EncodedSeq):
+            return self._data == other._data
+        if isinstance(other, str):
+            return len(other) == len(self) and str(self) == other  # case-sensitive, like its hash
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __add__(self, other):
+        return EncodedSeq(self._data.tobytes() + bytes(EncodedSeq(other)._data))
+
+    @property
+    def data(self):
+        """The underlying memoryview (uppercase ASCII)."""
+        return self._data
+
+    @property
+    def codes(self):
+        """The sequence as a read-only uint8 NumPy array sharing this buffer."""
+        return np.frombuffer(self._data, dtype=np.uint8)
+
+    # --- DNA helpers ---
+    def reverse_complement(self):
+        return EncodedSeq(self._data.tobytes().translate(DNA_COMPLEMENT)[::-1])
+
+    def _cumulative(self, bases):
+        """Prefix counts of `bases` over the whole root buffer, built once per base set."""
+        root = self if self._root is None else self._root
+        cum = root._prefix.get(bases)
+        if cum is None:
+            table = np.zeros(256, dtype=bool)
+            table[list(bases.upper().encode("ascii"))] = True
+            dtype = np.int32 if len(root) < 2 ** 31 else np.int64
+            cum = root._prefix[bases] = np.concatenate(([0], np.cumsum(table[root.codes], dtype=dtype)))
+        return cum
+
+    def _bounds(self, start, end):
+        n = len(self._data)
+        start = min(max(start + n if start < 0 else start, 0), n)
+        end = n if end is None else min(max(end + n if end < 0 else end, 0), n)
+        return start, max(start, end)
+
+    def count(self, bases, start=0, end=None):
+        """How many residues in `bases` (e.g. "GC") lie in [start, end) of this view; O(1) once built."""
+        start, end = self._bounds(start, end)
+        cum = self._cumulative(bases)
+        return int(cum[self._offset + end] - cum[self._offset + start])
+
+    def gc_fraction(self, start=0, end=None):
+        start, end = self._bounds(start, end)
+        return self.count("GC", start, end) / (end - start) if end > start else 0.0
+
+    def window_counts(self, bases, width):
+        """Counts of `bases` in every `width`-long window of this view (one array op)."""
+        if width > len(self):
+            return np.zeros(0, dtype=np.int64)
+        cum = self._cumulative(bases)
+        lo = self._offset
+        return cum[lo + width:lo + len(self) + 1] - cum[lo:lo + len(self) - width + 1]
+
+    def pack(self):
+        return PackedSeq(self)
+
+
+class PackedSeq:
+    """
+    DNA at 2 bits per base. Anything other than A/C/G/T (N runs, IUPAC codes)
+    is recorded as runs and restored on unpacking. Slicing unpacks just the
+    requested window into an `EncodedSeq`.
+    """
+
+    def __init__(self, seq):
+        codes = EncodedSeq(seq).codes
+        self._length = len(codes)
+        two_bit = _TWO_BIT[codes]
+        padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+        padded[:len(codes)] = two_bit
+        quads = padded.reshape(-1, 4)
+        self._packed = (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+
+        # Non-ACGT characters are kept as runs of one repeated character (start, end, char)
+        idx = np.flatnonzero(~_IS_ACGT[codes])
+        new_run = np.concatenate(([True], (np.diff(idx) != 1) | (np.diff(codes[idx]) != 0))) if len(idx) else idx
+        firsts = np.flatnonzero(new_run)
+        run_starts = idx[firsts].astype(np.int64)
+        run_ends = (np.append(idx[firsts[1:] - 1], idx[-1:]) + 1).astype(np.int64)
+        self._runs = (run_starts, run_ends, codes[run_starts].copy())
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def nbytes(self):
+        return self._packed.nbytes + sum(a.nbytes for a in self._runs)
+
+    def _unpack(self, start, stop):
+        first, last = start // 4, -(-stop // 4)
+        quads = self._packed[first:last]
+        two_bit = np.stack([(quads >> s) & 3 for s in (6, 4, 2, 0)], axis=1).ravel()
+        out = _BASES[two_bit[start - first * 4:stop - first * 4]]
+        run_starts, run_ends, chars = self._runs
+        lo, hi = np.searchsorted(run_ends, start, side="right"), np.searchsorted(run_starts, stop)
+        for s, e, c in zip(run_starts[lo:hi].tolist(), run_ends[lo:hi].tolist(), chars[lo:hi].tolist()):
+            out[max(s, start) - start:min(e, stop) - start] = c
+        return EncodedSeq(out.tobytes())
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return str(self[item:item + 1]) if item >= 0 else str(self[len(self) + item:len(self) + item + 1])
+        start, stop, step = item.indices(self._length)
+        window = self._unpack(start, max(start, stop))
+        return window if step == 1 else window[::step]
+
+    def unpack(self):
+        return self._unpack(0, self._length)
+
+    def __bytes__(self):
+        return bytes(self.unpack())
+
+    def __str__(self):
+        return str(self.unpack())
+
+
+def as_text(seq):
+    """Plain `str` for any accepted sequence type (no copy for strings)."""
+    return seq if isinstance(seq, str) else str(seq)
+
+
+def as_bytes(seq):
+    """Uppercase ASCII bytes-like object for any accepted sequence type."""
+    if isinstance(seq, EncodedSeq):
+        return seq.data
+    if isinstance(seq, PackedSeq):
+        return seq.unpack().data
+    return seq.encode("ascii").translate(_UPPER) if isinstance(seq, str) else bytes(seq).translate(_UPPER)
@@ -0,0 +1,63 @@
+import gzip
+
+
+def open_text(path):
+    """Opens a plain or gzip-compressed text file for reading."""
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt")
+    return open(path, "r")
+
+
+def iter_fasta(path):
+    """
+    Lazily yields (record_id, sequence) pairs from a FASTA file.
+    Only one record is held in memory at a time. The ID is the first word of
+    the header; UniProt-style headers (sp|P01106|MYC_HUMAN) yield the accession.
+    """
+    with open_text(path) as fh:
+        record_id, chunks = None, []
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(">"):
+                if record_id is not None:
+                    yield record_id, "".join(chunks)
+                record_id, chunks = parse_header(line), []
+            else:
+                chunks.append(line.upper())
+        if record_id is not None:
+            yield record_id, "".join(chunks)
+
+
+def parse_header(line):
+    token = line[1:].split(None, 1)[0] if len(line) > 1 else ""
+    parts = token.split("|")
+    if len(parts) >= 3 and parts[0] in ("sp", "tr"):
+        return parts[1]
+    return token
+
+
+def iter_fasta_chunks(path, chunk_size=1_000_000):
+    """
+    Yields (record_id, chunk) pieces of each record's sequence, in order, so
+    chromosome-sized records never have to be held in memory at once.
+    """
+    with open_text(path) as fh:
+        record_id, parts, size = None, [], 0
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(">"):
+                if record_id is not None and parts:
+                    yield record_id, "".join(parts)
+                record_id, parts, size = parse_header(line), [], 0
+                continue
+            parts.append(line)
+            size += len(line)
+            if size >= chunk_size:
+                yield record_id, "".join(parts)
+                parts, size = [], 0
+        if record_id is not None and parts:
+            yield record_id, "".join(parts)
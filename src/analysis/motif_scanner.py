@@ -0,0 +1,161 @@
+from itertools import groupby
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .fasta_reader import iter_fasta_chunks
+from .tracing import traced
+
+BASES = "ACGT"
+UNIFORM_BACKGROUND = (0.25, 0.25, 0.25, 0.25)
+
+_ONE_HOT = np.zeros((256, 4), dtype=np.float32)
+for _i, _b in enumerate(BASES):
+    _ONE_HOT[ord(_b), _i] = _ONE_HOT[ord(_b.lower()), _i] = 1.0
+
+
+def pfm_to_pwm(pfm, pseudocount=0.8, background=UNIFORM_BACKGROUND):
+    """
+    Converts a PFM (DataFrame with A/C/G/T columns as returned by
+    `get_pfm_data`, a {base: counts} dict, or an L x 4 array) to a log2-odds
+    PWM. The pseudocount is spread over the bases by background frequency.
+    """
+    if hasattr(pfm, "columns"):
+        counts = pfm[list(BASES)].to_numpy(dtype=float)
+    elif isinstance(pfm, dict):
+        counts = np.array([pfm[b] for b in BASES], dtype=float).T
+    else:
+        counts = np.asarray(pfm, dtype=float)
+    bg = np.asarray(background, dtype=float)
+    probs = (counts + pseudocount * bg) / (counts.sum(axis=1, keepdims=True) + pseudocount)
+    return np.log2(probs / bg)
+
+
+def one_hot(dna):
+    """(len, 4) float32 encoding; N and other symbols are all-zero rows."""
+    return _ONE_HOT[np.frombuffer(dna.encode("ascii"), dtype=np.uint8)]
+
+
+def score_distribution(pwm, background=UNIFORM_BACKGROUND, resolution=0.01):
+    """
+    Exact null distribution of PWM scores under an i.i.d. background, computed
+    by convolving per-column score distributions on a grid of `resolution` bits.
+    Returns (grid scores, survival P(score >= grid value)).
+    """
+    bg = np.asarray(background, dtype=float)
+    ints = np.round(pwm / resolution).astype(int)
+    offset = int(ints.min(axis=1).sum())
+    span = int((ints.max(axis=1) - ints.min(axis=1)).sum()) + 1
+    dist = np.zeros(span)
+    dist[0] = 1.0
+    for col in ints:
+        shifted = col - col.min()
+        new = np.zeros(span)
+        for b in range(4):
+            s = shifted[b]
+            new[s:] += dist[:span - s] * bg[b]
+        dist = new
+    grid = (np.arange(span) + offset) * resolution
+    survival = np.cumsum(dist[::-1])[::-1]
+    return grid, survival
+
+
+class MotifScanner:
+    """
+    Scores many motifs on both strands of DNA at once.
+
+    PWMs are padded to a common width and stacked, so every window of the
+    sequence is scored against every motif and strand with one einsum over a
+    zero-copy sliding-window view of the one-hot encoding.
+    """
+
+    def __init__(self, motifs, pvalue=1e-4, background=UNIFORM_BACKGROUND, pseudocount=0.8):
+        self.names = list(motifs)
+        pwms = [pfm_to_pwm(motifs[n], pseudocount, background) for n in self.names]
+        self.lengths = np.array([len(p) for p in pwms])
+        self.width = int(self.lengths.max())
+
+        stacked = np.zeros((2 * len(pwms), self.width, 4), dtype=np.float32)
+        self._thresholds = np.zeros(2 * len(pwms))
+        self._null = []
+        for i, pwm in enumerate(pwms):
+            grid, survival = score_distribution(pwm, background)
+            passing = np.flatnonzero(survival <= pvalue)
+            threshold = grid[passing[0]] if len(passing) else np.inf
+            stacked[2 * i, :len(pwm)] = pwm
+            stacked[2 * i + 1, :len(pwm)] = pwm[::-1, ::-1]  # reverse complement
+            self._thresholds[2 * i:2 * i + 2] = threshold
+            self._null.append((grid, survival))
+        self._stacked = stacked
+        self.pvalue = pvalue
+
+    def pvalue_of(self, motif_index, score):
+        grid, survival = self._null[motif_index]
+        pos = min(np.searchsorted(grid, score - 1e-9), len(grid) - 1)
+        return float(survival[pos])
+
+    def scan(self, dna, offset=0):
+        """Returns hits in `dna` as dicts; coordinates are 0-based and shifted by `offset`."""
+        enc = one_hot(dna)
+        if len(enc) < self.lengths.min():
+            return []
+        padded = np.vstack([enc, np.zeros((self.width - 1, 4), dtype=np.float32)])
+        windows = sliding_window_view(padded, (self.width, 4))[:, 0]  # (n, width, 4), no copy
+        scores = np.einsum("nwb,mwb->mn", windows, self._stacked, optimize=True)
+
+        hits = []
+        rows, cols = np.nonzero(scores >= self._thresholds[:, None])
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            m = r // 2
+            if c + self.lengths[m] > len(dna):
+                continue
+            score = float(scores[r, c])
+            hits.append({
+                "motif": self.names[m],
+                "start": offset + c,
+                "end": offset + c + int(self.lengths[m]),
+                "strand": "+" if r % 2 == 0 else "-",
+                "score": score,
+                "pvalue": self.pvalue_of(m, score),
+                "site": dna[c:c + self.lengths[m]].upper(),
+            })
+        hits.sort(key=lambda h: (h["start"], h["motif"], h["strand"]))
+        return hits
+
+    def scan_stream(self, chunks):
+        """Scans sequential chunks of one sequence, carrying an overlap across boundaries."""
+        tail, offset = "", 0
+        for chunk in chunks:
+            buf = tail + chunk
+            keep = min(len(buf), self.width - 1)
+            # Only report windows that start before the carried-over tail
+            for hit in self.scan(buf, offset):
+                if hit["start"] - offset < len(buf) - keep:
+                    yield hit
+            offset += len(buf) - keep
+            tail = buf[len(buf) - keep:]
+        if tail:
+            yield from self.scan(tail, offset)
+
+
+@traced()
+def scan_motifs(dna, motifs, pvalue=1e-4):
+    """Binding sites of every motif ({name: PFM}) on both strands of `dna`."""
+    return MotifScanner(motifs, pvalue=pvalue).scan(dna)
+
+
+def scan_fasta_motifs(path, motifs, pvalue=1e-4, chunk_size=200_000):
+    """Streams a FASTA (e.g. a promoter set) and yields hits tagged with the record ID."""
+    scanner = MotifScanner(motifs, pvalue=pvalue)
+    for record_id, pieces in groupby(iter_fasta_chunks(path, chunk_size), key=lambda rc: rc[0]):
+        for hit in scanner.scan_stream(chunk for _, chunk in pieces):
+            hit["chrom"] = record_id
+            yield hit
+
+
+def construct_binding_sites(dna, motifs, pvalue=1e-4):
+    """
+    Predicted binding sites inside a designed construct, e.g. to catch a TF's
+    own motif created by codon optimization.
+    """
+    return scan_motifs(dna, motifs, pvalue=pvalue)
@@ -0,0 +1,167 @@
+"""
+In-silico saturation mutagenesis against the disorder predictor.
+
+Every variant is scored as the change in predicted disorder relative to the
+wild type. metapredict is a bidirectional LSTM, so a substitution can in
+principle reach the whole chain, but its effect fades within ~100 residues:
+by default only the mutant's +/-`flank` window is predicted and compared with
+the same window of the wild type (site deltas correlate at r ~ 0.95 with
+full-length predictions for flank=128). `flank=None` predicts full length.
+All windows of a scan are deduplicated and sent to the predictor in
+length-sorted batches. Scan windows are throwaway, so a remote service is
+asked not to keep them in its score store.
+"""
+import re
+from functools import partial
+
+import numpy as np
+
+from .disorder_model import predict_disorder_batch
+from .encoded_seq import as_text
+from .tracing import traced
+
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+DELETION = "-"
+DEFAULT_FLANK = 128
+
+_MUTATION = re.compile(r"^([A-Z])(\d+)([A-Z]|DEL)$")
+
+
+def parse_mutation(text, sequence=None):
+    """
+    'P12A' -> (12, 'P', 'A'); 'K45del' -> (45, 'K', '-').
+    With `sequence`, the wild-type residue and position are checked against it.
+    """
+    match = _MUTATION.match(text.strip().upper())
+    if not match:
+        raise ValueError(f"Not a point mutation or deletion: {text!r}")
+    wt, pos, mut = match.group(1), int(match.group(2)), match.group(3)
+    mut = DELETION if mut == "DEL" else mut
+    if sequence is not None:
+        if not 1 <= pos <= len(sequence):
+            raise ValueError(f"{text}: position {pos} outside 1-{len(sequence)}")
+        if sequence[pos - 1].upper() != wt:
+            raise ValueError(f"{text}: residue {pos} is {sequence[pos - 1]}, not {wt}")
+    return pos, wt, mut
+
+
+def _predict_unique(texts, predictor, batch_size):
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    out = [None] * len(texts)
+    for i in range(0, len(order), batch_size):
+        chunk = order[i:i + batch_size]
+        for j, scores in zip(chunk, predictor([texts[j] for j in chunk])):
+            out[j] = np.asarray(scores, dtype=np.float32)
+    return out
+
+
+@traced()
+def score_variants(sequence, variants, flank=DEFAULT_FLANK, predictor=None, batch_size=1024):
+    """
+    Disorder change for each (position, replacement) variant, 1-based, replacement
+    '-' for a deletion. Returns two float32 arrays: the change at the mutated
+    residue (mean of its two neighbours for a deletion) and the mean change over
+    the recomputed window.
+    """
+    predictor = predictor or partial(predict_disorder_batch, persist=False)
+    seq = as_text(sequence).upper()
+    n = len(seq)
+    slots = {}
+    jobs = []
+    for pos, mut in variants:
+        p = pos - 1
+        lo, hi = (0, n) if flank is None else (max(0, p - flank), min(n, p + flank + 1))
+        wt = seq[lo:hi]
+        mutant = wt[:p - lo] + ("" if mut == DELETION else mut) + wt[p - lo + 1:]
+        jobs.append((p - lo, mut == DELETION, slots.setdefault(wt, len(slots)), slots.setdefault(mutant, len(slots))))
+
+    predicted = _predict_unique(list(slots), predictor, batch_size)
+    site = np.empty(len(jobs), dtype=np.float32)
+    mean = np.empty(len(jobs), dtype=np.float32)
+    for i, (k, deleted, ref, alt) in enumerate(jobs):
+        ref, alt = predicted[ref], predicted[alt]
+        if deleted:
+            delta = alt - np.delete(ref, k)
+            site[i] = delta[max(k - 1, 0):k + 1].mean() if len(delta) else 0.0
+        else:
+            delta = alt - ref
+            site[i] = delta[k]
+        mean[i] = delta.mean() if len(delta) else 0.0
+    return site, mean
+
+
+class MutationScan:
+    """
+    Position x residue matrix of disorder changes for a saturation scan.
+    `delta[i, j]` is the change for residue `positions[i]` mutated to
+    `residues[j]`; wild-type cells are NaN.
+    """
+
+    def __init__(self, positions, wild_type, residues, delta, metric):
+        self.positions = positions
+        self.wild_type = wild_type
+        self.residues = residues
+        self.delta = delta
+        self.metric = metric
+
+    def __len__(self):
+        return len(self.positions)
+
+    def to_frame(self):
+        import pandas as pd
+
+        index = [f"{wt}{pos}" for wt, pos in zip(self.wild_type, self.positions)]
+        return pd.DataFrame(self.delta, index=index, columns=list(self.residues))
+
+    def top(self, n=10):
+        """The `n` variants with the largest absolute change, strongest first."""
+        flat = np.where(np.isnan(self.delta), -1.0, np.abs(self.delta)).ravel()
+        picked = np.argsort(flat, kind="stable")[::-1][:min(n, int((flat >= 0).sum()))]
+        rows, cols = np.unravel_index(picked, self.delta.shape)
+        return [{"mutation": f"{self.wild_type[r]}{self.positions[r]}"
+                             f"{'del' if self.residues[c] == DELETION else self.residues[c]}",
+                 "delta": float(self.delta[r, c])} for r, c in zip(rows, cols)]
+
+
+@traced()
+def saturation_scan(sequence, start=1, end=None, flank=DEFAULT_FLANK, metric="site", include_deletions=False,
+                    predictor=None, batch_size=1024):
+    """
+    All 19 substitutions (and optionally the deletion) at every residue of
+    `start`..`end` (1-based, inclusive). `metric` is "site" or "mean"; see
+    `score_variants`. Returns a `MutationScan`.
+    """
+    if metric not in ("site", "mean"):
+        raise ValueError(f"Unknown metric: {metric}")
+    seq = as_text(sequence).upper()
+    end = len(seq) if end is None else min(end, len(seq))
+    residues = AMINO_ACIDS + (DELETION if include_deletions else "")
+    positions = np.arange(max(start, 1), end + 1)
+
+    variants, cells = [], []
+    for i, pos in enumerate(positions):
+        for j, res in enumerate(residues):
+            if res != seq[pos - 1]:
+                variants.append((int(pos), res))
+                cells.append((i, j))
+
+    delta = np.full((len(positions), len(residues)), np.nan, dtype=np.float32)
+    if variants:
+        site, mean = score_variants(seq, variants, flank=flank, predictor=predictor, batch_size=batch_size)
+        rows, cols = np.array(cells).T
+        delta[rows, cols] = site if metric == "site" else mean
+    return MutationScan(positions, seq[positions[0] - 1:end] if len(positions) else "", residues, delta, metric)
+
+
+@traced()
+def scan_mutations(sequence, mutations, flank=DEFAULT_FLANK, predictor=None, batch_size=1024):
+    """Scores a list of point mutants / deletions such as ["P12A", "K45del"] in one batch."""
+    sequence = as_text(sequence)
+    parsed = [parse_mutation(m, sequence) for m in mutations]
+    if not parsed:
+        return []
+    site, mean = score_variants(sequence, [(pos, mut) for pos, _, mut in parsed], flank=flank,
+                                predictor=predictor, batch_size=batch_size)
+    return [{"mutation": text.strip().upper().replace("DEL", "del"), "position": pos, "wt": wt, "mut": mut,
+             "delta_site": float(s), "delta_mean": float(m)}
+            for text, (pos, wt, mut), s, m in zip(mutations, parsed, site, mean)]
@@ -0,0 +1,237 @@
+import json
+import os
+from itertools import combinations, product
+
+import numpy as np
+
+from .fasta_reader import iter_fasta_chunks
+from .tracing import traced
+
+# 2-bit base codes; 4 marks N / chromosome separators and never matches
+_CODE = np.full(256, 4, dtype=np.uint8)
+for _i, _b in enumerate("ACGT"):
+    _CODE[ord(_b)] = _CODE[ord(_b.lower())] = _i
+
+_PAM_BASES = {"N": (0, 1, 2, 3), "G": (2,), "A": (0,), "C": (1,), "T": (3,), "R": (0, 2)}
+
+# Position-specific mismatch penalties (PAM-distal -> PAM-proximal), Hsu et al. 2013
+MISMATCH_WEIGHTS = np.array([0, 0, 0.014, 0, 0, 0.395, 0.317, 0, 0.389, 0.079,
+                             0.445, 0.508, 0.613, 0.851, 0.732, 0.828, 0.615, 0.804, 0.685, 0.583])
+
+# Relative cleavage at non-canonical PAMs
+PAM_ACTIVITY = {"NGG": 1.0, "NAG": 0.259}
+
+# The weights above are for SpCas9: 20-nt protospacers with the PAM 3' of them
+GUIDE_LENGTH = len(MISMATCH_WEIGHTS)
+
+
+def encode_bases(seq):
+    return _CODE[np.frombuffer(seq.encode("ascii"), dtype=np.uint8)]
+
+
+def _pack_kmers(codes, k):
+    """2-bit packs every k-mer of `codes`; windows containing N are flagged invalid."""
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=bool)
+    packed = np.zeros(n, dtype=np.uint32)
+    invalid = np.zeros(n, dtype=bool)
+    for j in range(k):
+        window = codes[j:j + n]
+        invalid |= window > 3
+        packed = (packed << 2) | (window & 3).astype(np.uint32)
+    return packed, ~invalid
+
+
+@traced()
+def build_offtarget_index(fasta_path, index_dir, k=10):
+    """
+    Builds a seed index for a reference FASTA.
+
+    Writes the genome as one byte per base (`genome.npy`), every valid k-mer as
+    a 2-bit packed uint32 sorted ascending (`seeds.npy`) with the matching
+    genome positions (`positions.npy`), and chromosome offsets (`meta.json`).
+    All arrays are memory-mapped when the index is opened.
+    """
+    if not 1 <= k <= 16:
+        raise ValueError("Seed length must be between 1 and 16.")
+    os.makedirs(index_dir, exist_ok=True)
+
+    parts, chroms, offset = [], [], 0
+    current = None
+    for record_id, chunk in iter_fasta_chunks(fasta_path):
+        if record_id != current:
+            if current is not None:
+                parts.append(np.full(1, 4, dtype=np.uint8))  # separator
+                offset += 1
+            chroms.append({"name": record_id, "offset": offset, "length": 0})
+            current = record_id
+        codes = encode_bases(chunk)
+        parts.append(codes)
+        chroms[-1]["length"] += len(codes)
+        offset += len(codes)
+
+    genome = np.concatenate(parts) if parts else np.zeros(0, dtype=np.uint8)
+    seeds, valid = _pack_kmers(genome, k)
+    positions = np.flatnonzero(valid).astype(np.uint32 if len(genome) < 2 ** 32 else np.uint64)
+    seeds = seeds[valid]
+    order = np.argsort(seeds, kind="stable")
+
+    np.save(os.path.join(index_dir, "genome.npy"), genome)
+    np.save(os.path.join(index_dir, "seeds.npy"), seeds[order])
+    np.save(os.path.join(index_dir, "positions.npy"), positions[order])
+    with open(os.path.join(index_dir, "meta.json"), "w") as fh:
+        json.dump({"k": k, "chroms": chroms}, fh)
+    return OffTargetIndex(index_dir)
+
+
+def hit_score(mismatch_positions, pam="NGG"):
+    """MIT-style activity estimate (0-1) of one off-target site from its mismatch positions."""
+    mm = sorted(mismatch_positions)
+    if mm and not 0 <= mm[0] <= mm[-1] < GUIDE_LENGTH:
+        raise ValueError(f"Mismatch positions must be 0-{GUIDE_LENGTH - 1} (SpCas9 20-nt guides).")
+    score = float(np.prod(1 - MISMATCH_WEIGHTS[mm])) if mm else 1.0
+    n = len(mm)
+    if n > 1:
+        mean_dist = (mm[-1] - mm[0]) / (n - 1)
+        score *= 1 / (((19 - mean_dist) / 19) * 4 + 1) / n ** 2
+    return float(score * PAM_ACTIVITY.get(pam, 1.0))
+
+
+class OffTargetIndex:
+    """Read-only view of an index built by `build_offtarget_index`."""
+
+    def __init__(self, index_dir):
+        with open(os.path.join(index_dir, "meta.json")) as fh:
+            meta = json.load(fh)
+        self.k = meta["k"]
+        self.chroms = meta["chroms"]
+        self._chrom_offsets = np.array([c["offset"] for c in self.chroms], dtype=np.int64)
+        self.genome = np.load(os.path.join(index_dir, "genome.npy"), mmap_mode="r")
+        self.seeds = np.load(os.path.join(index_dir, "seeds.npy"), mmap_mode="r")
+        self.positions = np.load(os.path.join(index_dir, "positions.npy"), mmap_mode="r")
+
+    def _seed_hits(self, variants):
+        """Genome positions of every k-mer in `variants` (rows of base codes)."""
+        codes = np.zeros(len(variants), dtype=np.uint32)
+        for j in range(self.k):
+            codes = (codes << 2) | variants[:, j].astype(np.uint32)
+        lo = np.searchsorted(self.seeds, codes, side="left")
+        hi = np.searchsorted(self.seeds, codes, side="right")
+        counts = hi - lo
+        if counts.sum() == 0:
+            return np.zeros(0, dtype=np.int64)
+        idx = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        return np.asarray(self.positions[idx], dtype=np.int64)
+
+    def _block_variants(self, block, max_mm):
+        """All sequences within `max_mm` substitutions of `block`, as a 2-D code array."""
+        rows = [block.copy()]
+        for n in range(1, max_mm + 1):
+            for pos in combinations(range(len(block)), n):
+                alts = [[b for b in range(4) if b != block[p]] for p in pos]
+                for choice in product(*alts):
+                    row = block.copy()
+                    row[list(pos)] = choice
+                    rows.append(row)
+        return np.array(rows, dtype=np.uint8)
+
+    def find_sites(self, guide, max_mismatches=3, pams=("NGG", "NAG")):
+        """
+        Finds genomic sites within `max_mismatches` of a 20-nt SpCas9 guide
+        followed by one of `pams`, on both strands; other guide lengths raise
+        ValueError (the mismatch weights only cover SpCas9). The guide is split into non-overlapping
+        k-mer blocks; by pigeonhole one block holds at most
+        max_mismatches // n_blocks mismatches, so only those seed variants are
+        looked up and the candidates verified against the full site.
+        """
+        guide_codes = encode_bases(guide.upper())
+        glen, plen = len(guide_codes), len(pams[0])
+        if (guide_codes > 3).any():
+            raise ValueError("Guides must be unambiguous A/C/G/T sequences.")
+        if glen != GUIDE_LENGTH:
+            raise ValueError(f"Off-target scoring supports {GUIDE_LENGTH}-nt SpCas9 guides, got {glen} nt.")
+
+        n_blocks = glen // self.k
+        per_block = max_mismatches // n_blocks
+        site_len = glen + plen
+
+        hits = []
+        for strand in ("+", "-"):
+            starts = []
+            for b in range(n_blocks):
+                b0 = b * self.k
+                variants = self._block_variants(guide_codes[b0:b0 + self.k], per_block)
+                if strand == "-":
+                    variants = (3 - variants)[:, ::-1]
+                    starts.append(self._seed_hits(variants) - (site_len - b0 - self.k))
+                else:
+                    starts.append(self._seed_hits(variants) - b0)
+            starts = np.unique(np.concatenate(starts))
+            starts = starts[(starts >= 0) & (starts + site_len <= len(self.genome))]
+            if not len(starts):
+                continue
+
+            windows = np.asarray(self.genome[starts[:, None] + np.arange(site_len)])
+            if strand == "-":
+                windows = np.where(windows < 4, 3 - windows, 4)[:, ::-1]
+
+            mismatch = windows[:, :glen] != guide_codes
+            n_mm = mismatch.sum(axis=1)
+            for pam in pams:
+                pam_ok = np.ones(len(starts), dtype=bool)
+                for j, base in enumerate(pam):
+                    pam_ok &= np.isin(windows[:, glen + j], _PAM_BASES[base])
+                for i in np.flatnonzero(pam_ok & (n_mm <= max_mismatches)):
+                    hits.append(self._describe(int(starts[i]), strand, np.flatnonzero(mismatch[i]), pam))
+        hits.sort(key=lambda h: (h["mismatches"], h["chrom"], h["position"]))
+        return hits
+
+    def _describe(self, start, strand, mm_positions, pam):
+        c = int(np.searchsorted(self._chrom_offsets, start, side="right")) - 1
+        return {
+            "chrom": self.chroms[c]["name"],
+            "position": start - int(self._chrom_offsets[c]),
+            "strand": strand,
+            "pam": pam,
+            "mismatches": len(mm_positions),
+            "mismatch_positions": [int(p) + 1 for p in mm_positions],
+            "score": hit_score(list(mm_positions), pam),
+        }
+
+    @traced("offtarget_index.score_guides")
+    def score_guides(self, guides, max_mismatches=3, pams=("NGG", "NAG")):
+        """
+        Scores a batch of guides (strings or `design_grnas` dicts). Each result
+        has hit counts per mismatch level and a 0-100 specificity score in
+        which one perfect NGG match is treated as the intended target.
+
+        Guides the model does not cover (other lengths, or dicts whose `pam` is
+        not an SpCas9 PAM, e.g. Cas12a's 5' TTTV) get an `unsupported` reason and
+        None for the counts and score instead of being searched.
+        """
+        results = []
+        for g in guides:
+            seq = g["sequence"] if isinstance(g, dict) else g
+            pam = g.get("pam", "NGG") if isinstance(g, dict) else "NGG"
+            if len(seq) != GUIDE_LENGTH or pam not in PAM_ACTIVITY:
+                results.append({"sequence": seq, "unsupported": f"{len(seq)}-nt guide with {pam} PAM",
+                                "hit_counts": None, "perfect_matches": None, "specificity": None, "sites": []})
+                continue
+            sites = self.find_sites(seq, max_mismatches=max_mismatches, pams=pams)
+            counts = [0] * (max_mismatches + 1)
+            for s in sites:
+                counts[s["mismatches"]] += 1
+
+            scores = [s["score"] for s in sites]
+            perfect = [i for i, s in enumerate(sites) if s["mismatches"] == 0 and s["pam"] == "NGG"]
+            if perfect:
+                scores.pop(perfect[0])
+            results.append({
+                "sequence": seq,
+                "hit_counts": counts,
+                "perfect_matches": len(perfect),
+                "specificity": 100 / (1 + sum(scores)),
+                "sites": sites,
+            })
+        return results
@@ -1,29 +1,106 @@
-def get_optimized_dna(protein_seq, organism="Human"):
-    # High-efficiency codon tables
-    tables = {
-        "Human": {'A':'GCC','C':'TGC','D':'GAC','E':'GAG','F':'TTC','G':'GGC','H':'CAC','I':'ATC','K':'AAG','L':'CTG','M':'ATG','N':'AAC','P':'CCC','Q':'CAG','R':'CGC','S':'TCC','T':'ACC','V':'GTG','W':'TGG','Y':'TAC','*':'TAA'},
-        "Yeast": {'A':'GCT','C':'TGT','D':'GAT','E':'GAA','F':'TTT','G':'GGT','H':'CAT','I':'ATT','K':'AAA','L':'TTG','M':'ATG','N':'AAT','P':'CCA','Q':'CAA','R':'AGA','S':'TCT','T':'ACT','V':'GTT','W':'TGG','Y':'TAT','*':'TAA'}
-    }
-    table = tables.get(organism, tables["Human"])
-    return "".join([table.get(aa, 'NNN') for aa in protein_seq])
-
-def scan_restriction_sites(dna):
-    enzymes = {"EcoRI":"GAATTC", "BamHI":"GGATCC", "HindIII":"AAGCTT", "NotI":"GCGGCCGC", "XhoI":"CTCGAG"}
-    return [name for name, site in enzymes.items() if site in dna.upper()]
-
-def calculate_tm(seq):
-    return (2 * (seq.count('A') + seq.count('T'))) + (4 * (seq.count('G') + seq.count('C')))
+import numpy as np
+
+from .codon_optimizer import optimize_codons, optimize_codons_many
+from .encoded_seq import EncodedSeq, as_text
+from .restriction_sites import CLONING_ENZYMES, find_restriction_sites
+from .thermo import calculate_tm_nn, duplex_dg, encode, hairpin_dg, tm_prefix_matrix
+from .tracing import traced
+
+_COMPLEMENT = str.maketrans("ACGTNacgtn", "TGCANtgcan")
+
+# Screening limits, dG37 in kcal/mol
+HAIRPIN_DG_LIMIT = -2.0
+DIMER_DG_LIMIT = -9.0
+DIMER_3P_DG_LIMIT = -5.0
+
+
+def get_optimized_dna(protein_seq, organism="Human", forbidden_sites=None, gc_bounds=(0.25, 0.75)):
+    """
+    Codon-optimizes a protein for the "Human" or "Yeast" preset, avoiding
+    `forbidden_sites` (the GUI's cloning enzymes by default) and keeping
+    windowed GC within `gc_bounds`.
+    """
+    return optimize_codons(protein_seq, organism=organism, forbidden_sites=forbidden_sites, gc_bounds=gc_bounds)
+
+def get_optimized_dna_many(protein_seqs, organism="Human", workers=None, **kwargs):
+    """Batch version of `get_optimized_dna` for whole construct libraries."""
+    return optimize_codons_many(protein_seqs, workers=workers, organism=organism, **kwargs)
+
+def scan_restriction_sites(dna, enzymes=None):
+    """Names of the enzymes (cloning set by default) with a site anywhere in `dna`."""
+    enzymes = enzymes or CLONING_ENZYMES
+    found = {h['enzyme'] for h in find_restriction_sites(as_text(dna), enzymes)}
+    return [name for name in enzymes if name in found]
+
+def calculate_tm(seq, na=0.05, primer_conc=250e-9):
+    """Nearest-neighbor (SantaLucia) Tm in deg C, salt-corrected for `na` molar Na+."""
+    return calculate_tm_nn(as_text(seq), na=na, primer_conc=primer_conc)
 
 def reverse_complement(seq):
-    complement = {'A': 'T', 'C': 'G', 'G': 'C', 'T': 'A', 'N': 'N'}
-    return "".join(complement.get(base, base) for base in reversed(seq))
+    if isinstance(seq, EncodedSeq):
+        return seq.reverse_complement()
+    return seq.translate(_COMPLEMENT)[::-1]
+
+def generate_primers(dna, ov_f, ov_r, target_tm=60.0, min_len=16, max_len=35):
+    """Picks forward/reverse binding lengths that hit `target_tm` with matched Tms."""
+    return generate_primers_many([dna], ov_f, ov_r, target_tm=target_tm, min_len=min_len, max_len=max_len)[0]
+
+@traced()
+def generate_primers_many(dnas, ov_f, ov_r, target_tm=60.0, min_len=16, max_len=35, na=0.05):
+    """
+    Designs primers for many constructs at once. The Tm of every candidate
+    binding length at both ends of every construct comes out of one
+    vectorized nearest-neighbor pass; each construct then gets the length pair
+    minimising distance to `target_tm` plus the Tm gap between the primers.
+    """
+    if not dnas:
+        return []
+    fwd_ends = [as_text(d[:max_len]) for d in dnas]
+    rev_ends = [reverse_complement(as_text(d[-max_len:])) for d in dnas]
+    tm_f = tm_prefix_matrix(encode(fwd_ends, max_len), na=na)
+    tm_r = tm_prefix_matrix(encode(rev_ends, max_len), na=na)
+
+    lengths = np.arange(1, max_len + 1)
+    avail = np.array([len(d) for d in dnas])[:, None]
+    lo = np.minimum(min_len, avail)
+    usable = (lengths >= lo) & (lengths <= avail) & (lengths >= 2)
+    tm_f = np.where(usable, tm_f, np.nan)
+    tm_r = np.where(usable, tm_r, np.nan)
 
-def generate_primers(dna, ov_f, ov_r):
-    bf, br = dna[:20], reverse_complement(dna[-20:])
-    return {"fwd": f"{ov_f}{bf}", "rev": f"{ov_r}{br}", "fwd_bind": bf, "rev_bind": br}
+    # An end with no usable Tm (ambiguous bases) keeps the minimum length and the other end is still optimised
+    fill = lengths == lo
+    cost_f = np.where(np.isnan(tm_f).all(axis=1, keepdims=True) & fill, target_tm, tm_f)
+    cost_r = np.where(np.isnan(tm_r).all(axis=1, keepdims=True) & fill, target_tm, tm_r)
+    cost = (np.abs(cost_f - target_tm)[:, :, None] + np.abs(cost_r - target_tm)[:, None, :]
+            + np.abs(cost_f[:, :, None] - cost_r[:, None, :]))
+    cost = np.where(np.isnan(cost), np.inf, cost)
+    best = cost.reshape(len(dnas), -1).argmin(axis=1)
+    lf, lr = np.divmod(best, max_len)
 
+    results = []
+    for i, dna in enumerate(dnas):
+        if len(dna) < 2:
+            bf, br, tf, tr = fwd_ends[i], rev_ends[i], 0.0, 0.0
+        else:
+            bf, br = fwd_ends[i][:lf[i] + 1], rev_ends[i][:lr[i] + 1]
+            tf, tr = float(tm_f[i, lf[i]]), float(tm_r[i, lr[i]])
+        results.append({"fwd": f"{ov_f}{bf}", "rev": f"{ov_r}{br}", "fwd_bind": bf, "rev_bind": br,
+                        "tm_fwd": tf, "tm_rev": tr})
+    return results
+
+@traced()
 def get_primer_quality(full_seq, binding_part):
     tm = calculate_tm(binding_part)
+    full_seq = as_text(full_seq)
     gc = (full_seq.count('G') + full_seq.count('C')) / len(full_seq) * 100
-    status = "✅" if 40 <= gc <= 60 else "⚠️"
-    return {"tm": tm, "gc": gc, "status": status, "warnings": ""}
\ No newline at end of file
+
+    warnings = []
+    hairpin = hairpin_dg(full_seq)
+    if hairpin < HAIRPIN_DG_LIMIT:
+        warnings.append(f"hairpin ({hairpin:.1f} kcal/mol)")
+    dimer, at_3p = duplex_dg(full_seq, full_seq)
+    if dimer < (DIMER_3P_DG_LIMIT if at_3p else DIMER_DG_LIMIT):
+        warnings.append(f"{'3′ ' if at_3p else ''}self-dimer ({dimer:.1f} kcal/mol)")
+
+    status = "✅" if 40 <= gc <= 60 and not warnings else "⚠️"
+    return {"tm": tm, "gc": gc, "status": status, "warnings": "; ".join(warnings)}
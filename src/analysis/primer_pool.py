@@ -0,0 +1,217 @@
+"""
+Set-level compatibility of a primer collection (pooled / multiplex PCR).
+
+A dimer or mispriming event only matters when a primer's 3' end anneals and
+can be extended. Every primer is indexed by all of its k-mers, and by the
+reverse complement of its 3'-terminal k-mer. Adding a primer therefore looks
+up only the primers that could pair with either 3' end. Each seed is extended
+along its diagonal, and the resulting duplex is scored with the
+nearest-neighbor model; no all-pairs alignment is done. Templates are held as
+arrays of packed k-mer codes on both strands, so a primer's 3' end is matched
+against every template in one vectorized comparison.
+"""
+from collections import defaultdict
+
+import numpy as np
+
+from .encoded_seq import as_text
+from .primer_designer import DIMER_3P_DG_LIMIT, reverse_complement
+from .thermo import stack_dg
+from .tracing import traced
+
+# A primer whose 3' end forms a duplex this stable elsewhere on a template can prime there
+MISPRIME_DG_LIMIT = -9.0
+
+_PAIR = {"A": "T", "C": "G", "G": "C", "T": "A"}
+
+_CODE = np.full(256, 4, dtype=np.uint8)
+for _i, _b in enumerate(b"ACGT"):
+    _CODE[_b] = _CODE[_b + 32] = _i
+
+
+def kmer_codes(seq, k):
+    """2-bit packed code of every k-mer of `seq` (int64); windows touching a non-ACGT base are -1."""
+    codes = _CODE[np.frombuffer(seq.encode("ascii"), dtype=np.uint8)]
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+    out = np.zeros(n, dtype=np.int64)
+    for j in range(k):
+        out = (out << 2) | (codes[j:j + n] & 3)
+    bad = np.concatenate(([0], np.cumsum(codes == 4)))
+    out[(bad[k:] - bad[:-k]) > 0] = -1
+    return out
+
+
+def three_prime_duplex(a, b, k=5):
+    """
+    Most stable duplex between the 3' end of `a` and any stretch of `b` (both
+    5'->3'), found by seeding on a's terminal k-mer. Returns (dG37, length);
+    (0.0, 0) when fewer than `k` terminal bases pair.
+    """
+    seed = reverse_complement(a[-k:])
+    best, best_len = 0.0, 0
+    j = b.find(seed)
+    while j >= 0:
+        run = k  # a[-1 - t] pairs with b[j + t]
+        while run < len(a) and j + run < len(b) and _PAIR.get(a[-1 - run]) == b[j + run]:
+            run += 1
+        dg = stack_dg(a[len(a) - run:])
+        if dg < best:
+            best, best_len = dg, run
+        j = b.find(seed, j + 1)
+    return best, best_len
+
+
+class PrimerPool:
+    """
+    Incrementally maintained 3' dimer / mispriming report for a primer set.
+
+    `add` and `add_template` return only the issues the new item introduces;
+    `issues` holds everything found so far. Primers sharing a `group` (the two
+    primers of one construct) are not checked for mispriming on that group's
+    own template, where they are meant to bind.
+    """
+
+    def __init__(self, k=5, misprime_k=10, dg_limit=DIMER_3P_DG_LIMIT, misprime_dg_limit=MISPRIME_DG_LIMIT):
+        self.k = k
+        self.misprime_k = misprime_k
+        self.dg_limit = dg_limit
+        self.misprime_dg_limit = misprime_dg_limit
+        self.primers = {}     # name -> (sequence, group)
+        self.templates = {}   # group -> (sequence, reverse complement)
+        self._body = defaultdict(set)   # k-mer -> primers containing it
+        self._ends = defaultdict(set)   # reverse complement of the 3'-terminal k-mer -> primers
+        self._tail_codes = defaultdict(list)  # 3'-terminal misprime_k-mer code -> primers
+        self._template_codes = {}  # group -> [(strand, codes)]
+        self._issues = {}
+
+    def __len__(self):
+        return len(self.primers)
+
+    @property
+    def issues(self):
+        """Every problem found so far, most stable duplex first."""
+        return sorted(self._issues.values(), key=lambda i: i["dg"])
+
+    def _record(self, kind, a, b, dg, **extra):
+        key = (kind, a, b) if kind == "mispriming" or a <= b else (kind, b, a)
+        if key in self._issues:
+            return None
+        issue = self._issues[key] = {"kind": kind, "a": key[1], "b": key[2], "dg": round(dg, 2), **extra}
+        return issue
+
+    # --- dimers ---
+    def _score_pair(self, a, b):
+        """Records the more stable of the two 3' duplexes between primers `a` and `b`."""
+        sa, sb = self.primers[a][0], self.primers[b][0]
+        dg, length, end = *three_prime_duplex(sa, sb, self.k), a
+        if a != b:
+            dg_b, length_b = three_prime_duplex(sb, sa, self.k)
+            if dg_b < dg:
+                dg, length, end = dg_b, length_b, b
+        if dg < self.dg_limit:
+            return self._record("self-dimer" if a == b else "cross-dimer", a, b, dg, three_prime=end,
+                                length=length)
+        return None
+
+    def dimer_candidates(self, name):
+        """Primers (possibly `name` itself) that pair with the 3' end of `name` or whose 3' end pairs with it."""
+        seq = self.primers[name][0]
+        found = set(self._body.get(reverse_complement(seq[-self.k:]), ()))
+        for i in range(len(seq) - self.k + 1):
+            found |= self._ends.get(seq[i:i + self.k], set())
+        return found
+
+    # --- mispriming ---
+    def _misprime(self, name, group, strand, text, end):
+        """Scores primer `name`, whose 3'-terminal k-mer occurs in template strand `text` ending at `end`."""
+        seq = self.primers[name][0]
+        run = self.misprime_k
+        while run < len(seq) and run < end and seq[-1 - run] == text[end - 1 - run]:
+            run += 1
+        dg = stack_dg(seq[len(seq) - run:])
+        if dg < self.misprime_dg_limit:
+            position = end if strand == "+" else len(text) - end + 1  # forward coordinate of the 3' end
+            return self._record("mispriming", name, group, dg, strand=strand, position=position, length=run)
+        return None
+
+    def _scan_templates(self, name):
+        seq, own = self.primers[name]
+        code = int(kmer_codes(seq[-self.misprime_k:], self.misprime_k)[0]) if len(seq) >= self.misprime_k else -1
+        if code < 0:
+            return []
+        found = []
+        for group, strands in self._template_codes.items():
+            if group == own:
+                continue
+            for strand, codes in strands:
+                text = self.templates[group][0 if strand == "+" else 1]
+                for pos in np.flatnonzero(codes == code).tolist():
+                    issue = self._misprime(name, group, strand, text, pos + self.misprime_k)
+                    if issue:
+                        found.append(issue)
+        return found
+
+    # --- building ---
+    def add(self, name, seq, group=None):
+        """Adds one primer (5'->3', overhang included) and returns the issues it introduces."""
+        seq = as_text(seq).upper()
+        if name in self.primers:
+            raise ValueError(f"Primer {name!r} is already in the pool")
+        self.primers[name] = (seq, group)
+        if len(seq) >= self.k:
+            for i in range(len(seq) - self.k + 1):
+                self._body[seq[i:i + self.k]].add(name)
+            self._ends[reverse_complement(seq[-self.k:])].add(name)
+        if len(seq) >= self.misprime_k:
+            code = int(kmer_codes(seq[-self.misprime_k:], self.misprime_k)[0])
+            if code >= 0:
+                self._tail_codes[code].append(name)
+
+        new = [self._score_pair(name, other) for other in sorted(self.dimer_candidates(name))]
+        return [i for i in new if i] + self._scan_templates(name)
+
+    def add_template(self, group, dna):
+        """Registers the template a construct's primers amplify; returns mispriming issues it introduces."""
+        dna = as_text(dna).upper()
+        rc = reverse_complement(dna)
+        self.templates[group] = (dna, rc)
+        strands = [("+", kmer_codes(dna, self.misprime_k)), ("-", kmer_codes(rc, self.misprime_k))]
+        self._template_codes[group] = strands
+        if not self._tail_codes:
+            return []
+        tails = np.fromiter(self._tail_codes, dtype=np.int64)
+        found = []
+        for strand, codes in strands:
+            text = dna if strand == "+" else rc
+            for pos in np.flatnonzero(np.isin(codes, tails)).tolist():
+                for name in self._tail_codes[int(codes[pos])]:
+                    if self.primers[name][1] != group:
+                        issue = self._misprime(name, group, strand, text, pos + self.misprime_k)
+                        if issue:
+                            found.append(issue)
+        return found
+
+    def add_construct(self, label, fwd, rev, template=None):
+        """Adds a construct's primer pair (and optionally its template); returns the new issues."""
+        new = self.add(f"{label}_F", fwd, group=label) + self.add(f"{label}_R", rev, group=label)
+        if template is not None:
+            new += self.add_template(label, template)
+        return new
+
+
+@traced()
+def check_primer_set(primers, templates=None, **kwargs):
+    """
+    One-shot check of a whole panel: `primers` maps name -> sequence (or
+    name -> (sequence, group)), `templates` maps group -> DNA. Returns the
+    issues, most stable first.
+    """
+    pool = PrimerPool(**kwargs)
+    for name, value in primers.items():
+        seq, group = value if isinstance(value, tuple) else (value, None)
+        pool.add(name, seq, group=group)
+    for group, dna in (templates or {}).items():
+        pool.add_template(group, dna)
+    return pool.issues
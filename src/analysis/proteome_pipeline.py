@@ -0,0 +1,180 @@
+import argparse
+import hashlib
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .disorder_analyzer import find_idrs
+from .disorder_model import predict_disorder_batch, warm
+from .fasta_reader import iter_fasta
+from .score_store import sequence_key
+from .tracing import traced
+
+SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("seq_key", pa.uint64()),
+    ("length", pa.int32()),
+    ("mean_disorder", pa.float32()),
+    ("scores", pa.list_(pa.float32())),
+    ("idr_starts", pa.list_(pa.int32())),
+    ("idr_ends", pa.list_(pa.int32())),
+])
+
+
+@traced()
+def metapredict_batch(sequences):
+    """Default predictor: metapredict's batch mode, one score array per input sequence."""
+    return [np.asarray(scores, dtype=np.float32) for scores in predict_disorder_batch(sequences)]
+
+
+def _init_worker():
+    # Load the network once per worker instead of once per batch
+    warm()
+
+
+def length_bucketed_batches(records, batch_size=64, buffer_size=4096):
+    """
+    Groups (id, sequence) records into batches of similar length.
+    At most `buffer_size` records are held at once, so memory stays flat.
+    """
+    buffer = []
+    for record in records:
+        buffer.append(record)
+        if len(buffer) >= buffer_size:
+            buffer.sort(key=lambda r: len(r[1]))
+            for i in range(0, len(buffer), batch_size):
+                yield buffer[i:i + batch_size]
+            buffer = []
+    buffer.sort(key=lambda r: len(r[1]))
+    for i in range(0, len(buffer), batch_size):
+        yield buffer[i:i + batch_size]
+
+
+def _part_name(ids):
+    digest = hashlib.sha1("\n".join(ids).encode("utf-8")).hexdigest()[:16]
+    return f"part-{digest}.parquet"
+
+
+def score_batch(batch, out_dir, predictor=metapredict_batch, threshold=0.5, min_length=30):
+    """Predicts one batch and writes it as its own Parquet part. Returns the record count."""
+    ids = [rid for rid, _ in batch]
+    all_scores = predictor([seq for _, seq in batch])
+
+    columns = {name: [] for name in SCHEMA.names}
+    for (rid, seq), scores in zip(batch, all_scores):
+        scores = np.asarray(scores, dtype=np.float32)
+        idrs = find_idrs(scores, threshold=threshold, min_length=min_length)
+        columns["id"].append(rid)
+        columns["seq_key"].append(sequence_key(seq))
+        columns["length"].append(len(scores))
+        columns["mean_disorder"].append(float(scores.mean()) if len(scores) else 0.0)
+        columns["scores"].append(scores)
+        columns["idr_starts"].append([d["start"] for d in idrs])
+        columns["idr_ends"].append([d["end"] for d in idrs])
+
+    table = pa.table(columns, schema=SCHEMA)
+    path = os.path.join(out_dir, _part_name(ids))
+    tmp = f"{path}.tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)  # a part only becomes visible once complete
+    return len(ids)
+
+
+def completed_ids(out_dir):
+    """IDs already written to `out_dir`, read from the id column only."""
+    done = set()
+    if not os.path.isdir(out_dir):
+        return done
+    for name in os.listdir(out_dir):
+        if name.startswith("part-") and name.endswith(".parquet"):
+            done.update(pq.read_table(os.path.join(out_dir, name), columns=["id"]).column("id").to_pylist())
+    return done
+
+
+def iter_results(out_dir):
+    """Yields (id, scores, idrs) from a pipeline output directory, one part at a time."""
+    for name in sorted(os.listdir(out_dir)):
+        if not (name.startswith("part-") and name.endswith(".parquet")):
+            continue
+        table = pq.read_table(os.path.join(out_dir, name))
+        for row in table.to_pylist():
+            idrs = [{"start": s, "end": e, "type": "IDR"} for s, e in zip(row["idr_starts"], row["idr_ends"])]
+            yield row["id"], np.asarray(row["scores"], dtype=np.float32), idrs
+
+
+def iter_score_rows(out_dir):
+    """Yields (sequence_key, scores) pairs, the form `ScoreStore.bulk_import` accepts."""
+    for name in sorted(os.listdir(out_dir)):
+        if not (name.startswith("part-") and name.endswith(".parquet")):
+            continue
+        table = pq.read_table(os.path.join(out_dir, name), columns=["seq_key", "scores"])
+        keys = table.column("seq_key").to_pylist()
+        scores = table.column("scores").combine_chunks()
+        flat = scores.values.to_numpy(zero_copy_only=False)
+        offsets = scores.offsets.to_numpy()
+        for i, key in enumerate(keys):
+            yield key, flat[offsets[i]:offsets[i + 1]]
+
+
+@traced()
+def run_disorder_pipeline(fasta_path, out_dir, workers=None, batch_size=64, threshold=0.5,
+                          min_length=30, predictor=metapredict_batch):
+    """
+    Scores every sequence in a FASTA file and writes Parquet parts to `out_dir`.
+
+    Sequences already present in `out_dir` are skipped, so an interrupted run
+    resumes where it stopped. `workers=0` runs in-process; otherwise a process
+    pool is used with a bounded number of batches in flight.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    done = completed_ids(out_dir)
+    stats = {"processed": 0, "skipped": 0}
+
+    def pending_records():
+        for rid, seq in iter_fasta(fasta_path):
+            if rid in done:
+                stats["skipped"] += 1
+                continue
+            yield rid, seq
+
+    batches = length_bucketed_batches(pending_records(), batch_size=batch_size)
+    kwargs = {"predictor": predictor, "threshold": threshold, "min_length": min_length}
+
+    if workers == 0:
+        for batch in batches:
+            stats["processed"] += score_batch(batch, out_dir, **kwargs)
+        return stats
+
+    workers = workers or os.cpu_count() or 1
+    initializer = _init_worker if predictor is metapredict_batch else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+        in_flight = set()
+        for batch in batches:
+            if len(in_flight) >= workers * 2:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                stats["processed"] += sum(f.result() for f in finished)
+            in_flight.add(pool.submit(score_batch, batch, out_dir, **kwargs))
+        stats["processed"] += sum(f.result() for f in in_flight)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a proteome FASTA for disorder.")
+    parser.add_argument("fasta")
+    parser.add_argument("out_dir")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--min-length", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    stats = run_disorder_pipeline(args.fasta, args.out_dir, workers=args.workers, batch_size=args.batch_size,
+                                  threshold=args.threshold, min_length=args.min_length)
+    print(f"Scored {stats['processed']} sequences ({stats['skipped']} already done) -> {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import math
+from collections import deque
+from functools import lru_cache
+from itertools import product
+
+from .tracing import traced
+
+# name: (recognition site, top-strand cut, bottom-strand cut)
+# Cuts are offsets from the start of the site on the top strand, REBASE/EMBOSS
+# style: 1 means "after the first base". Type IIS enzymes cut outside the site.
+ENZYMES = {
+    "AatII": ("GACGTC", 5, 1), "AccI": ("GTMKAC", 2, 4), "AflII": ("CTTAAG", 1, 5),
+    "AgeI": ("ACCGGT", 1, 5), "ApaI": ("GGGCCC", 5, 1), "AscI": ("GGCGCGCC", 2, 6),
+    "AvaI": ("CYCGRG", 1, 5), "AvrII": ("CCTAGG", 1, 5), "BamHI": ("GGATCC", 1, 5),
+    "BanII": ("GRGCYC", 5, 1), "BglI": ("GCCNNNNNGGC", 7, 4), "BglII": ("AGATCT", 1, 5),
+    "BsaI": ("GGTCTC", 7, 11), "BsiWI": ("CGTACG", 1, 5), "BsmBI": ("CGTCTC", 7, 11),
+    "BspHI": ("TCATGA", 1, 5), "ClaI": ("ATCGAT", 2, 4), "DraIII": ("CACNNNGTG", 6, 3),
+    "EcoRI": ("GAATTC", 1, 5), "EcoRV": ("GATATC", 3, 3), "FseI": ("GGCCGGCC", 6, 2),
+    "HincII": ("GTYRAC", 3, 3), "HindIII": ("AAGCTT", 1, 5), "HpaI": ("GTTAAC", 3, 3),
+    "KpnI": ("GGTACC", 5, 1), "MfeI": ("CAATTG", 1, 5), "MluI": ("ACGCGT", 1, 5),
+    "NaeI": ("GCCGGC", 3, 3), "NcoI": ("CCATGG", 1, 5), "NdeI": ("CATATG", 2, 4),
+    "NheI": ("GCTAGC", 1, 5), "NotI": ("GCGGCCGC", 2, 6), "NsiI": ("ATGCAT", 5, 1),
+    "PacI": ("TTAATTAA", 5, 3), "PflMI": ("CCANNNNNTGG", 7, 4), "PmeI": ("GTTTAAAC", 4, 4),
+    "PstI": ("CTGCAG", 5, 1), "PvuII": ("CAGCTG", 3, 3), "SacI": ("GAGCTC", 5, 1),
+    "SalI": ("GTCGAC", 1, 5), "SapI": ("GCTCTTC", 8, 11), "SbfI": ("CCTGCAGG", 6, 2),
+    "ScaI": ("AGTACT", 3, 3), "SfiI": ("GGCCNNNNNGGCC", 8, 5), "SmaI": ("CCCGGG", 3, 3),
+    "SpeI": ("ACTAGT", 1, 5), "SphI": ("GCATGC", 5, 1), "StuI": ("AGGCCT", 3, 3),
+    "StyI": ("CCWWGG", 1, 5), "SwaI": ("ATTTAAAT", 4, 4), "XbaI": ("TCTAGA", 1, 5),
+    "XhoI": ("CTCGAG", 1, 5), "XmnI": ("GAANNNNTTC", 5, 5),
+}
+
+# The enzymes offered for cloning overhangs in the GUI
+CLONING_ENZYMES = {name: ENZYMES[name] for name in ("EcoRI", "BamHI", "HindIII", "NotI", "XhoI")}
+
+IUPAC_BASES = {
+    'A': "A", 'C': "C", 'G': "G", 'T': "T", 'R': "AG", 'Y': "CT", 'S': "CG", 'W': "AT",
+    'K': "GT", 'M': "AC", 'B': "CGT", 'D': "AGT", 'H': "ACT", 'V': "ACG", 'N': "ACGT",
+}
+IUPAC_COMPLEMENT = str.maketrans("ACGTRYSWKMBDHVN", "TGCAYRSWMKVHDBN")
+# Per-position base sets as bitmasks over the A/C/G/T symbols 0..3
+IUPAC_MASKS = {code: sum(1 << "ACGT".index(b) for b in bases) for code, bases in IUPAC_BASES.items()}
+
+# A/C/G/T -> 0..3; anything else (N, gaps) -> 4, which resets the automaton
+_SYMBOLS = bytes.maketrans(b"ACGTacgt", b"\x00\x01\x02\x03\x00\x01\x02\x03")
+
+MAX_EXPANSION = 4096
+# Degenerate sites are matched on their most specific stretch, expanded to at most this many words
+MAX_ANCHOR_WORDS = 256
+
+
+def load_rebase_emboss(path):
+    """
+    Reads a REBASE enzyme list in EMBOSS `emboss_e.###` format
+    (name, site, length, ncuts, blunt, c1, c2, c3, c4 per line).
+    Enzymes without a defined cut position are skipped.
+    """
+    enzymes = {}
+    with open(path) as fh:
+        for line in fh:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.split()
+            if len(fields) < 7 or int(fields[3]) == 0:
+                continue
+            enzymes[fields[0]] = (fields[1].upper(), int(fields[5]), int(fields[6]))
+    return enzymes
+
+
+def expand_site(site):
+    """All concrete A/C/G/T sequences matched by an IUPAC site."""
+    choices = [IUPAC_BASES[b] for b in site]
+    n = 1
+    for c in choices:
+        n *= len(c)
+    if n > MAX_EXPANSION:
+        raise ValueError(f"Site {site} expands to {n} sequences; too degenerate to compile.")
+    return ["".join(p) for p in product(*choices)]
+
+
+def site_anchor(site):
+    """
+    The (offset, substring) of `site` the automaton matches on. Sites with at
+    most MAX_EXPANSION concrete words are matched whole; for the rest it is the
+    stretch without N carrying the most sequence information, limited to
+    MAX_ANCHOR_WORDS words, and the remainder of the site is checked per base.
+    """
+    if math.prod(len(IUPAC_BASES[b]) for b in site) <= MAX_EXPANSION:
+        return 0, site
+    best = None
+    for i in range(len(site)):
+        words, bits = 1, 0.0
+        for j in range(i, len(site)):
+            n = len(IUPAC_BASES[site[j]])
+            words *= n
+            if n == 4 or words > MAX_ANCHOR_WORDS:
+                break
+            bits += 2 - math.log2(n)
+            if best is None or (bits, -words) > best[0]:
+                best = ((bits, -words), i, j + 1)
+    if best is None:
+        raise ValueError(f"Site {site} has no specific base to anchor on.")
+    _, start, end = best
+    return start, site[start:end]
+
+
+class RestrictionAutomaton:
+    """
+    Aho-Corasick automaton over every concrete sequence of every enzyme site,
+    on both strands, compiled to a dense transition table. One left-to-right
+    pass over the DNA reports every occurrence, overlapping ones included.
+    Sites too degenerate to expand (long N runs) are entered as their
+    `site_anchor` only, and an anchor hit is verified against the full site.
+    """
+
+    def __init__(self, enzymes):
+        self.enzymes = dict(enzymes)
+        goto, outputs = [[-1] * 4], [[]]
+
+        for name, (site, _, _) in self.enzymes.items():
+            rc = site.translate(IUPAC_COMPLEMENT)[::-1]
+            strands = [("+", site)] if rc == site else [("+", site), ("-", rc)]
+            for strand, pattern in strands:
+                offset, anchor = site_anchor(pattern)
+                check = None if anchor == pattern else tuple(IUPAC_MASKS[b] for b in pattern)
+                for word in expand_site(anchor):
+                    state = 0
+                    for ch in word:
+                        sym = "ACGT".index(ch)
+                        if goto[state][sym] == -1:
+                            goto[state][sym] = len(goto)
+                            goto.append([-1] * 4)
+                            outputs.append([])
+                        state = goto[state][sym]
+                    outputs[state].append((name, strand, len(word) + offset, check))
+
+        # Breadth-first failure links, folded into a complete DFA
+        fail = [0] * len(goto)
+        delta = [row[:] + [0] for row in goto]
+        queue = deque()
+        for sym in range(4):
+            nxt = goto[0][sym]
+            if nxt == -1:
+                delta[0][sym] = 0
+            else:
+                queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for sym in range(4):
+                nxt = goto[state][sym]
+                if nxt == -1:
+                    delta[state][sym] = delta[fail[state]][sym]
+                else:
+                    fail[nxt] = delta[fail[state]][sym]
+                    queue.append(nxt)
+
+        self.delta = delta
+        self.outputs = [tuple(o) for o in outputs]
+
+    def find(self, dna):
+        """Yields (enzyme, strand, start) for every site, with 0-based starts."""
+        symbols = (dna.encode("ascii") if isinstance(dna, str) else bytes(dna)).translate(_SYMBOLS)
+        delta, outputs = self.delta, self.outputs
+        state = 0
+        for i, sym in enumerate(symbols):
+            state = delta[state][sym] if sym < 4 else 0
+            if outputs[state]:
+                for name, strand, reach, check in outputs[state]:
+                    start = i - reach + 1
+                    if check is not None and not self._matches(symbols, start, check):
+                        continue
+                    yield name, strand, start
+
+    @staticmethod
+    def _matches(symbols, start, masks):
+        if start < 0 or start + len(masks) > len(symbols):
+            return False
+        return all(s < 4 and mask >> s & 1 for s, mask in zip(symbols[start:start + len(masks)], masks))
+
+
+@lru_cache(maxsize=32)
+def _compiled(enzyme_items):
+    return RestrictionAutomaton(enzyme_items)
+
+
+def compile_enzymes(enzymes=None):
+    """Returns the cached automaton for an enzyme set (defaults to the full list)."""
+    return _compiled(tuple(sorted((enzymes or ENZYMES).items())))
+
+
+@traced()
+def find_restriction_sites(dna, enzymes=None):
+    """
+    Finds every recognition site on both strands.
+
+    Each hit gives the 0-based site start/end, strand, the cut positions on the
+    forward and reverse strands (forward coordinates, cut is before that base),
+    and the reading frame / codon of the site start within the construct.
+    """
+    automaton = compile_enzymes(enzymes)
+    hits = []
+    for name, strand, start in automaton.find(dna):
+        site, top, bottom = automaton.enzymes[name]
+        end = start + len(site)
+        if strand == "+":
+            cut_fwd, cut_rev = start + top, start + bottom
+        else:
+            cut_fwd, cut_rev = end - bottom, end - top
+        hits.append({
+            "enzyme": name,
+            "site": site,
+            "start": start,
+            "end": end,
+            "strand": strand,
+            "cut_fwd": cut_fwd,
+            "cut_rev": cut_rev,
+            "frame": start % 3,
+            "codon": start // 3 + 1,
+        })
+    hits.sort(key=lambda h: (h["start"], h["enzyme"]))
+    return hits
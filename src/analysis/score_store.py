@@ -0,0 +1,233 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from .encoded_seq import EncodedSeq
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+INDEX_DTYPE = np.dtype([("key", "<u8"), ("offset", "<u8"), ("length", "<u4")])
+
+
+def sequence_key(sequence):
+    """64-bit content hash of a protein sequence (case-insensitive)."""
+    data = sequence.data if isinstance(sequence, EncodedSeq) else sequence.upper().encode("ascii")
+    digest = hashlib.blake2b(data, digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _default_store_dir():
+    base = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.environ.get("GENE_WEAVING_SCORE_STORE", os.path.join(base, "gene_weaving", "scores"))
+
+
+class ScoreStore:
+    """
+    Persistent archive of per-residue disorder scores.
+
+    All scores live back to back in one flat float array (`scores.bin`) that is
+    memory-mapped for reading, so a lookup returns a zero-copy view. A sorted
+    index (`index.npy`) maps each sequence hash to its offset and length.
+
+    Several processes may share one store. Appends and index rewrites happen
+    under an exclusive lock on `store.lock`: offsets come from the locked file
+    size and the index is re-read before this process's entries are merged in.
+    `put` only appends; its index entries are written once `flush_every` are
+    pending or `flush_after_s` after the oldest one, on `flush()` and at exit.
+    `bulk_import` flushes straight away. The index is only re-read when its
+    file has changed.
+    """
+
+    def __init__(self, path=None, dtype="float32", flush_every=256, flush_after_s=1.0):
+        self.path = path or _default_store_dir()
+        os.makedirs(self.path, exist_ok=True)
+        self._data_path = os.path.join(self.path, "scores.bin")
+        self._index_path = os.path.join(self.path, "index.npy")
+        self._meta_path = os.path.join(self.path, "meta.json")
+        self._lock_path = os.path.join(self.path, "store.lock")
+        self.flush_every = flush_every
+        self.flush_after_s = flush_after_s
+
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as fh:
+                dtype = json.load(fh)["dtype"]
+        else:
+            with open(self._meta_path, "w") as fh:
+                json.dump({"dtype": np.dtype(dtype).name}, fh)
+        self.dtype = np.dtype(dtype)
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._index = np.zeros(0, dtype=INDEX_DTYPE)
+        self._index_stamp = None
+        self._flush_timer = None
+        self._data = None
+        self._reload_index()
+        atexit.register(self.flush)
+
+    # --- reading ---
+    def _stamp(self):
+        st = os.stat(self._index_path)
+        return st.st_ino, st.st_mtime_ns, st.st_size  # flushes os.replace the file: a new inode
+
+    def _reload_index(self):
+        try:
+            stamp = self._stamp()
+        except OSError:
+            return
+        if stamp != self._index_stamp:
+            self._index = np.load(self._index_path)
+            self._index_stamp = stamp
+
+    def _mapped(self, end):
+        """Returns a memmap covering at least `end` items, remapping if the file grew."""
+        if self._data is None or len(self._data) < end:
+            self._data = np.memmap(self._data_path, dtype=self.dtype, mode="r")
+        return self._data
+
+    def _locate(self, key):
+        hit = self._pending.get(key)
+        if hit is not None:
+            return hit
+        pos = np.searchsorted(self._index["key"], key)
+        if pos < len(self._index) and self._index["key"][pos] == key:
+            row = self._index[pos]
+            return int(row["offset"]), int(row["length"])
+        return None
+
+    def get(self, sequence):
+        """Returns a read-only view of the stored scores for `sequence`, or None."""
+        if not sequence:
+            return None
+        key = sequence_key(sequence)
+        with self._lock:
+            hit = self._locate(key)
+            if hit is None:
+                self._reload_index()
+                hit = self._locate(key)
+            if hit is None or hit[1] != len(sequence):
+                return None
+            offset, length = hit
+            return self._mapped(offset + length)[offset:offset + length]
+
+    def __contains__(self, sequence):
+        return self.get(sequence) is not None
+
+    def __len__(self):
+        return len(self._index) + len(self._pending)
+
+    # --- writing ---
+    @contextmanager
+    def _exclusive(self):
+        """Holds the thread lock and the cross-process lock on `store.lock`."""
+        with self._lock, open(self._lock_path, "a+b") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _append_items(self, items):
+        """Appends the entries not yet in the store; the caller holds `_exclusive`."""
+        self._reload_index()
+        added = 0
+        with open(self._data_path, "ab") as fh:
+            end = fh.seek(0, os.SEEK_END)  # other processes may have appended since this one last wrote
+            for seq_or_key, scores in items:
+                key = seq_or_key if isinstance(seq_or_key, int) else sequence_key(seq_or_key)
+                if self._locate(key) is not None:
+                    continue
+                scores = np.ascontiguousarray(scores, dtype=self.dtype)
+                fh.write(scores.tobytes())
+                self._pending[key] = (end // self.dtype.itemsize, len(scores))
+                end += scores.nbytes
+                added += 1
+        return added
+
+    def put(self, sequence, scores):
+        """Stores the scores for one sequence; its index entry is written with the next flush."""
+        with self._exclusive():
+            self._append_items([(sequence, scores)])
+            if len(self._pending) >= self.flush_every or self.flush_after_s <= 0:
+                self._flush()
+            elif self._pending and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_after_s, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def bulk_import(self, items):
+        """
+        Appends many (sequence or sequence_key, scores) pairs with a single index
+        rewrite. Entries already in the store are skipped. Returns the number added.
+        """
+        with self._exclusive():
+            added = self._append_items(items)
+            self._flush()
+        return added
+
+    def flush(self):
+        """Writes the pending index entries of scores added with `put`."""
+        if self._pending:
+            with self._exclusive():
+                self._flush()
+
+    def _flush(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if not self._pending:
+            return
+        self._reload_index()
+        new = np.array([(k, o, n) for k, (o, n) in self._pending.items()], dtype=INDEX_DTYPE)
+        merged = np.concatenate([self._index, new])
+        merged = merged[np.argsort(merged["key"], kind="stable")]
+        # Two processes can score the same sequence before either flushes; the first entry wins
+        merged = merged[np.concatenate(([True], merged["key"][1:] != merged["key"][:-1]))]
+        tmp = f"{self._index_path}.{os.getpid()}.tmp.npy"
+        np.save(tmp, merged)
+        os.replace(tmp, self._index_path)
+        self._index = merged
+        self._index_stamp = self._stamp()
+        self._pending.clear()
+
+
+def import_pipeline_results(store, out_dir):
+    """Fills a store from the Parquet output of `proteome_pipeline.run_disorder_pipeline`."""
+    from .proteome_pipeline import iter_score_rows
+
+    return store.bulk_import(iter_score_rows(out_dir))
+
+
+_default_store = None
+
+
+def get_score_store():
+    """Returns the process-wide score store, creating it on first use."""
+    global _default_store
+    if _default_store is None:
+        _default_store = ScoreStore()
+    return _default_store
+
+
+def configure_score_store(path=None, dtype="float32"):
+    """Replaces the process-wide score store, e.g. to point it at a shared archive."""
+    global _default_store
+    _default_store = ScoreStore(path, dtype=dtype)
+    return _default_store
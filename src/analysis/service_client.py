@@ -0,0 +1,57 @@
+"""
+Thin client for `analysis_service`: sends disorder predictions (and any other
+exposed function) to a shared local service instead of running them here.
+"""
+import time
+from importlib import import_module
+
+import numpy as np
+
+_http = import_module(__name__[:-len("analysis.service_client")] + "api.http_client")
+
+
+class ServiceUnavailable(RuntimeError):
+    pass
+
+
+class ServiceClient:
+    """Calls a running analysis service; 503 responses are retried after their Retry-After delay."""
+
+    def __init__(self, url, timeout=300, retries=20):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+
+    def _request(self, method, path, payload=None):
+        session = _http.get_session()
+        for attempt in range(self.retries + 1):
+            resp = session.request(method, f"{self.url}{path}", json=payload, timeout=self.timeout)
+            if resp.status_code != 503 or attempt == self.retries:
+                break
+            retry_after = resp.headers.get("Retry-After", "")
+            time.sleep(float(retry_after) if retry_after.replace(".", "", 1).isdigit() else 0.05 * 2 ** attempt)
+        if resp.status_code == 503:
+            raise ServiceUnavailable(f"{self.url} is overloaded")
+        if resp.status_code != 200:
+            raise RuntimeError(f"{self.url}{path}: {resp.status_code} {resp.text[:200]}")
+        return resp.json()
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def disorder_scores(self, sequences, persist=True):
+        """
+        Per-residue scores for each sequence, predicted (or looked up) by the
+        service. With `persist=False` the service does not store new predictions.
+        """
+        body = self._request("POST", "/disorder", {"sequences": list(sequences), "persist": persist})
+        return [np.asarray(scores, dtype=np.float32) for scores in body["scores"]]
+
+    def idrs(self, sequence, threshold=0.5, min_length=30):
+        body = self._request("POST", "/idrs", {"sequence": sequence, "threshold": threshold,
+                                               "min_length": min_length})
+        return body["idrs"]
+
+    def call(self, name, **kwargs):
+        """Runs one of the service's exposed functions and returns its JSON-decoded result."""
+        return self._request("POST", f"/call/{name}", kwargs)["result"]
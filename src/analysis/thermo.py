@@ -0,0 +1,138 @@
+from functools import lru_cache
+
+import numpy as np
+
+R = 1.987  # cal/(mol*K)
+
+# SantaLucia (1998) unified nearest-neighbor parameters, keyed by the top-strand
+# dinucleotide 5'->3': (dH kcal/mol, dS cal/(mol*K))
+NN_PARAMS = {
+    "AA": (-7.9, -22.2), "TT": (-7.9, -22.2),
+    "AT": (-7.2, -20.4), "TA": (-7.2, -21.3),
+    "CA": (-8.5, -22.7), "TG": (-8.5, -22.7),
+    "GT": (-8.4, -22.4), "AC": (-8.4, -22.4),
+    "CT": (-7.8, -21.0), "AG": (-7.8, -21.0),
+    "GA": (-8.2, -22.2), "TC": (-8.2, -22.2),
+    "CG": (-10.6, -27.2), "GC": (-9.8, -24.4),
+    "GG": (-8.0, -19.9), "CC": (-8.0, -19.9),
+}
+# Duplex initiation, charged once per terminal base pair
+INIT_PARAMS = {"A": (2.3, 4.1), "T": (2.3, 4.1), "G": (0.1, -2.8), "C": (0.1, -2.8)}
+
+HAIRPIN_LOOP_DG = 4.0  # kcal/mol, typical for 3-6 nt loops
+
+# A/C/G/T codes 0-3; 4 marks N, other IUPAC codes and row padding
+_CODE = np.full(256, 4, dtype=np.uint8)
+for _i, _b in enumerate("ACGT"):
+    _CODE[ord(_b)] = _CODE[ord(_b.lower())] = _i
+
+_NN_DH = np.zeros(25)
+_NN_DS = np.zeros(25)
+for _pair, (_dh, _ds) in NN_PARAMS.items():
+    _NN_DH["ACGT".index(_pair[0]) * 5 + "ACGT".index(_pair[1])] = _dh
+    _NN_DS["ACGT".index(_pair[0]) * 5 + "ACGT".index(_pair[1])] = _ds
+_INIT_DH = np.array([INIT_PARAMS[b][0] for b in "ACGT"] + [0.0])
+_INIT_DS = np.array([INIT_PARAMS[b][1] for b in "ACGT"] + [0.0])
+
+_COMPLEMENT = str.maketrans("ACGTN", "TGCAN")
+
+
+def encode(seqs, width):
+    """
+    Encodes sequences into an (n, width) array of A/C/G/T codes; ambiguous
+    bases and the padding of rows shorter than `width` are coded 4.
+    """
+    raw = "".join(s[:width].upper().ljust(width, "N") for s in seqs).encode("ascii")
+    return _CODE[np.frombuffer(raw, dtype=np.uint8)].reshape(len(seqs), width)
+
+
+def tm_prefix_matrix(codes, na=0.05, primer_conc=250e-9):
+    """
+    Melting temperature of every prefix length of every row of `codes`.
+
+    Nearest-neighbor enthalpy and entropy are accumulated with a cumulative sum
+    along each row, so all candidate lengths are scored in one pass. Returns an
+    (n, width) array where column L-1 holds the Tm (deg C) of the L-nt prefix;
+    column 0 and every prefix containing a non-ACGT code are NaN.
+    """
+    n, width = codes.shape
+    steps = codes[:, :-1].astype(np.intp) * 5 + codes[:, 1:]
+    dh = np.concatenate([np.zeros((n, 1)), np.cumsum(_NN_DH[steps], axis=1)], axis=1)
+    ds = np.concatenate([np.zeros((n, 1)), np.cumsum(_NN_DS[steps], axis=1)], axis=1)
+
+    dh = dh + _INIT_DH[codes[:, :1]] + _INIT_DH[codes]
+    ds = ds + _INIT_DS[codes[:, :1]] + _INIT_DS[codes]
+    ds = ds + 0.368 * np.arange(width) * np.log(na)  # salt correction, (N - 1) phosphates
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tm = 1000 * dh / (ds + R * np.log(primer_conc / 4)) - 273.15
+    tm[:, 0] = np.nan
+    tm[np.cumsum(codes > 3, axis=1) > 0] = np.nan
+    return tm
+
+
+def calculate_tm_nn(seq, na=0.05, primer_conc=250e-9):
+    """
+    Nearest-neighbor Tm (deg C) of a primer binding to its perfect complement.
+    Raises ValueError for bases other than A/C/G/T, which have no parameters.
+    """
+    if len(seq) < 2:
+        return 0.0
+    if set(seq.upper()) - set("ACGT"):
+        raise ValueError(f"Tm needs an unambiguous A/C/G/T sequence, got {seq!r}.")
+    return float(tm_prefix_matrix(encode([seq], len(seq)), na=na, primer_conc=primer_conc)[0, -1])
+
+
+def _dg37(pair):
+    dh, ds = NN_PARAMS[pair]
+    return dh - 310.15 * ds / 1000
+
+
+def stack_dg(seq):
+    """dG37 of a perfectly paired stretch, initiation included."""
+    dg = sum(_dg37(seq[i:i + 2]) for i in range(len(seq) - 1))
+    for end in (seq[0], seq[-1]):
+        dh, ds = INIT_PARAMS[end]
+        dg += dh - 310.15 * ds / 1000
+    return dg
+
+
+@lru_cache(maxsize=65536)
+def duplex_dg(a, b):
+    """
+    Most stable contiguous duplex between `a` and `b` (both 5'->3').
+    Returns (dG37 kcal/mol, True if the duplex includes the 3' end of `a`).
+    """
+    a, b = a.upper(), b.upper()
+    rb = b.translate(_COMPLEMENT)[::-1]  # a[i] pairs with b where a[i] == rb[k]
+    best, best_3p = 0.0, False
+    for off in range(-len(rb) + 1, len(a)):
+        run = 0
+        for i in range(max(0, off), min(len(a), off + len(rb)) + 1):
+            paired = i < min(len(a), off + len(rb)) and a[i] == rb[i - off] and a[i] in "ACGT"
+            if paired:
+                run += 1
+                continue
+            if run >= 3:
+                dg = stack_dg(a[i - run:i])
+                if dg < best:
+                    best, best_3p = dg, i == len(a)
+            run = 0
+    return best, best_3p
+
+
+@lru_cache(maxsize=65536)
+def hairpin_dg(seq, min_loop=3, min_stem=3):
+    """dG37 of the most stable single hairpin in `seq` (0.0 if none)."""
+    seq = seq.upper()
+    comp = seq.translate(_COMPLEMENT)
+    n, best = len(seq), 0.0
+    for i in range(n):
+        for j in range(n - 1, i + min_loop + 2 * min_stem - 2, -1):
+            stem = 0
+            while i + stem < j - stem - min_loop and seq[i + stem] == comp[j - stem] and seq[i + stem] in "ACGT":
+                stem += 1
+            if stem >= min_stem:
+                dg = stack_dg(seq[i:i + stem]) + HAIRPIN_LOOP_DG
+                best = min(best, dg)
+    return best
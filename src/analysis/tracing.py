@@ -0,0 +1,12 @@
+"""
+Binds the analysis modules to the shared span/counter registry in `api.telemetry`.
+The packages are imported either top-level (app, core_logic) or under `src.`
+(tests), so the sibling package is resolved from this module's own name.
+"""
+from importlib import import_module
+
+_telemetry = import_module(__name__[:-len("analysis.tracing")] + "api.telemetry")
+
+span = _telemetry.span
+traced = _telemetry.traced
+count = _telemetry.count
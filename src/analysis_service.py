@@ -0,0 +1,312 @@
+"""
+Local analysis service: one warm metapredict model shared by every session and pipeline.
+
+    python src/analysis_service.py --port 8765
+    GENE_WEAVING_SERVICE=http://127.0.0.1:8765 python main.py    # GUI/CLI as thin clients
+
+Concurrent disorder requests are held for a few milliseconds and scored as a
+single metapredict batch; identical sequences in flight share one prediction
+and sequences already in the score store are answered without predicting.
+Requests sent with "persist": false (mutagenesis scans) are predicted but not
+added to the store.
+Once `max_pending` sequences are waiting, new requests get 503 + Retry-After.
+The fetchers and design functions are exposed under POST /call/<name>.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import numpy as np
+
+# Same import setup as core_logic: resolve the api/analysis packages from here
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api import telemetry
+from api.jaspar_fetcher import get_pfm_data, search_jaspar_motifs
+from api.string_fetcher import get_interactions
+from api.uniprot_fetcher import get_uniprot_data, get_uniprot_id_from_symbol
+from analysis import disorder_model
+from analysis.crispr_designer import design_grnas
+from analysis.disorder_analyzer import find_idrs
+from analysis.primer_designer import generate_primers, get_optimized_dna, get_primer_quality, scan_restriction_sites
+from analysis.score_store import get_score_store
+
+# Everything here is I/O-bound or pure Python; disorder prediction has its own endpoints
+FUNCTIONS = {fn.__name__: fn for fn in (
+    get_uniprot_data, get_uniprot_id_from_symbol, get_interactions, search_jaspar_motifs, get_pfm_data,
+    design_grnas, get_optimized_dna, generate_primers, get_primer_quality, scan_restriction_sites,
+)}
+
+MAX_BODY = 64 * 1024 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class Overloaded(Exception):
+    pass
+
+
+class DisorderBatcher:
+    """
+    Collects concurrent `score` calls into micro-batches for one predictor.
+
+    The first queued sequence opens a `window_ms` window; everything queued by
+    the time it closes (up to `max_batch`) is predicted together on a single
+    worker thread, so the model is never used from two threads at once.
+    Sequences queued while a batch is running form the next batch straight away.
+    """
+
+    def __init__(self, predictor=None, store=None, window_ms=5.0, max_batch=64, max_pending=1024):
+        self.predictor = predictor or disorder_model.predict_disorder_batch
+        self.store = store if store is not None else get_score_store()
+        self.window_s = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.stats = {"requests": 0, "store_hits": 0, "deduplicated": 0, "rejected": 0, "batches": 0,
+                      "predicted": 0}
+        self._waiting = {}  # sequence -> future, from enqueue until its batch finishes
+        self._persist = set()  # waiting sequences that some request wants stored
+        self._queue = deque()
+        self._wakeup = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gw-predict")
+        self._task = None
+
+    @property
+    def pending(self):
+        return len(self._waiting)
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    def _reject(self):
+        self.stats["rejected"] += 1
+        telemetry.count("service_rejected")
+        raise Overloaded(f"{len(self._waiting)} sequences pending")
+
+    def _submit(self, sequence, persist=True):
+        """Stored scores, or the future of the sequence's queued prediction. Never awaits."""
+        self.stats["requests"] += 1
+        if not sequence:
+            return np.zeros(0, dtype=np.float32)
+        scores = self.store.get(sequence)
+        if scores is not None:
+            self.stats["store_hits"] += 1
+            return scores
+        future = self._waiting.get(sequence)
+        if future is not None:
+            self.stats["deduplicated"] += 1
+        else:
+            if len(self._waiting) >= self.max_pending:
+                self._reject()
+            future = self._waiting[sequence] = asyncio.get_running_loop().create_future()
+            self._queue.append(sequence)
+            self._wakeup.set()
+        if persist:
+            self._persist.add(sequence)
+        return future
+
+    async def score(self, sequence, persist=True):
+        """
+        Scores for one sequence; raises `Overloaded` when too much work is already
+        queued. With `persist=False` a new prediction is not added to the store.
+        """
+        result = self._submit(sequence, persist)
+        return await asyncio.shield(result) if isinstance(result, asyncio.Future) else result
+
+    async def score_many(self, sequences, persist=True):
+        """
+        Scores for several sequences, all or nothing: if they do not all fit in
+        the queue, `Overloaded` is raised before any of them is queued.
+        """
+        fresh = {s for s in sequences if s and s not in self._waiting and self.store.get(s) is None}
+        if len(self._waiting) + len(fresh) > self.max_pending:
+            self._reject()
+        # Queued synchronously, so no other request can take the capacity checked above
+        results = [self._submit(s, persist) for s in sequences]
+        futures = [r for r in results if isinstance(r, asyncio.Future)]
+        outcomes = iter(await asyncio.gather(*(asyncio.shield(f) for f in futures), return_exceptions=True))
+        results = [next(outcomes) if isinstance(r, asyncio.Future) else r for r in results]
+        for r in results:
+            if isinstance(r, BaseException):
+                raise r
+        return results
+
+    def _predict(self, batch):
+        with telemetry.span("service.batch", size=len(batch)):
+            return [np.asarray(s, dtype=np.float32) for s in self.predictor(batch)]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            if len(self._queue) < self.max_batch:
+                await asyncio.sleep(self.window_s)
+            while self._queue:
+                batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+                self.stats["batches"] += 1
+                self.stats["predicted"] += len(batch)
+                telemetry.count("service_batches")
+                try:
+                    results = await loop.run_in_executor(self._executor, self._predict, batch)
+                    # Decided after predicting, so a persisting request that joined mid-batch counts
+                    keep = [(seq, scores) for seq, scores in zip(batch, results) if seq in self._persist]
+                    if keep:
+                        await loop.run_in_executor(self._executor, self.store.bulk_import, keep)
+                except Exception as exc:
+                    for seq in batch:
+                        self._persist.discard(seq)
+                        self._waiting.pop(seq).set_exception(exc)
+                    continue
+                for seq, scores in zip(batch, results):
+                    self._persist.discard(seq)
+                    self._waiting.pop(seq).set_result(scores)
+            self._wakeup.clear()
+
+
+def _to_json(obj):
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict(orient="list")
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    return str(obj)
+
+
+class AnalysisService:
+    """Minimal HTTP/1.1 (keep-alive, JSON bodies) front end for a `DisorderBatcher`."""
+
+    def __init__(self, batcher=None, host="127.0.0.1", port=8765, retry_after=1):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+        self.retry_after = retry_after
+        self._server = None
+        self._connections = set()
+
+    async def start(self):
+        self.batcher = self.batcher or DisorderBatcher()
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload, extra = await self._dispatch(method, urlparse(target).path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _respond(self, writer, status, payload, extra=(), keep_alive=True):
+        if isinstance(payload, str):
+            raw, ctype = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            raw, ctype = json.dumps(payload, default=_to_json).encode(), "application/json"
+        head = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Type: {ctype}", f"Content-Length: {len(raw)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}", *extra]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + raw)
+        await writer.drain()
+
+    async def _dispatch(self, method, path, body):
+        try:
+            if method == "GET" and path == "/health":
+                return 200, {"status": "ok", "model_loaded": disorder_model.is_loaded(),
+                             "pending": self.batcher.pending, "stats": self.batcher.stats}, ()
+            if method == "GET" and path == "/metrics":
+                return 200, telemetry.prometheus_text(), ()
+            if method != "POST":
+                return 404, {"error": f"no route for {method} {path}"}, ()
+            args = json.loads(body or b"{}")
+            if path == "/disorder":
+                sequences = args["sequences"] if "sequences" in args else [args["sequence"]]
+                scores = await self.batcher.score_many(sequences, persist=bool(args.get("persist", True)))
+                return 200, {"scores": scores}, ()
+            if path == "/idrs":
+                scores = await self.batcher.score(args.pop("sequence"))
+                return 200, {"idrs": find_idrs(scores, **args)}, ()
+            if path.startswith("/call/") and path[6:] in FUNCTIONS:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: FUNCTIONS[path[6:]](**args))
+                return 200, {"result": result}, ()
+            return 404, {"error": f"no route for {method} {path}"}, ()
+        except Overloaded as exc:
+            return 503, {"error": str(exc)}, (f"Retry-After: {self.retry_after}",)
+        except (KeyError, TypeError, ValueError) as exc:
+            return 400, {"error": f"{type(exc).__name__}: {exc}"}, ()
+        except Exception as exc:
+            return 500, {"error": f"{type(exc).__name__}: {exc}"}, ()
+
+
+async def serve(host="127.0.0.1", port=8765, window_ms=5.0, max_batch=64, max_pending=1024, warm=True):
+    disorder_model.configure_remote(None)  # this process is the one that predicts
+    if warm:
+        disorder_model.warm_in_background()
+    batcher = DisorderBatcher(window_ms=window_ms, max_batch=max_batch, max_pending=max_pending)
+    service = await AnalysisService(batcher, host=host, port=port).start()
+    print(f"Gene Weaving analysis service on http://{service.host}:{service.port}")
+    await service.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve disorder prediction and analysis functions locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--window-ms", type=float, default=5.0, help="Micro-batching window")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-pending", type=int, default=1024, help="Queued sequences before answering 503")
+    parser.add_argument("--no-warmup", action="store_true", help="Load the model on the first request instead")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.window_ms, args.max_batch, args.max_pending,
+                          warm=not args.no_warmup))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
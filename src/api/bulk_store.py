@@ -0,0 +1,335 @@
+import argparse
+import gzip
+import json
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .uniprot_store import UniProtStore, ingest_uniprot
+
+DEFAULT_MIN_SCORE = 400  # STRING "medium confidence"
+
+
+def _default_bulk_dir():
+    base = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.environ.get("GENE_WEAVING_BULK_DIR", os.path.join(base, "gene_weaving", "bulk"))
+
+
+def _open_text(path):
+    return gzip.open(path, "rt") if path.endswith(".gz") else open(path)
+
+
+def _save_atomic_json(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as fh:
+        json.dump(obj, fh)
+    os.replace(tmp, path)
+
+
+# --- STRING ---
+
+def ingest_string(links_path, out_dir, info_path=None, aliases_path=None, min_score=0):
+    """
+    Converts a STRING `protein.links` file (plus optional `protein.info` and
+    `protein.aliases` files) into a CSR graph under `out_dir/string/<tax_id>/`.
+
+    Writes `indptr.npy`, `indices.npy` (int32) and `scores.npy` (uint16), with
+    each node's partners ordered by descending combined score, `names.json`
+    (preferred name per node) and `symbols.json` (upper-cased name/alias ->
+    node). Returns the opened `StringGraph`.
+    """
+    links = pd.read_csv(links_path, sep=" ", usecols=["protein1", "protein2", "combined_score"],
+                        dtype={"protein1": str, "protein2": str, "combined_score": np.uint16})
+    links = links[links["combined_score"] >= min_score]
+    if links.empty:
+        raise ValueError(f"No interactions found in {links_path}")
+    codes, uniques = pd.factorize(pd.concat([links["protein1"], links["protein2"]], ignore_index=True))
+    ids = {sid: i for i, sid in enumerate(uniques)}
+    tax_id = uniques[0].split(".", 1)[0]
+
+    src = codes[:len(links)].astype(np.int32)
+    dst = codes[len(links):].astype(np.int32)
+    scores = links["combined_score"].to_numpy()
+    # STRING lists both directions; add any missing reverse edge, then dedupe
+    pairs = np.concatenate([src.astype(np.int64) << 32 | dst, dst.astype(np.int64) << 32 | src])
+    pair_scores = np.concatenate([scores, scores])
+    order = np.lexsort((-pair_scores.astype(np.int32), pairs))
+    pairs, pair_scores = pairs[order], pair_scores[order]
+    first = np.ones(len(pairs), dtype=bool)
+    first[1:] = pairs[1:] != pairs[:-1]
+    pairs, pair_scores = pairs[first], pair_scores[first]
+    src, dst = (pairs >> 32).astype(np.int32), (pairs & 0xFFFFFFFF).astype(np.int32)
+
+    order = np.lexsort((-pair_scores.astype(np.int32), src))
+    indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=len(ids)), out=indptr[1:])
+
+    names = [sid.split(".", 1)[1] for sid in ids]
+    symbols = {}
+    if aliases_path:
+        with _open_text(aliases_path) as fh:
+            for line in fh:
+                parts = line.rstrip("\n").split("\t")
+                if line.startswith("#") or len(parts) < 2 or parts[0] not in ids:
+                    continue
+                symbols.setdefault(parts[1].upper(), ids[parts[0]])
+    if info_path:
+        with _open_text(info_path) as fh:
+            for line in fh:
+                parts = line.rstrip("\n").split("\t")
+                if line.startswith("#") or len(parts) < 2 or parts[0] not in ids:
+                    continue
+                names[ids[parts[0]]] = parts[1]
+    for node, name in enumerate(names):
+        symbols[name.upper()] = node  # preferred names win over aliases
+
+    graph_dir = os.path.join(out_dir, "string", tax_id)
+    os.makedirs(graph_dir, exist_ok=True)
+    np.save(os.path.join(graph_dir, "indptr.npy"), indptr)
+    np.save(os.path.join(graph_dir, "indices.npy"), dst[order])
+    np.save(os.path.join(graph_dir, "scores.npy"), pair_scores[order])
+    _save_atomic_json(os.path.join(graph_dir, "names.json"), names)
+    _save_atomic_json(os.path.join(graph_dir, "symbols.json"), symbols)
+    return StringGraph(graph_dir)
+
+
+class StringGraph:
+    """Read-only, memory-mapped STRING network for one species."""
+
+    def __init__(self, graph_dir):
+        self.indptr = np.load(os.path.join(graph_dir, "indptr.npy"), mmap_mode="r")
+        self.indices = np.load(os.path.join(graph_dir, "indices.npy"), mmap_mode="r")
+        self.scores = np.load(os.path.join(graph_dir, "scores.npy"), mmap_mode="r")
+        with open(os.path.join(graph_dir, "names.json")) as fh:
+            self.names = json.load(fh)
+        with open(os.path.join(graph_dir, "symbols.json")) as fh:
+            self.symbols = json.load(fh)
+
+    def __len__(self):
+        return len(self.names)
+
+    def node(self, symbol):
+        """Node index of a gene symbol, alias or STRING ID (None if unknown)."""
+        key = symbol.upper()
+        node = self.symbols.get(key)
+        if node is None and "." in key:
+            node = self.symbols.get(key.split(".", 1)[1])
+        return node
+
+    def _edges(self, node, min_score):
+        lo, hi = self.indptr[node], self.indptr[node + 1]
+        scores = self.scores[lo:hi]
+        keep = int(np.searchsorted(-scores.astype(np.int32), -min_score, side="right"))  # sorted descending
+        return self.indices[lo:lo + keep], scores[:keep]
+
+    def partners(self, symbol, min_score=DEFAULT_MIN_SCORE, limit=None):
+        """[(partner name, combined score)] by descending score; empty if `symbol` is unknown."""
+        node = self.node(symbol)
+        if node is None:
+            return []
+        nbrs, scores = self._edges(node, min_score)
+        if limit is not None:
+            nbrs, scores = nbrs[:limit], scores[:limit]
+        return [(self.names[n], int(s)) for n, s in zip(nbrs.tolist(), scores.tolist())]
+
+    def partners_many(self, symbols, min_score=DEFAULT_MIN_SCORE, limit=None):
+        """`partners` for every symbol, e.g. hundreds of TFs at once."""
+        return {s: self.partners(s, min_score=min_score, limit=limit) for s in symbols}
+
+    def neighborhood(self, symbols, k=2, min_score=DEFAULT_MIN_SCORE):
+        """
+        Every node within `k` hops of any of `symbols` over edges scoring at
+        least `min_score`. Returns {name: hop distance}, seeds at distance 0.
+        Each hop expands the whole frontier with one gather over the CSR arrays.
+        """
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        seeds = [n for n in (self.node(s) for s in symbols) if n is not None]
+        dist = np.full(len(self.names), -1, dtype=np.int32)
+        frontier = np.unique(np.array(seeds, dtype=np.int64))
+        dist[frontier] = 0
+        for hop in range(1, k + 1):
+            if not len(frontier):
+                break
+            lo, hi = self.indptr[frontier], self.indptr[frontier + 1]
+            counts = hi - lo
+            idx = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            nbrs = np.asarray(self.indices[idx])
+            nbrs = nbrs[self.scores[idx] >= min_score]
+            nbrs = np.unique(nbrs[dist[nbrs] < 0])
+            dist[nbrs] = hop
+            frontier = nbrs
+        reached = np.flatnonzero(dist >= 0)
+        return {self.names[n]: int(dist[n]) for n in reached.tolist()}
+
+
+# --- JASPAR ---
+
+_JASPAR_HEADER = re.compile(r"^>(\S+)\s*(.*)$")
+_JASPAR_ROW = re.compile(r"^\s*([ACGT])\s*\[?([^\]]*)\]?\s*$")
+
+
+def _parse_jaspar_text(fh):
+    """Records from a JASPAR-format bundle (`>MA0004.1 Arnt` followed by A/C/G/T rows)."""
+    record = None
+    for line in fh:
+        header = _JASPAR_HEADER.match(line)
+        if header:
+            if record:
+                yield record
+            record = {"matrix_id": header.group(1), "name": header.group(2).strip() or header.group(1),
+                      "species": [], "pfm": {}}
+            continue
+        row = _JASPAR_ROW.match(line)
+        if record is not None and row:
+            record["pfm"][row.group(1)] = [float(v) for v in row.group(2).split()]
+    if record:
+        yield record
+
+
+def ingest_jaspar(bundle_path, out_dir):
+    """
+    Loads a JASPAR bundle into `out_dir/jaspar/motifs.json`.
+
+    Accepts the JASPAR-format text download or a JSON list of matrix records as
+    returned by the REST API (which also carries species). Only the latest
+    version of each base ID is kept. Returns the opened `JasparStore`.
+    """
+    is_json = (bundle_path[:-3] if bundle_path.endswith(".gz") else bundle_path).endswith(".json")
+    with _open_text(bundle_path) as fh:
+        if is_json:
+            records = json.load(fh)
+        else:
+            records = list(_parse_jaspar_text(fh))
+
+    latest = {}
+    for rec in records:
+        base_id, _, version = rec["matrix_id"].partition(".")
+        version = int(version or 0)
+        if base_id not in latest or version > latest[base_id][0]:
+            latest[base_id] = (version, {
+                "matrix_id": rec["matrix_id"], "name": rec["name"], "base_id": base_id, "version": version,
+                "collection": rec.get("collection", "CORE"),
+                "tax_ids": [str(s["tax_id"]) for s in rec.get("species") or []],
+                "pfm": rec["pfm"],
+            })
+
+    os.makedirs(os.path.join(out_dir, "jaspar"), exist_ok=True)
+    path = os.path.join(out_dir, "jaspar", "motifs.json")
+    _save_atomic_json(path, [entry for _, entry in latest.values()])
+    return JasparStore(path)
+
+
+class JasparStore:
+    """In-memory JASPAR matrices with a name index (dimer names like MAX::MYC index both parts)."""
+
+    def __init__(self, path):
+        with open(path) as fh:
+            self.motifs = json.load(fh)
+        self.by_id = {m["matrix_id"]: m for m in self.motifs}
+        self.by_name = {}
+        for m in self.motifs:
+            for part in {m["name"].upper(), *m["name"].upper().split("::")}:
+                self.by_name.setdefault(part, []).append(m)
+        self.tax_ids = {t for m in self.motifs for t in m["tax_ids"]}
+        self._untagged = any(not m["tax_ids"] for m in self.motifs)  # text bundles carry no species
+
+    def covers(self, tax_id):
+        """True if the bundle has matrices for `tax_id` (species-less matrices count for every taxon)."""
+        return tax_id is None or self._untagged or str(tax_id) in self.tax_ids
+
+    def search(self, keyword, tax_id=None):
+        """Matrices named `keyword`, as records shaped like the REST API search results."""
+        hits = self.by_name.get(keyword.upper(), [])
+        return [{k: m[k] for k in ("matrix_id", "name", "base_id", "version", "collection")}
+                for m in hits if tax_id is None or not m["tax_ids"] or str(tax_id) in m["tax_ids"]]
+
+    def pfm(self, matrix_id):
+        m = self.by_id.get(matrix_id)
+        return m["pfm"] if m else None
+
+
+class BulkStore:
+    """Locally ingested STRING graphs (one per species), JASPAR matrices and UniProt entries, opened lazily."""
+
+    def __init__(self, path=None):
+        self.path = path or _default_bulk_dir()
+        self._graphs = {}
+        self._jaspar = None
+        self._uniprot = None
+        self._lock = threading.Lock()
+
+    def string_graph(self, tax_id):
+        """The species' graph, or None if it was never ingested."""
+        tax_id = str(tax_id)
+        with self._lock:
+            if tax_id not in self._graphs:
+                graph_dir = os.path.join(self.path, "string", tax_id)
+                self._graphs[tax_id] = StringGraph(graph_dir) if os.path.exists(
+                    os.path.join(graph_dir, "symbols.json")) else None
+            return self._graphs[tax_id]
+
+    def jaspar(self):
+        with self._lock:
+            if self._jaspar is None:
+                path = os.path.join(self.path, "jaspar", "motifs.json")
+                self._jaspar = JasparStore(path) if os.path.exists(path) else False
+            return self._jaspar or None
+
+    def uniprot(self):
+        with self._lock:
+            if self._uniprot is None:
+                path = os.path.join(self.path, "uniprot")
+                self._uniprot = UniProtStore(path) if os.path.exists(os.path.join(path, "index.npy")) else False
+            return self._uniprot or None
+
+
+_default_bulk_store = None
+
+
+def get_bulk_store():
+    """Returns the process-wide bulk store, creating it from the environment on first use."""
+    global _default_bulk_store
+    if _default_bulk_store is None:
+        _default_bulk_store = BulkStore()
+    return _default_bulk_store
+
+
+def configure_bulk_store(path=None):
+    """Replaces the process-wide bulk store, e.g. to point it at a shared data directory."""
+    global _default_bulk_store
+    _default_bulk_store = BulkStore(path)
+    return _default_bulk_store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest STRING / JASPAR / UniProt bulk downloads for offline use.")
+    parser.add_argument("--out", default=None, help="Bulk data directory (default: GENE_WEAVING_BULK_DIR)")
+    parser.add_argument("--string-links", help="protein.links[.detailed].*.txt[.gz]")
+    parser.add_argument("--string-info", help="protein.info.*.txt[.gz] (preferred names)")
+    parser.add_argument("--string-aliases", help="protein.aliases.*.txt[.gz]")
+    parser.add_argument("--min-score", type=int, default=0, help="Drop links below this combined score")
+    parser.add_argument("--jaspar", help="JASPAR bundle (.txt in JASPAR format, or .json)")
+    parser.add_argument("--uniprot", help="UniProtKB dump: JSON (.json[.gz]) or flat file (.dat[.gz])")
+    args = parser.parse_args(argv)
+    if not (args.string_links or args.jaspar or args.uniprot):
+        parser.error("nothing to ingest")
+
+    out = args.out or _default_bulk_dir()
+    if args.string_links:
+        graph = ingest_string(args.string_links, out, info_path=args.string_info,
+                              aliases_path=args.string_aliases, min_score=args.min_score)
+        print(f"STRING: {len(graph)} proteins, {len(graph.indices)} directed links -> {out}")
+    if args.jaspar:
+        store = ingest_jaspar(args.jaspar, out)
+        print(f"JASPAR: {len(store.motifs)} matrices -> {out}")
+    if args.uniprot:
+        proteome = ingest_uniprot(args.uniprot, os.path.join(out, "uniprot"))
+        print(f"UniProt: {len(proteome)} entries -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .http_client import fetch_json
+from .telemetry import count
+
+# Seconds a response stays fresh, per data source.
+DEFAULT_TTLS = {
+    "uniprot": 30 * 24 * 3600,
+    "string": 7 * 24 * 3600,
+    "jaspar": 30 * 24 * 3600,
+}
+
+# How long past its TTL an entry may still be served while it is refreshed.
+STALE_WINDOW = 7 * 24 * 3600
+
+
+def _default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.environ.get("GENE_WEAVING_CACHE_DIR", os.path.join(base, "gene_weaving"))
+
+
+def _env_offline():
+    return os.environ.get("GENE_WEAVING_OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+def make_key(source, url, params=None):
+    """Content address of a request: sha256 over source, URL and sorted params."""
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    raw = json.dumps([source, url, items], separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Disk-backed JSON response cache shared by the API fetchers.
+
+    Entries are stored as one file per request key, fronted by a small
+    in-memory LRU so repeat lookups never touch the disk. The disk tier is
+    bounded by `max_bytes`; the least recently used files are evicted first.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=256 * 1024 * 1024, ttls=None,
+                 stale_window=STALE_WINDOW, offline=None, memory_entries=512):
+        self.cache_dir = cache_dir or _default_cache_dir()
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.stale_window = stale_window
+        self.offline = _env_offline() if offline is None else offline
+        self.memory_entries = memory_entries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._disk_bytes = None
+
+    # --- storage ---
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _load(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+            os.utime(path)  # mtime doubles as the LRU timestamp
+        except (OSError, ValueError):
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def _store(self, key, source, url, payload):
+        entry = {"source": source, "url": url, "stored_at": time.time(), "payload": payload}
+        self._remember(key, entry)
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(entry, fh, separators=(",", ":"))
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += os.path.getsize(path) - old_size
+        self._evict_if_needed()
+        return entry
+
+    def _scan(self):
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def disk_usage(self):
+        """Total bytes held by the on-disk tier."""
+        with self._lock:
+            if self._disk_bytes is not None:
+                return self._disk_bytes
+        total = sum(size for _, size, _ in self._scan())
+        with self._lock:
+            self._disk_bytes = total
+        return total
+
+    def _evict_if_needed(self):
+        if self.disk_usage() <= self.max_bytes:
+            return
+        files = sorted(self._scan())
+        total = sum(size for _, size, _ in files)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            key = os.path.basename(path)[:-len(".json")]
+            with self._lock:
+                self._memory.pop(key, None)
+        with self._lock:
+            self._disk_bytes = total
+
+    def clear(self):
+        """Drops every cached entry, in memory and on disk."""
+        for _, _, path in self._scan():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._memory.clear()
+            self._disk_bytes = 0
+
+    # --- network ---
+    def _download(self, url, params, timeout, limiter=None):
+        return fetch_json(url, params=params, timeout=timeout, limiter=limiter)
+
+    def _refresh(self, key, source, url, params, timeout, limiter=None):
+        try:
+            payload = self._download(url, params, timeout, limiter)
+            if payload is not None:
+                self._store(key, source, url, payload)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _refresh_in_background(self, key, source, url, params, timeout, limiter=None):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(target=self._refresh, args=(key, source, url, params, timeout, limiter),
+                         daemon=True).start()
+
+    def lookup(self, source, url, params=None):
+        """Returns a cached payload without touching the network, or None."""
+        entry = self._load(make_key(source, url, params))
+        if entry is not None:
+            age = time.time() - entry["stored_at"]
+            if self.offline or age <= self.ttls.get(source, min(self.ttls.values())):
+                count("cache_hits", source=source)
+                return entry["payload"]
+        count("cache_misses", source=source)
+        return None
+
+    def put(self, source, url, payload, params=None):
+        """Stores a payload fetched by other means (e.g. a batch endpoint)."""
+        self._store(make_key(source, url, params), source, url, payload)
+
+    def get_json(self, source, url, params=None, timeout=10, limiter=None):
+        """
+        Returns the decoded JSON body for a GET request, or None if it failed.
+
+        Fresh entries are served directly. Entries inside the stale window are
+        served immediately while a background thread refreshes them. In offline
+        mode only cached data is returned, however old it is. Downloads go
+        through `limiter` (an `http_client.RateLimiter`) when one is given.
+        """
+        key = make_key(source, url, params)
+        entry = self._load(key)
+
+        if entry is not None:
+            age = time.time() - entry["stored_at"]
+            ttl = self.ttls.get(source, min(self.ttls.values()))
+            if self.offline or age <= ttl:
+                count("cache_hits", source=source)
+                return entry["payload"]
+            if age <= ttl + self.stale_window:
+                count("cache_stale_hits", source=source)
+                self._refresh_in_background(key, source, url, params, timeout, limiter)
+                return entry["payload"]
+
+        count("cache_misses", source=source)
+        if self.offline:
+            return None
+
+        payload = self._download(url, params, timeout, limiter)
+        if payload is None:
+            # A failed refresh is better served by old data than by nothing.
+            return entry["payload"] if entry is not None else None
+        self._store(key, source, url, payload)
+        return payload
+
+
+_default_cache = None
+
+
+def get_cache():
+    """Returns the process-wide cache, creating it from the environment on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
+
+
+def configure_cache(**kwargs):
+    """Replaces the process-wide cache, e.g. `configure_cache(offline=True)`."""
+    global _default_cache
+    _default_cache = ResponseCache(**kwargs)
+    return _default_cache
+
+
+def cached_get_json(source, url, params=None, timeout=10, limiter=None):
+    return get_cache().get_json(source, url, params=params, timeout=timeout, limiter=limiter)
@@ -0,0 +1,123 @@
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .telemetry import count, span
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size=32):
+    """Returns a process-wide `requests.Session` with a pooled keep-alive adapter."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+class RateLimiter:
+    """Token bucket shared across threads. `rate` is requests per second."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, rate))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class Coalescer:
+    """
+    Collapses concurrent calls that share a key into a single execution.
+    The first caller runs the function; everyone else waits on its result.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, fn, *args, **kwargs):
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future.result()
+
+
+def fetch_json(url, params=None, timeout=10, retries=2, backoff=0.5, limiter=None):
+    """
+    GETs a URL and returns its decoded JSON body, or None on failure.
+
+    Connection errors, 429 and 5xx responses are retried with exponential
+    backoff (honouring Retry-After); any other non-200 status returns None.
+    """
+    session = get_session()
+    host = urlparse(url).netloc
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        if attempt:
+            count("http_retries", host=host)
+        delay = backoff * (2 ** attempt)
+        try:
+            with span("http.get", host=host):
+                resp = session.get(url, params=params, timeout=timeout)
+        except requests.RequestException:
+            count("http_requests", host=host, status="error")
+            if attempt == retries:
+                return None
+            time.sleep(delay)
+            continue
+
+        count("http_requests", host=host, status=str(resp.status_code))
+        count("http_bytes", len(resp.content), host=host)
+        if resp.status_code == 200:
+            try:
+                return resp.json()
+            except ValueError:
+                return None
+        if resp.status_code not in RETRY_STATUSES or attempt == retries:
+            return None
+
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        time.sleep(delay)
+    return None
@@ -1,13 +1,22 @@
-
-
-import requests
 import pandas as pd
 
+from .bulk_store import get_bulk_store
+from .cache import cached_get_json
+from .telemetry import traced
+
 
+@traced()
 def search_jaspar_motifs(keyword: str, tax_id: str = "9606"):
     """
-    Searches JASPAR matrices by name and taxonomy.
+    Searches JASPAR matrices by name and taxonomy, from the local bundle if one
+    was ingested. Taxa the bundle has no matrices for are searched online.
     """
+    local = get_bulk_store().jaspar()
+    if local is not None:
+        hits = local.search(keyword, tax_id=tax_id)
+        if hits or local.covers(tax_id):
+            return hits
+
     url = "https://jaspar.elixir.no/api/v1/matrix/"
     params = {
         "name": keyword,
@@ -15,25 +24,27 @@ def search_jaspar_motifs(keyword: str, tax_id: str = "9606"):
         "is_latest": True
     }
 
-    try:
-        resp = requests.get(url, params=params, timeout=10)
-        if resp.status_code == 200:
-            return resp.json().get('results', [])
-        return []
-    except Exception:
+    payload = cached_get_json("jaspar", url, params=params)
+    if payload is None:
         return []
+    return payload.get('results', [])
 
 
+@traced()
 def get_pfm_data(matrix_id: str):
     """
     Fetches the Position Frequency Matrix (PFM) for a specific motif.
     """
+    local = get_bulk_store().jaspar()
+    pfm = local.pfm(matrix_id) if local is not None else None
+    if pfm:
+        return pd.DataFrame(pfm)
+
     url = f"https://jaspar.elixir.no/api/v1/matrix/{matrix_id}/"
-    try:
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        pfm = resp.json().get('pfm')
-        if pfm:
-            return pd.DataFrame(pfm)
-    except Exception:
-        return None
\ No newline at end of file
+    payload = cached_get_json("jaspar", url)
+    if payload is None:
+        return None
+    pfm = payload.get('pfm')
+    if pfm:
+        return pd.DataFrame(pfm)
+    return None
\ No newline at end of file
@@ -1,30 +1,60 @@
-import requests
+from .bulk_store import DEFAULT_MIN_SCORE, get_bulk_store
+from .cache import cached_get_json
+from .telemetry import traced
 
 
-def get_interactions(gene_name, tax_id="9606"):
+@traced()
+def get_interactions(gene_name, tax_id="9606", limit=5):
     """
     Fetches protein-protein interactions from StringDB.
     9606 = Human, 4932 = Yeast
+    Answered from the local STRING graph when the species has been ingested.
     """
+    graph = get_bulk_store().string_graph(tax_id)
+    if graph is not None and graph.node(gene_name) is not None:
+        return [name for name, _ in graph.partners(gene_name, min_score=DEFAULT_MIN_SCORE, limit=limit)
+                if name.upper() != gene_name.upper()]
+
     url = "https://string-db.org/api/json/network"
     params = {
         "identifiers": gene_name,
         "species": tax_id,
-        "limit": 5
+        "limit": limit
     }
+    data = cached_get_json("string", url, params=params)
+    if data is None:
+        return []
     try:
-        resp = requests.get(url, params=params, timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()
-            partners = set()
-            for entry in data:
-                # We want the name of the partner protein
-                partners.add(entry['preferredName_B'])
-
-            # Filter out the original protein from the list
-            if gene_name.upper() in [p.upper() for p in partners]:
-                partners = {p for p in partners if p.upper() != gene_name.upper()}
-
-            return list(partners)
+        partners = set()
+        for entry in data:
+            # We want the name of the partner protein
+            partners.add(entry['preferredName_B'])
+
+        # Filter out the original protein from the list
+        if gene_name.upper() in [p.upper() for p in partners]:
+            partners = {p for p in partners if p.upper() != gene_name.upper()}
+
+        return list(partners)
     except Exception:
-        return []
\ No newline at end of file
+        return []
+
+
+@traced()
+def get_interactions_many(gene_names, tax_id="9606", limit=5, min_score=DEFAULT_MIN_SCORE):
+    """
+    Partners of many genes at once, {gene: [(partner, score)]}. Requires the
+    species' STRING graph to have been ingested with `bulk_store`.
+    """
+    graph = get_bulk_store().string_graph(tax_id)
+    if graph is None:
+        raise LookupError(f"No local STRING graph for taxon {tax_id}; ingest one with api.bulk_store")
+    return graph.partners_many(gene_names, min_score=min_score, limit=limit)
+
+
+@traced()
+def get_network_neighborhood(gene_names, tax_id="9606", k=2, min_score=DEFAULT_MIN_SCORE):
+    """{gene: hop distance} for everything within `k` hops of `gene_names` in the local STRING graph."""
+    graph = get_bulk_store().string_graph(tax_id)
+    if graph is None:
+        raise LookupError(f"No local STRING graph for taxon {tax_id}; ingest one with api.bulk_store")
+    return graph.neighborhood(gene_names, k=k, min_score=min_score)
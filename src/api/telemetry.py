@@ -0,0 +1,264 @@
+"""
+Process-wide tracing spans and counters.
+
+Disabled by default; `enable()` (or GENE_WEAVING_TRACE=1) turns collection on.
+`trace_scope(enabled)` overrides that for the current context only (e.g. one
+Streamlit session's script thread) and tags its spans so they can be told
+apart from other sessions' and background threads'. While disabled, `span()`
+returns a shared no-op context manager, `traced` functions make one flag
+check before calling through, and `count()` returns immediately, so the
+instrumented hot paths pay next to nothing.
+"""
+
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+MAX_SPANS = 10_000
+
+_enabled = os.environ.get("GENE_WEAVING_TRACE", "").lower() in ("1", "true", "yes")
+_lock = threading.Lock()
+_local = threading.local()
+_spans = deque(maxlen=MAX_SPANS)
+_span_seq = 0
+_timings = {}   # span name -> [count, total seconds, max seconds]
+_counters = {}  # (metric, sorted label items) -> value
+_scope = contextvars.ContextVar("gene_weaving_trace_scope", default=None)  # (enabled, scope id)
+_scope_ids = itertools.count(1)
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def _active():
+    scope = _scope.get()
+    return _enabled if scope is None else scope[0]
+
+
+def trace_scope(enabled):
+    """
+    Turns tracing on or off for the current context only, leaving the
+    process-wide setting alone. Returns the id its spans are tagged with
+    (pass it to `spans_since`).
+    """
+    scope_id = next(_scope_ids)
+    _scope.set((bool(enabled), scope_id))
+    return scope_id
+
+
+def _tag(record):
+    scope = _scope.get()
+    if scope is not None:
+        record["scope"] = scope[1]
+
+
+def reset():
+    """Drops every recorded span and counter."""
+    global _span_seq
+    with _lock:
+        _spans.clear()
+        _timings.clear()
+        _counters.clear()
+        _span_seq = 0
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _append(record, elapsed):
+    global _span_seq
+    with _lock:
+        _span_seq += 1
+        record["seq"] = _span_seq
+        _spans.append(record)
+        stats = _timings.setdefault(record["name"], [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] = max(stats[2], elapsed)
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "parent", "depth", "_t0")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].name if stack else None
+        self.depth = len(stack)
+        stack.append(self)
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        elapsed = time.perf_counter() - self._t0
+        _local.stack.pop()
+        record = {"name": self.name, "parent": self.parent, "depth": self.depth, "seconds": elapsed,
+                  "end": time.time(), "thread": threading.current_thread().name}
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        _tag(record)
+        _append(record, elapsed)
+        return False
+
+
+def span(name, **attrs):
+    """Times a block: `with span("uniprot.fetch", accession=acc): ...`."""
+    if not _active():
+        return _NULL_SPAN
+    return _Span(name, attrs)
+
+
+def record(name, seconds, **attrs):
+    """Records a span measured elsewhere, e.g. process launch to first render."""
+    if not _active():
+        return
+    entry = {"name": name, "parent": None, "depth": 0, "seconds": seconds, "end": time.time(),
+             "thread": threading.current_thread().name}
+    if attrs:
+        entry["attrs"] = attrs
+    _tag(entry)
+    _append(entry, seconds)
+
+
+def traced(name=None):
+    """Decorator form of `span`; the default name is `<module>.<function>`."""
+    def decorate(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _active():
+                return fn(*args, **kwargs)
+            with _Span(label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(metric, value=1, **labels):
+    """Adds `value` to a counter, e.g. `count("http_requests", host="rest.uniprot.org")`."""
+    if not _active():
+        return
+    key = (metric, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def mark():
+    """Sequence number of the latest span; pass it to `spans_since` to get what ran after."""
+    return _span_seq
+
+
+def spans_since(seq, scope=None):
+    """Spans recorded after `mark()` returned `seq`; with `scope`, only those of that `trace_scope`."""
+    with _lock:
+        return [s for s in _spans if s["seq"] > seq and (scope is None or s.get("scope") == scope)]
+
+
+def timing_breakdown(spans):
+    """Per-name count / total / max seconds of `spans`, slowest total first."""
+    table = {}
+    for s in spans:
+        row = table.setdefault(s["name"], {"span": s["name"], "calls": 0, "total_s": 0.0, "max_s": 0.0})
+        row["calls"] += 1
+        row["total_s"] += s["seconds"]
+        row["max_s"] = max(row["max_s"], s["seconds"])
+    return sorted(table.values(), key=lambda r: -r["total_s"])
+
+
+def snapshot():
+    """Current aggregates: {"timings": {name: {...}}, "counters": [{metric, labels, value}]}."""
+    with _lock:
+        timings = {name: {"calls": c, "total_s": t, "max_s": m} for name, (c, t, m) in _timings.items()}
+        counters = [{"metric": metric, "labels": dict(labels), "value": value}
+                    for (metric, labels), value in _counters.items()]
+    return {"timings": timings, "counters": counters}
+
+
+def export_jsonl(path, clear=False):
+    """Appends every buffered span, then one line per counter, as JSON lines."""
+    with _lock:
+        spans = list(_spans)
+    snap = snapshot()
+    with open(path, "a") as fh:
+        for s in spans:
+            fh.write(json.dumps(dict(s, kind="span")) + "\n")
+        for c in snap["counters"]:
+            fh.write(json.dumps(dict(c, kind="counter", time=time.time())) + "\n")
+    if clear:
+        reset()
+
+
+def _labels(items):
+    if not items:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+
+def prometheus_text(prefix="gene_weaving"):
+    """Counters and span aggregates in the Prometheus text exposition format."""
+    with _lock:
+        timings = {name: tuple(stats) for name, stats in _timings.items()}
+        counters = dict(_counters)
+    lines = []
+    families = (("span_seconds_total", "counter", 1), ("span_calls_total", "counter", 0),
+                ("span_seconds_max", "gauge", 2))
+    for family, kind, field in families if timings else ():
+        lines.append(f"# TYPE {prefix}_{family} {kind}")
+        for name, stats in sorted(timings.items()):
+            value = stats[field] if field == 0 else f"{stats[field]:.6f}"
+            lines.append(f"{prefix}_{family}{_labels((('span', name),))} {value}")
+    for metric in sorted({m for m, _ in counters}):
+        lines.append(f"# TYPE {prefix}_{metric}_total counter")
+        for (m, labels), value in sorted(counters.items()):
+            if m == metric:
+                lines.append(f"{prefix}_{metric}_total{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, prefix="gene_weaving"):
+    """Writes `prometheus_text` atomically, as node_exporter's textfile collector expects."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        fh.write(prometheus_text(prefix))
+    os.replace(tmp, path)
@@ -1,86 +1,189 @@
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
+from .bulk_store import get_bulk_store
+from .cache import cached_get_json, get_cache
+from .http_client import Coalescer, RateLimiter, fetch_json
+from .telemetry import traced
 
-def get_uniprot_data(uniprot_id):
-    url = f"https://rest.uniprot.org/uniprotkb/{uniprot_id}.json"
-    response = requests.get(url)
+UNIPROT_REST = "https://rest.uniprot.org"
+# Largest page the multi-accession endpoint returns; it pages its results, so `size` is always sent
+MAX_ACCESSIONS_PER_CALL = 500
+UNIPROT_RATE_LIMIT = 10  # requests per second, per process
 
-    if response.status_code == 200:
-        data = response.json()
-        sequence = data.get('sequence', {}).get('value', '')
-        protein_name = data.get('proteinDescription', {}).get('recommendedName', {}).get('fullName', {}).get('value', 'Unknown')
+_coalescer = Coalescer()
+# Every UniProt request in this process (batch chunks and single entries) draws from one bucket
+_limiter = RateLimiter(UNIPROT_RATE_LIMIT)
 
-        gene_name = "Unknown"
-        genes = data.get('genes', [])
-        if genes:
-            gene_name = genes[0].get('geneName', {}).get('value', 'Unknown')
 
-        domains = []
+def parse_uniprot_entry(data):
+    """Reduces a UniProtKB entry JSON to name, gene, sequence and sorted domains."""
+    sequence = data.get('sequence', {}).get('value', '')
+    protein_name = data.get('proteinDescription', {}).get('recommendedName', {}).get('fullName', {}).get('value', 'Unknown')
 
-        # 1. Standard UniProt Features
-        features = data.get('features', [])
-        for f in features:
-            if f['type'] in ['Domain', 'Region', 'DNA_BIND', 'Zinc finger', 'Motif', 'Repeat']:
+    gene_name = "Unknown"
+    genes = data.get('genes', [])
+    if genes:
+        gene_name = genes[0].get('geneName', {}).get('value', 'Unknown')
+
+    domains = []
+
+    # 1. Standard UniProt Features
+    features = data.get('features', [])
+    for f in features:
+        if f['type'] in ['Domain', 'Region', 'DNA_BIND', 'Zinc finger', 'Motif', 'Repeat']:
+            domains.append({
+                'label': f.get('description', f['type']),
+                'start': f['location']['start']['value'],
+                'end': f['location']['end']['value'],
+                'type': f['type']
+            })
+
+    # 2. Independent InterPro Extraction
+    cross_refs = data.get('uniProtKBCrossReferences', [])
+    for ref in cross_refs:
+        if ref.get('database') == 'InterPro':
+            properties = ref.get('properties', [])
+            int_label = "InterPro Domain"
+            start, end = None, None
+
+            for prop in properties:
+                if prop['key'] == 'EntryName':
+                    int_label = prop['value']
+                if prop['key'] == 'MatchRegion':
+                    try:
+                        
+                        raw_val = prop['value'].split(',')[0].replace('..', '-')
+                        parts = raw_val.split('-')
+                        if len(parts) == 2:
+                            start, end = int(parts[0]), int(parts[1])
+                    except (ValueError, IndexError):
+                        continue
+
+            if start is not None and end is not None:
                 domains.append({
-                    'label': f.get('description', f['type']),
-                    'start': f['location']['start']['value'],
-                    'end': f['location']['end']['value'],
-                    'type': f['type']
+                    'label': f"InterPro: {int_label}", 
+                    'start': start,
+                    'end': end,
+                    'type': 'InterPro'
                 })
 
-        # 2. Independent InterPro Extraction
-        cross_refs = data.get('uniProtKBCrossReferences', [])
-        for ref in cross_refs:
-            if ref.get('database') == 'InterPro':
-                properties = ref.get('properties', [])
-                int_label = "InterPro Domain"
-                start, end = None, None
-
-                for prop in properties:
-                    if prop['key'] == 'EntryName':
-                        int_label = prop['value']
-                    if prop['key'] == 'MatchRegion':
-                        try:
-                            
-                            raw_val = prop['value'].split(',')[0].replace('..', '-')
-                            parts = raw_val.split('-')
-                            if len(parts) == 2:
-                                start, end = int(parts[0]), int(parts[1])
-                        except (ValueError, IndexError):
-                            continue
-
-                if start is not None and end is not None:
-                    domains.append({
-                        'label': f"InterPro: {int_label}", 
-                        'start': start,
-                        'end': end,
-                        'type': 'InterPro'
-                    })
-
-        # Sort N-terminus to C-terminus
-        domains = sorted(domains, key=lambda x: x['start'])
-
-        return {
-            "name": protein_name,
-            "gene_name": gene_name,
-            "sequence": sequence,
-            "domains": domains
-        }
+    # Sort N-terminus to C-terminus
+    domains = sorted(domains, key=lambda x: x['start'])
+
+    return {
+        "name": protein_name,
+        "gene_name": gene_name,
+        "sequence": sequence,
+        "domains": domains
+    }
+
+
+@traced()
+def get_uniprot_data(uniprot_id, base_url=UNIPROT_REST, limiter=None):
+    local = get_bulk_store().uniprot()
+    if local is not None and uniprot_id in local:
+        return local.get(uniprot_id)
+
+    url = f"{base_url}/uniprotkb/{uniprot_id}.json"
+    data = _coalescer.run(url, cached_get_json, "uniprot", url, limiter=limiter or _limiter)
+
+    if data is not None:
+        return parse_uniprot_entry(data)
     return None
 
+
+def _fetch_accession_chunk(chunk, base_url, limiter):
+    """Fetches up to MAX_ACCESSIONS_PER_CALL entries in one call to the multi-accession endpoint."""
+    payload = fetch_json(f"{base_url}/uniprotkb/accessions",
+                         params={"accessions": ",".join(chunk), "format": "json", "size": len(chunk)},
+                         timeout=30, retries=3, limiter=limiter)
+    entries = {}
+    for entry in (payload or {}).get('results', []):
+        entries[entry.get('primaryAccession')] = entry
+    return entries
+
+
+@traced()
+def get_uniprot_data_many(uniprot_ids, base_url=UNIPROT_REST, chunk_size=100, max_workers=8, limiter=None):
+    """
+    Fetches many UniProt entries concurrently.
+
+    Accessions in the local proteome store or the response cache are served
+    without network traffic; the rest are requested in chunks from
+    the multi-accession endpoint over the pooled session. Accessions the batch
+    endpoint does not return (e.g. secondary IDs) fall back to single-entry
+    requests. All requests share the process-wide UNIPROT_RATE_LIMIT bucket
+    unless another `limiter` is given.
+    Returns {ID as given: parsed entry or None} in input order; IDs are
+    matched case-insensitively and ignoring surrounding whitespace.
+    """
+    cache = get_cache()
+    local = get_bulk_store().uniprot()
+    accessions = {uid: uid.strip().upper() for uid in uniprot_ids if uid and uid.strip()}
+    ids = list(dict.fromkeys(accessions.values()))
+    raw = {}
+    missing = []
+    stored = {}
+    for uid in ids:
+        if local is not None and uid in local:
+            stored[uid] = local.get(uid)
+            continue
+        hit = cache.lookup("uniprot", f"{base_url}/uniprotkb/{uid}.json")
+        if hit is not None:
+            raw[uid] = hit
+        else:
+            missing.append(uid)
+
+    if missing and not cache.offline:
+        limiter = limiter or _limiter
+        wanted = set(missing)
+        chunk_size = min(chunk_size, MAX_ACCESSIONS_PER_CALL)
+        chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+        def fetch_chunk(chunk):
+            return _coalescer.run(("chunk", base_url) + tuple(chunk), _fetch_accession_chunk, chunk, base_url, limiter)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for entries in pool.map(fetch_chunk, chunks):
+                for acc, entry in entries.items():
+                    if acc in raw or acc not in wanted:
+                        continue
+                    cache.put("uniprot", f"{base_url}/uniprotkb/{acc}.json", entry)
+                    raw[acc] = entry
+
+            leftovers = [uid for uid in missing if uid not in raw]
+            singles = pool.map(partial(get_uniprot_data, base_url=base_url, limiter=limiter), leftovers)
+            parsed_singles = dict(zip(leftovers, singles))
+    else:
+        parsed_singles = {}
+
+    results = {}
+    for uid in ids:
+        if uid in stored:
+            results[uid] = stored[uid]
+        elif uid in raw:
+            results[uid] = parse_uniprot_entry(raw[uid])
+        else:
+            results[uid] = parsed_singles.get(uid)
+    return {uid: results[acc] for uid, acc in accessions.items()}
+
+@traced()
 def get_uniprot_id_from_symbol(symbol, tax_id="9606"):
     """Maps a Gene Symbol to a UniProt Accession ID."""
-    url = "https://rest.uniprot.org/uniprotkb/search"
+    local = get_bulk_store().uniprot()
+    if local is not None:
+        acc = local.accession_for(symbol, tax_id)
+        if acc:
+            return acc
+
+    url = f"{UNIPROT_REST}/uniprotkb/search"
     params = {
         "query": f"gene_exact:{symbol} AND taxonomy_id:{tax_id}",
         "format": "json",
         "size": 1
     }
-    try:
-        resp = requests.get(url, params=params, timeout=10)
-        if resp.status_code == 200:
-            results = resp.json().get('results', [])
-            return results[0]['primaryAccession'] if results else None
-    except Exception:
-
+    payload = cached_get_json("uniprot", url, params=params)
+    if payload is None:
         return None
+    results = payload.get('results', [])
+    return results[0]['primaryAccession'] if results else None
@@ -0,0 +1,201 @@
+import gzip
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+_RESULTS_ARRAY = re.compile(r'\s*\{\s*"results"\s*:\s*\[')
+_INDEX_DTYPE = np.dtype([("accession", "S16"), ("seq_offset", "<i8"), ("seq_length", "<i4"), ("entry_offset", "<i8")])
+
+# Flat-file feature keys -> the feature types used in the JSON entries
+_FT_TYPES = {"DOMAIN": "Domain", "REGION": "Region", "DNA_BIND": "DNA_BIND", "ZN_FING": "Zinc finger",
+             "MOTIF": "Motif", "REPEAT": "Repeat"}
+
+
+def _open_text(path):
+    return gzip.open(path, "rt") if path.endswith(".gz") else open(path)
+
+
+def iter_uniprot_json(path, read_size=1 << 20):
+    """
+    Streams entries from a UniProtKB JSON download (`{"results": [...]}`) or a
+    JSON-lines file, decoding one entry at a time from a rolling buffer.
+    """
+    decoder = json.JSONDecoder()
+    with _open_text(path) as fh:
+        buf, eof = fh.read(read_size), False
+        while not eof and buf.count("{") < 2:  # enough to tell a results wrapper from a first entry
+            more = fh.read(read_size)
+            buf, eof = buf + more, not more
+        wrapper = _RESULTS_ARRAY.match(buf)
+        pos = wrapper.end() if wrapper else 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf) or buf[pos] != "{":
+                if pos < len(buf) or eof:
+                    return  # closing bracket of the results array, or end of a JSON-lines file
+            else:
+                try:
+                    entry, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield entry
+                    pos = end
+                    continue
+            more = fh.read(read_size)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+
+
+def _location(text):
+    numbers = re.findall(r"\d+", text)
+    if not numbers or "?" in text:
+        return None
+    return int(numbers[0]), int(numbers[-1])
+
+
+def iter_uniprot_flat(path):
+    """
+    Streams entries from a Swiss-Prot/TrEMBL flat file (`.dat`), converted to
+    the subset of the JSON entry layout that `parse_uniprot_entry` reads.
+    """
+    entry, feature, seq = None, None, []
+    with _open_text(path) as fh:
+        for line in fh:
+            code, value = line[:2], line[5:].rstrip("\n")
+            if code == "ID":
+                entry, feature, seq = {"genes": [], "features": [], "uniProtKBCrossReferences": []}, None, []
+            elif entry is None:
+                continue
+            elif code == "AC" and "primaryAccession" not in entry:
+                entry["primaryAccession"] = value.split(";")[0].strip()
+            elif code == "DE" and value.startswith("RecName: Full=") and "proteinDescription" not in entry:
+                full = value[len("RecName: Full="):].split("{")[0].rstrip("; ").strip()
+                entry["proteinDescription"] = {"recommendedName": {"fullName": {"value": full}}}
+            elif code == "GN" and not entry["genes"]:
+                match = re.search(r"Name=([^;{]+)", value)
+                if match:
+                    entry["genes"].append({"geneName": {"value": match.group(1).strip()}})
+            elif code == "OX" and "organism" not in entry:
+                match = re.search(r"NCBI_TaxID=(\d+)", value)
+                if match:
+                    entry["organism"] = {"taxonId": int(match.group(1))}
+            elif code == "FT":
+                key = line[5:21].strip()
+                if key:
+                    loc = _location(line[21:])
+                    feature = None
+                    if key in _FT_TYPES and loc:
+                        feature = {"type": _FT_TYPES[key], "description": "",
+                                   "location": {"start": {"value": loc[0]}, "end": {"value": loc[1]}}}
+                        entry["features"].append(feature)
+                elif feature is not None and "/note=" in line:
+                    feature["description"] = line.split("/note=", 1)[1].strip().strip('"')
+            elif code == "  ":
+                seq.append(value.replace(" ", ""))
+            elif code == "//":
+                entry["sequence"] = {"value": "".join(seq)}
+                for f in entry["features"]:
+                    f["description"] = f["description"] or f["type"]
+                yield entry
+                entry = None
+
+
+def ingest_uniprot(dump_path, out_dir):
+    """
+    Builds a local proteome store from a UniProtKB JSON or flat-file dump.
+
+    Entries are streamed and reduced with `parse_uniprot_entry`; sequences are
+    appended to `sequences.bin`, the rest of each parsed entry to
+    `entries.jsonl`, and `index.npy` maps accessions to both. `symbols.json`
+    maps upper-cased gene symbols to the first accession seen per taxon (a
+    Swiss-Prot dump lists reviewed entries only). Returns the opened store.
+    """
+    from .uniprot_fetcher import parse_uniprot_entry
+
+    name = dump_path[:-3] if dump_path.endswith(".gz") else dump_path
+    entries = iter_uniprot_flat(dump_path) if name.endswith((".dat", ".txt")) else iter_uniprot_json(dump_path)
+
+    os.makedirs(out_dir, exist_ok=True)
+    seq_path, entry_path = os.path.join(out_dir, "sequences.bin"), os.path.join(out_dir, "entries.jsonl")
+    rows, symbols = [], {}
+    with open(seq_path + ".tmp", "wb") as seq_fh, open(entry_path + ".tmp", "wb") as entry_fh:
+        for raw in entries:
+            acc = raw.get("primaryAccession")
+            if not acc:
+                continue
+            parsed = parse_uniprot_entry(raw)
+            tax_id = str(raw.get("organism", {}).get("taxonId", ""))
+            seq = parsed.pop("sequence").encode("ascii")
+            rows.append((acc.encode("ascii"), seq_fh.tell(), len(seq), entry_fh.tell()))
+            seq_fh.write(seq)
+            entry_fh.write(json.dumps(dict(parsed, tax_id=tax_id)).encode() + b"\n")
+            if parsed["gene_name"] != "Unknown":
+                symbols.setdefault(tax_id, {}).setdefault(parsed["gene_name"].upper(), acc)
+
+    index = np.array(rows, dtype=_INDEX_DTYPE)
+    index.sort(order="accession")
+    with open(os.path.join(out_dir, "index.npy.tmp"), "wb") as fh:
+        np.save(fh, index)
+    with open(os.path.join(out_dir, "symbols.json.tmp"), "w") as fh:
+        json.dump(symbols, fh)
+    for final in ("sequences.bin", "entries.jsonl", "symbols.json", "index.npy"):
+        os.replace(os.path.join(out_dir, final + ".tmp"), os.path.join(out_dir, final))
+    return UniProtStore(out_dir)
+
+
+class UniProtStore:
+    """
+    Read-only proteome store written by `ingest_uniprot`.
+
+    Accessions resolve through an in-memory dict to the memory-mapped
+    sequences and to a byte offset in `entries.jsonl`, so a lookup is one dict
+    probe and one short read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index = np.load(os.path.join(path, "index.npy"))
+        self._rows = {acc.decode(): i for i, acc in enumerate(self.index["accession"].tolist())}
+        size = os.path.getsize(os.path.join(path, "sequences.bin"))
+        self.sequences = (np.memmap(os.path.join(path, "sequences.bin"), dtype=np.uint8, mode="r")
+                          if size else np.zeros(0, dtype=np.uint8))
+        with open(os.path.join(path, "symbols.json")) as fh:
+            self.symbols = json.load(fh)
+        self._entries = open(os.path.join(path, "entries.jsonl"), "rb")
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, accession):
+        return accession.upper() in self._rows
+
+    def sequence(self, accession):
+        row = self._rows.get(accession.upper())
+        if row is None:
+            return None
+        rec = self.index[row]
+        return self.sequences[rec["seq_offset"]:rec["seq_offset"] + rec["seq_length"]].tobytes().decode("ascii")
+
+    def get(self, accession):
+        """Parsed entry in the `parse_uniprot_entry` layout, or None if not in the store."""
+        row = self._rows.get(accession.upper())
+        if row is None:
+            return None
+        rec = self.index[row]
+        with self._lock:
+            self._entries.seek(int(rec["entry_offset"]))
+            line = self._entries.readline()
+        entry = json.loads(line)
+        entry.pop("tax_id", None)
+        entry["sequence"] = self.sequence(accession)
+        return entry
+
+    def accession_for(self, symbol, tax_id="9606"):
+        return self.symbols.get(str(tax_id), {}).get(symbol.upper())
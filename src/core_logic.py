@@ -5,10 +5,13 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Now we can import the tools
+from api import telemetry
 from api.uniprot_fetcher import get_uniprot_data
-from analysis.disorder_analyzer import analyze_disorder, get_disorder_scores
+from analysis.disorder_analyzer import find_idrs, get_disorder_scores
+from analysis.annotation_track import AnnotationTrack
 
 
+@telemetry.traced()
 def weave_protein_report(uniprot_id):
     # 1. Get data from UniProt
     data = get_uniprot_data(uniprot_id)
@@ -17,8 +20,9 @@ def weave_protein_report(uniprot_id):
 
     print(f"\n--- Gene Weaving Report for {data['name']} ---")
 
-    # 2. Run Disorder Analysis
-    idrs = analyze_disorder(data['sequence'])
+    # 2. Run Disorder Analysis (predict once, segment the same scores)
+    scores = get_disorder_scores(data['sequence'])
+    idrs = find_idrs(scores)
 
     # 3. Combine and Print a Summary
     print("\n[Architecture Summary]")
@@ -38,8 +42,17 @@ def weave_protein_report(uniprot_id):
         for idr in idrs:
             print(f"  ~ IDR: residues {idr['start']}-{idr['end']}")
 
-    
-    scores = get_disorder_scores(data['sequence'])
+    track = AnnotationTrack.from_protein(data, idrs)
+    overlaps = track.select(('Domain', 'Region')).overlap_join(track.select(('IDR',)))
+    if overlaps:
+        print("\nDomains Extending Into IDRs:")
+        for o in overlaps:
+            print(f"  <> {o['a']['label']}: residues {o['start']}-{o['end']} disordered")
+
+    print("\nLinker Regions (no domain or IDR):")
+    for linker in track.complement(min_length=5):
+        print(f"  -- residues {linker['start']}-{linker['end']}")
+
     avg_disorder = sum(scores) / len(scores)
     print(f"\nAverage Protein Disorder Score: {avg_disorder:.2f}")
 
@@ -49,3 +62,10 @@ if __name__ == "__main__":
     # P10275 = Androgen Receptor (Half disordered)
 
     weave_protein_report("P01106")
+
+    # GENE_WEAVING_TRACE=1 records spans; dump them next to a Prometheus textfile
+    if telemetry.is_enabled():
+        telemetry.export_jsonl("gene_weaving_trace.jsonl")
+        telemetry.write_prometheus("gene_weaving.prom")
+        for row in telemetry.timing_breakdown(telemetry.spans_since(0)):
+            print(f"  {row['span']:<40} {row['calls']:>4}x  {row['total_s'] * 1000:9.1f} ms")
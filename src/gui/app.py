@@ -1,83 +1,173 @@
+import time
+
+SCRIPT_START = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
 import sys
 import os
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import logomaker
-from Bio.SeqUtils.ProtParam import ProteinAnalysis
 
 # Path setup
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from api.uniprot_fetcher import get_uniprot_data, get_uniprot_id_from_symbol
-from analysis.disorder_analyzer import get_disorder_scores, analyze_disorder
+from analysis.disorder_analyzer import find_idrs, get_disorder_scores, idr_grid
+from analysis import disorder_model
 from api.jaspar_fetcher import search_jaspar_motifs, get_pfm_data
+from analysis.primer_pool import PrimerPool
 from analysis.primer_designer import (
     get_optimized_dna,
     generate_primers,
     get_primer_quality,
     scan_restriction_sites
 )
+from analysis.restriction_sites import CLONING_ENZYMES, find_restriction_sites
 from analysis.crispr_designer import design_grnas
+from analysis.offtarget_index import OffTargetIndex
+from analysis.motif_scanner import construct_binding_sites
+from analysis.annotation_track import AnnotationTrack
+from analysis.mutagenesis import DEFAULT_FLANK, saturation_scan, scan_mutations
 from api.string_fetcher import get_interactions
+from api import telemetry
+from api.telemetry import span
+from gui.prefetch import Prefetcher
+from gui.render import architecture_png, disorder_track, logo_png, mutation_heatmap_png
 
+IMPORTS_DONE = time.perf_counter()
 
 # --- VISUALIZATION: PROTEIN ARCHITECTURE ---
 def plot_protein_architecture(total_len, domains, idrs):
-    """Draws a horizontal diagram of domains and IDRs with full labels."""
-    fig, ax = plt.subplots(figsize=(12, 3.0))  # Increased height for labels
-    # Backbone
-    ax.add_patch(patches.Rectangle((1, 0.8), total_len, 0.4, color='lightgray', alpha=0.3))
-
-    # Plot IDRs (Thin orange)
-    for i in idrs:
-        ax.add_patch(patches.Rectangle((i['start'], 0.95), i['end'] - i['start'], 0.1, color='orange', alpha=0.6))
-
-    # Plot Domains (Colored blocks)
-    colors = ['#4A90E2', '#50E3C2', '#F5A623', '#D0021B', '#8B572A']
-    for idx, d in enumerate(domains):
-        color = '#9B51E0' if "InterPro" in d.get('label', '') else colors[idx % len(colors)]
-        ax.add_patch(patches.Rectangle((d['start'], 0.7), d['end'] - d['start'], 0.6,
-                                       edgecolor='black', facecolor=color, alpha=0.8))
-
-        # Add labels to larger domains
-        if (d['end'] - d['start']) > total_len * 0.02:
-            label_text = d['label'].split(':')[-1].strip()
-
-            ax.text(
-                (d['start'] + d['end']) / 2,
-                1.5,
-                label_text,
-                ha='left',
-                va='bottom',
-                fontsize=9,
-                fontweight='bold',
-                rotation=35  
-            )
-
-    ax.set_xlim(0, total_len + 10)
-    ax.set_ylim(0, 4)  
-    ax.axis('off')
-    st.pyplot(fig)
+    """Shows the domain/IDR diagram; the image is rendered once per distinct architecture."""
+    st.image(architecture_png(total_len, domains, idrs), use_container_width=True)
 
 
 # --- CACHE ---
 @st.cache_data(show_spinner=False)
 def get_cached_analysis(sequence):
-    return get_disorder_scores(sequence), analyze_disorder(sequence)
+    scores = get_disorder_scores(sequence)
+    return scores, find_idrs(scores)
+
+
+# IDR calls for every slider setting, segmented from the one cached prediction
+IDR_THRESHOLDS = tuple(round(0.3 + 0.05 * i, 2) for i in range(11))
+IDR_MIN_LENGTHS = (5, 10, 15, 20, 30, 40, 50, 75, 100)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_cached_idr_grid(sequence, hysteresis, smooth, max_gap):
+    scores, _ = get_cached_analysis(sequence)
+    return idr_grid(scores, IDR_THRESHOLDS, IDR_MIN_LENGTHS, hysteresis=hysteresis, smooth=smooth, max_gap=max_gap)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def get_cached_dna(protein_seq, organism):
+    return get_optimized_dna(protein_seq, organism=organism)
+
+
+# Larger saturation scans (19+ predictions per residue) need an explicit confirmation
+SCAN_CONFIRM_RESIDUES = 200
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_cached_scan(sequence, start, end, include_deletions, metric):
+    return saturation_scan(sequence, start, end, metric=metric, include_deletions=include_deletions)
+
+
+@st.cache_resource(show_spinner=False)
+def get_offtarget_index(index_dir):
+    return OffTargetIndex(index_dir)
+
+
+@st.cache_resource(show_spinner=False)
+def warm_disorder_model():
+    """Starts loading metapredict when the first session opens, once per server process."""
+    return disorder_model.warm_in_background()
+
+
+@st.cache_resource(show_spinner=False)
+def startup_timings():
+    """Filled in by the first script run of this server process."""
+    return {}
+
+
+def record_first_render():
+    timings = startup_timings()
+    if timings:
+        return
+    timings["imports_s"] = IMPORTS_DONE - SCRIPT_START
+    timings["first_render_s"] = time.perf_counter() - SCRIPT_START
+    launched = os.environ.get("GENE_WEAVING_LAUNCH_TIME")  # set by main.py
+    if launched:
+        timings["since_launch_s"] = time.time() - float(launched)
+    telemetry.record("app.first_render", timings["first_render_s"], **timings)
+
+
+# --- BACKGROUND PREFETCH ---
+PREFETCH_PARTNERS = 5
+PREFETCH_PFMS = 3
+
+
+def _prefetch_motifs(pf, gene, tax_id):
+    motifs = search_jaspar_motifs(gene, tax_id=tax_id)
+    for m in motifs[:PREFETCH_PFMS]:
+        pf.store(("pfm", m['matrix_id']), get_pfm_data(m['matrix_id']))
+    return motifs
+
+
+def _prefetch_partner(pf, symbol, tax_id):
+    """Accession, UniProt record and disorder scores of one STRING partner."""
+    acc = get_uniprot_id_from_symbol(symbol, tax_id=tax_id)
+    pf.store(("symbol", symbol, tax_id), acc)
+    if acc:
+        partner = get_uniprot_data(acc)
+        pf.store(("uniprot", acc), partner)
+        if partner and partner['sequence']:
+            get_disorder_scores(partner['sequence'])  # lands in the persistent score store
+    return acc
+
+
+def _prefetch_partners(pf, gene, tax_id):
+    partners = get_interactions(gene, tax_id=tax_id)
+    for p in partners[:PREFETCH_PARTNERS]:
+        pf.submit(("partner", p, tax_id), _prefetch_partner, pf, p, tax_id)
+    return partners
+
+
+def open_protein(u_id, data, tax_id):
+    """Makes `data` the current protein and starts prefetching its neighbourhood."""
+    st.session_state.protein_data = data
+    st.session_state.pop("mutation_scan", None)
+    st.session_state.current_id = u_id
+    st.session_state.start_val, st.session_state.end_val = 1, len(data['sequence'])
+    if u_id not in st.session_state.history: st.session_state.history.append(u_id)
+    gene = data.get('gene_name', 'Unknown')
+    pf = st.session_state.prefetcher
+    pf.submit(("motifs", gene, tax_id), _prefetch_motifs, pf, gene, tax_id)
+    pf.submit(("partners", gene, tax_id), _prefetch_partners, pf, gene, tax_id)
 
 
 # --- SETUP ---
 st.set_page_config(page_title="Gene Weaving", layout="wide", page_icon="🧬")
 st.title("🧬 Gene Weaving: TF Designer")
+record_first_render()
+if disorder_model.WARMUP_ON_START:
+    warm_disorder_model()
 
 # Session State
 if "history" not in st.session_state: st.session_state.history = []
 if "protein_data" not in st.session_state: st.session_state.protein_data = None
 if "primer_list" not in st.session_state: st.session_state.primer_list = []
+if "primer_pool" not in st.session_state: st.session_state.primer_pool = PrimerPool()
 if "start_val" not in st.session_state: st.session_state.start_val = 1
 if "end_val" not in st.session_state: st.session_state.end_val = 100
+if "prefetcher" not in st.session_state: st.session_state.prefetcher = Prefetcher()
+prefetcher = st.session_state.prefetcher
+
+with st.sidebar:
+    show_timings = st.toggle("⏱️ Timing breakdown", value=telemetry.is_enabled())
+# Tracing is switched for this session's script thread only; other sessions keep their own setting
+trace_scope = telemetry.trace_scope(show_timings)
+trace_mark = telemetry.mark()
 
 with st.sidebar:
     st.header("Search Settings")
@@ -86,13 +176,9 @@ with st.sidebar:
     tax_id = "9606" if organism == "Human" else "4932"
 
     if st.button("Analyze Protein"):
-        data = get_uniprot_data(u_id)
+        data = prefetcher.get(("uniprot", u_id), get_uniprot_data, u_id)
         if data:
-            st.session_state.protein_data = data
-            st.session_state.current_id = u_id
-            st.session_state.start_val, st.session_state.end_val = 1, len(data['sequence'])
-            st.session_state.motifs = search_jaspar_motifs(data.get('gene_name', 'Unknown'), tax_id=tax_id)
-            if u_id not in st.session_state.history: st.session_state.history.append(u_id)
+            open_protein(u_id, data, tax_id)
             st.rerun()
         else:
             st.error("Protein not found.")
@@ -101,8 +187,9 @@ with st.sidebar:
         st.write("🕒 History")
         for h_id in st.session_state.history[-3:]:
             if st.button(f"Go to {h_id}", key=f"hist_nav_{h_id}"):
-                st.session_state.current_id = h_id
-                st.session_state.protein_data = get_uniprot_data(h_id)
+                h_data = prefetcher.get(("uniprot", h_id), get_uniprot_data, h_id)
+                if h_data:
+                    open_protein(h_id, h_data, tax_id)
                 st.rerun()
 
 # --- MAIN INTERFACE ---
@@ -116,14 +203,37 @@ if st.session_state.protein_data:
     # Architecture Visual
     st.subheader("📊 Architecture & Disorder")
 
-    plot_protein_architecture(len(data['sequence']), data['domains'], idrs)
-    st.line_chart(pd.DataFrame({"Disorder Probability": scores}), color="#FF4B4B")
+    with st.expander("⚙️ IDR calling"):
+        c_thr, c_len = st.columns(2)
+        idr_threshold = c_thr.select_slider("Disorder threshold:", IDR_THRESHOLDS, value=0.5)
+        idr_min_length = c_len.select_slider("Minimum IDR length:", IDR_MIN_LENGTHS, value=30)
+        c_hys, c_smooth, c_gap = st.columns(3)
+        hysteresis = c_hys.number_input("Hysteresis:", 0.0, 0.3, 0.0, 0.05,
+                                        help="IDRs extend while scores stay above threshold minus this")
+        smooth = c_smooth.number_input("Smoothing window:", 1, 51, 1, 2)
+        max_gap = c_gap.number_input("Merge gaps up to:", 0, 50, 0)
+        idr_calls = get_cached_idr_grid(data['sequence'], hysteresis, smooth, max_gap)
+        idrs = idr_calls[idr_threshold, idr_min_length]
+        coverage = pd.DataFrame(
+            [[sum(d['end'] - d['start'] + 1 for d in idr_calls[t, m]) / max(len(scores), 1) * 100
+              for m in IDR_MIN_LENGTHS] for t in IDR_THRESHOLDS], index=IDR_THRESHOLDS, columns=IDR_MIN_LENGTHS)
+        st.caption("% of residues in IDRs per threshold (rows) and minimum length (columns):")
+        st.dataframe(coverage.round(1), use_container_width=True)
+
+    with span("render.architecture"):
+        plot_protein_architecture(len(data['sequence']), data['domains'], idrs)
+    seq_len = len(data['sequence'])
+    view_s, view_e = (1, seq_len) if seq_len < 2 else st.slider(
+        "Disorder track window (residues):", 1, seq_len, (1, seq_len), key=f"view_{st.session_state.current_id}")
+    with span("render.disorder_track"):
+        pos, vals = disorder_track(scores, view_s, view_e, idrs)
+        st.line_chart(pd.DataFrame({"Disorder Probability": vals}, index=pos), color="#FF4B4B")
 
     tab_design, tab_motifs, tab_interact, tab_crispr = st.tabs([
         "🏗️ Construct Designer", "🧬 Binding Motifs", "🤝 Interactions", "✂️ CRISPR/gRNA"
     ])
 
-    with tab_design:
+    with tab_design, span("render.construct_designer"):
         col_view, col_input = st.columns([1, 1])
         with col_view:
             st.subheader("📋 Structural Features")
@@ -146,70 +256,136 @@ if st.session_state.protein_data:
             st.session_state.start_val, st.session_state.end_val = cur_s, cur_e
 
             target_aa = data['sequence'][int(cur_s) - 1: int(cur_e)]
-            target_dna = get_optimized_dna(target_aa, organism=organism)
+            target_dna = get_cached_dna(target_aa, organism)
 
             if target_aa:
+                from Bio.SeqUtils.ProtParam import ProteinAnalysis
+
                 pa = ProteinAnalysis(target_aa)
                 st.write(f"**MW:** {pa.molecular_weight() / 1000:.1f} kDa | **pI:** {pa.isoelectric_point():.1f}")
 
             sites = scan_restriction_sites(target_dna)
             if sites:
-                st.error(f"⚠️ Internal Restriction Sites: {', '.join(sites)}")
+                hits = find_restriction_sites(target_dna, CLONING_ENZYMES)
+                where = ", ".join(f"{h['enzyme']} @ codon {h['codon'] + int(cur_s) - 1}" for h in hits)
+                st.error(f"⚠️ Internal Restriction Sites: {where}")
             else:
                 st.success("✅ No internal restriction sites.")
 
+            # A TF construct carrying its own binding site can autoregulate; only check once motifs are in
+            motif_key = ("motifs", data.get('gene_name', 'Unknown'), tax_id)
+            if target_dna and prefetcher.is_ready(motif_key):
+                own = {m['name']: prefetcher.get(("pfm", m['matrix_id']), get_pfm_data, m['matrix_id'])
+                       for m in prefetcher.get(motif_key, lambda: [])[:PREFETCH_PFMS]}
+                own = {name: pfm for name, pfm in own.items() if pfm is not None}
+                bound = construct_binding_sites(target_dna, own) if own else []
+                if bound:
+                    where = ", ".join(f"{h['motif']} @ nt {h['start'] + 1} ({h['strand']})" for h in bound)
+                    st.warning(f"⚠️ Construct contains predicted binding sites for its own motifs: {where}")
+
             if st.button("Add Construct to Collection"):
-                p = generate_primers(target_dna, "GAATTC", "GGATCC")
-                st.session_state.primer_list.append(
-                    {"Label": f"{st.session_state.current_id}_{cur_s}-{cur_e}", "Fwd": p['fwd'], "Rev": p['rev']})
-                st.toast("Construct Saved!")
-
-    with tab_motifs:
-        if st.session_state.get('motifs'):
-            m_names = [m['name'] for m in st.session_state.motifs]
+                label = f"{st.session_state.current_id}_{cur_s}-{cur_e}"
+                if label in {c["Label"] for c in st.session_state.primer_list}:
+                    st.toast(f"{label} is already in the collection.")
+                else:
+                    p = generate_primers(target_dna, "GAATTC", "GGATCC")
+                    st.session_state.primer_list.append(
+                        {"Label": label, "Fwd": p['fwd'], "Rev": p['rev'],
+                         "Tm Fwd": round(p['tm_fwd'], 1), "Tm Rev": round(p['tm_rev'], 1)})
+                    st.session_state.primer_pool.add_construct(label, p['fwd'], p['rev'], target_dna)
+                    st.toast("Construct Saved!")
+
+        with st.expander("🧪 Saturation Mutagenesis (disorder)"):
+            st.caption(f"Every substitution at residues {cur_s}-{cur_e}, scored as the change in predicted disorder.")
+            c_metric, c_del = st.columns(2)
+            metric = c_metric.radio("Score:", ["site", "mean"], horizontal=True,
+                                    help=f"Change at the mutated residue, or mean change over its ±{DEFAULT_FLANK}-residue window")
+            with_del = c_del.checkbox("Include deletions")
+            n_variants = (int(cur_e) - int(cur_s) + 1) * (19 + with_del)
+            confirmed = True
+            if int(cur_e) - int(cur_s) + 1 > SCAN_CONFIRM_RESIDUES:
+                st.warning(f"{int(cur_e) - int(cur_s) + 1:,} residues means {n_variants:,} variants, which can take "
+                           f"minutes. Narrow the Start/End Residue range above, or confirm the full scan.")
+                confirmed = st.checkbox("Scan the whole range anyway", key="confirm_saturation")
+            if st.button("Run Scan", key="run_saturation", disabled=not confirmed):
+                with st.spinner(f"Scoring {n_variants:,} variants..."):
+                    st.session_state.mutation_scan = get_cached_scan(data['sequence'], int(cur_s), int(cur_e),
+                                                                     with_del, metric)
+            scan = st.session_state.get("mutation_scan")
+            if scan is not None and len(scan):
+                st.image(mutation_heatmap_png(scan), use_container_width=True)
+                st.dataframe(pd.DataFrame(scan.top(10)).round(3), hide_index=True, use_container_width=True)
+                st.download_button("📥 Delta matrix CSV", scan.to_frame().to_csv().encode('utf-8'),
+                                   f"saturation_{st.session_state.current_id}_{scan.positions[0]}-{scan.positions[-1]}.csv",
+                                   "text/csv")
+
+            listed = st.text_input("Specific mutants:", placeholder="e.g. P12A, K45del")
+            if listed:
+                try:
+                    rows = scan_mutations(data['sequence'], [m for m in listed.replace(",", " ").split() if m])
+                    st.dataframe(pd.DataFrame(rows).round(3), hide_index=True, use_container_width=True)
+                except ValueError as exc:
+                    st.error(str(exc))
+
+    gene = data.get('gene_name', 'Unknown')
+
+    with tab_motifs, span("render.motifs"):
+        motifs = prefetcher.get(("motifs", gene, tax_id), _prefetch_motifs, prefetcher, gene, tax_id)
+        if motifs:
+            m_names = [m['name'] for m in motifs]
             sel = st.selectbox("Select Motif Version:", m_names)
-            m_id = st.session_state.motifs[m_names.index(sel)]['matrix_id']
-            pfm = get_pfm_data(m_id)
+            m_id = motifs[m_names.index(sel)]['matrix_id']
+            pfm = prefetcher.get(("pfm", m_id), get_pfm_data, m_id)
             if pfm is not None:
-                fig_m, ax_m = plt.subplots(figsize=(8, 2.5))
-                logomaker.Logo(logomaker.transform_matrix(pfm, from_type='counts', to_type='information'), ax=ax_m)
-                st.pyplot(fig_m)
+                st.image(logo_png(pfm))
         else:
             st.warning("No direct DNA-binding motifs found.")
             st.info("💡 Hint: This may be a co-activator. Check 'Interactions' for partners.")
 
-    with tab_interact:
+    with tab_interact, span("render.interactions"):
         st.subheader("🤝 Physical Interaction Network (String-DB)")
 
-        partners = get_interactions(data.get('gene_name', 'Unknown'), tax_id=tax_id)
+        partners = prefetcher.get(("partners", gene, tax_id), _prefetch_partners, prefetcher, gene, tax_id)
         if partners:
             for p in partners:
                 c1, c2 = st.columns([3, 1])
                 c1.code(p)
                 if c2.button("Analyze Partner", key=f"switch_{p}"):
-                    new_id = get_uniprot_id_from_symbol(p, tax_id=tax_id)
-                    if new_id:
-                        st.session_state.current_id = new_id
-                        st.session_state.protein_data = None
+                    new_id = prefetcher.get(("partner", p, tax_id), _prefetch_partner, prefetcher, p, tax_id)
+                    new_data = prefetcher.get(("uniprot", new_id), get_uniprot_data, new_id) if new_id else None
+                    if new_data:
+                        open_protein(new_id, new_data, tax_id)
                         st.rerun()
+                    else:
+                        st.error(f"No UniProt entry found for {p}.")
         else:
             st.write("No high-confidence partners found.")
 
-    with tab_crispr:
+    with tab_crispr, span("render.crispr"):
         st.subheader("✂️ gRNA Domain Mapping")
+        index_dir = st.text_input("Off-target index (optional):", value=os.environ.get("GENE_WEAVING_OFFTARGET_INDEX", ""))
 
         if st.button("Run CRISPR Scan"):
             grnas = design_grnas(target_dna)
             if grnas:
+                specificity = {}
+                if index_dir and os.path.isdir(index_dir):
+                    for r in get_offtarget_index(index_dir).score_guides(grnas):
+                        if r['specificity'] is not None:
+                            specificity[r['sequence']] = r
                 mapping = []
-                for g in grnas:
-                    abs_pos = cur_s + (g['start_index'] // 3)
-                    loc = "Linker Region"
-                    for d in data['domains']:
-                        if d['start'] <= abs_pos <= d['end']:
-                            loc = f"🎯 Hits {d['label']}"
-                    mapping.append({"gRNA ID": g['label'], "Abs Pos (AA)": int(abs_pos), "Location": loc,
-                                    "GC%": f"{g['gc']:.0f}%"})
+                positions = [cur_s + (g['start_index'] // 3) for g in grnas]
+                track = AnnotationTrack.from_protein(data, idrs)
+                for g, abs_pos, hits in zip(grnas, positions, track.query_points(positions)):
+                    labels = [h['label'] for h in hits]
+                    loc = f"🎯 Hits {', '.join(labels)}" if labels else "Linker Region"
+                    row = {"gRNA ID": g['label'], "Strand": g['strand'], "Abs Pos (AA)": int(abs_pos),
+                           "Location": loc, "GC%": f"{g['gc']:.0f}%"}
+                    if g['sequence'] in specificity:
+                        hit = specificity[g['sequence']]
+                        row["Off-targets (0/1/2/3 mm)"] = "/".join(str(c) for c in hit['hit_counts'])
+                        row["Specificity"] = f"{hit['specificity']:.0f}"
+                    mapping.append(row)
                 st.table(pd.DataFrame(mapping))
             else:
                 st.error("No NGG PAM sites found in this selection.")
@@ -220,6 +396,31 @@ if st.session_state.protein_data:
         st.dataframe(pd.DataFrame(st.session_state.primer_list), use_container_width=True)
         csv = pd.DataFrame(st.session_state.primer_list).to_csv(index=False).encode('utf-8')
         st.download_button("📥 Download Primer CSV", csv, f"primers_{st.session_state.current_id}.csv", "text/csv")
+        pool_issues = st.session_state.primer_pool.issues
+        if pool_issues:
+            st.warning(f"⚠️ {len(pool_issues)} 3' dimer / mispriming issue(s) if these primers are pooled:")
+            st.dataframe(pd.DataFrame(pool_issues), hide_index=True, use_container_width=True)
+        else:
+            st.success("✅ No 3' cross-dimers or mispriming between saved constructs.")
 else:
 
     st.info("Enter a UniProt ID to begin (e.g., P01106 for Human MYC).")
+
+# --- DEBUG: TIMING BREAKDOWN OF THIS RERUN ---
+if show_timings:
+    with st.sidebar.expander("⏱️ Last rerun", expanded=True):
+        breakdown = telemetry.timing_breakdown(telemetry.spans_since(trace_mark, scope=trace_scope))
+        if breakdown:
+            st.dataframe(pd.DataFrame(breakdown).round(4), hide_index=True, use_container_width=True)
+        else:
+            st.caption("No instrumented work ran.")
+        counters = telemetry.snapshot()["counters"]
+        if counters:
+            st.dataframe(pd.DataFrame([{"metric": c["metric"], "labels": ", ".join(f"{k}={v}" for k, v in c["labels"].items()),
+                                        "value": c["value"]} for c in counters]), hide_index=True, use_container_width=True)
+        st.download_button("📥 Prometheus textfile", telemetry.prometheus_text(), "gene_weaving.prom", "text/plain")
+        startup = ", ".join(f"{k[:-2].replace('_', ' ')} {v:.2f} s" for k, v in startup_timings().items())
+        model = ("loaded (" + ", ".join(f"{k[:-2]} {v:.2f} s" for k, v in disorder_model.load_times.items()) + ")"
+                 if disorder_model.is_loaded() else f"served by {disorder_model.service_url}"
+                 if disorder_model.service_url else "not loaded")
+        st.caption(f"Startup: {startup} · metapredict {model}")
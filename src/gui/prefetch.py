@@ -0,0 +1,87 @@
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+
+class Prefetcher:
+    """
+    Per-session background executor with a bounded result cache.
+
+    Work is keyed; submitting a key that is already cached or in flight reuses
+    the existing future, so the GUI can ask for anything a prefetch task may
+    already be computing. Only finished entries are evicted, oldest first.
+    Failed work and None results are not kept, so the next request retries.
+    The pool shuts down with `shutdown()` or once the session drops the object.
+    """
+
+    def __init__(self, max_workers=4, max_entries=256):
+        self.max_entries = max_entries
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gw-prefetch")
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, self._pool.shutdown, wait=False, cancel_futures=True)
+
+    def _evict(self):
+        while len(self._futures) > self.max_entries:
+            for key, future in self._futures.items():
+                if future.done():
+                    del self._futures[key]
+                    break
+            else:
+                return
+
+    def _discard_if_failed(self, key, future):
+        """Drops `key` when its future raised or produced None (only if it is still the cached one)."""
+        if future.cancelled() or future.exception() is not None or future.result() is None:
+            with self._lock:
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+            return True
+        return False
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Schedules `fn` in the background unless `key` is already cached or running."""
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self._futures.move_to_end(key)
+                return future
+            future = self._pool.submit(fn, *args, **kwargs)
+            self._futures[key] = future
+            self._evict()
+        future.add_done_callback(lambda f: self._discard_if_failed(key, f))
+        return future
+
+    def store(self, key, value):
+        """Records a value computed elsewhere (e.g. inside another prefetch task); None is not kept."""
+        if value is None:
+            return
+        future = Future()
+        future.set_result(value)
+        with self._lock:
+            self._futures.setdefault(key, future)
+            self._evict()
+
+    def get(self, key, fn, *args, **kwargs):
+        """
+        Returns the result for `key`, waiting on a prefetch or computing it now.
+        A prefetch that failed or returned None is run again here.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+        if future is not None:
+            wait([future])
+            if not self._discard_if_failed(key, future):
+                return future.result()
+        value = fn(*args, **kwargs)
+        self.store(key, value)
+        return value
+
+    def is_ready(self, key):
+        with self._lock:
+            future = self._futures.get(key)
+        return future is not None and future.done()
+
+    def shutdown(self):
+        self._finalizer()
@@ -0,0 +1,198 @@
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+_images = OrderedDict()
+_lock = threading.Lock()
+MAX_IMAGES = 128
+
+
+def content_hash(*parts):
+    """Stable hash of JSON-serialisable parts (DataFrames are hashed by their values)."""
+    h = hashlib.sha256()
+    for part in parts:
+        if hasattr(part, "to_numpy"):
+            h.update(repr(list(part.columns)).encode())
+            h.update(np.ascontiguousarray(part.to_numpy(dtype=float)).tobytes())
+        else:
+            h.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def _pyplot():
+    """matplotlib is only imported once something is actually drawn (it costs ~0.7 s)."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _cached_png(key, draw):
+    with _lock:
+        png = _images.get(key)
+        if png is not None:
+            _images.move_to_end(key)
+            return png
+    fig = draw()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight", dpi=110)
+    _pyplot().close(fig)
+    png = buf.getvalue()
+    with _lock:
+        _images[key] = png
+        while len(_images) > MAX_IMAGES:
+            _images.popitem(last=False)
+    return png
+
+
+def draw_architecture(total_len, domains, idrs):
+    """Draws a horizontal diagram of domains and IDRs with full labels."""
+    from matplotlib import patches
+
+    fig, ax = _pyplot().subplots(figsize=(12, 3.0))  # Increased height for labels
+    # Backbone
+    ax.add_patch(patches.Rectangle((1, 0.8), total_len, 0.4, color='lightgray', alpha=0.3))
+
+    # Plot IDRs (Thin orange)
+    for i in idrs:
+        ax.add_patch(patches.Rectangle((i['start'], 0.95), i['end'] - i['start'], 0.1, color='orange', alpha=0.6))
+
+    # Plot Domains (Colored blocks)
+    colors = ['#4A90E2', '#50E3C2', '#F5A623', '#D0021B', '#8B572A']
+    for idx, d in enumerate(domains):
+        color = '#9B51E0' if "InterPro" in d.get('label', '') else colors[idx % len(colors)]
+        ax.add_patch(patches.Rectangle((d['start'], 0.7), d['end'] - d['start'], 0.6,
+                                       edgecolor='black', facecolor=color, alpha=0.8))
+
+        # Add labels to larger domains
+        if (d['end'] - d['start']) > total_len * 0.02:
+            label_text = d['label'].split(':')[-1].strip()
+
+            ax.text(
+                (d['start'] + d['end']) / 2,
+                1.5,
+                label_text,
+                ha='left',
+                va='bottom',
+                fontsize=9,
+                fontweight='bold',
+                rotation=35
+            )
+
+    ax.set_xlim(0, total_len + 10)
+    ax.set_ylim(0, 4)
+    ax.axis('off')
+    return fig
+
+
+def architecture_png(total_len, domains, idrs):
+    """PNG of the architecture diagram, rendered once per distinct content."""
+    key = "arch:" + content_hash(total_len, domains, idrs)
+    return _cached_png(key, lambda: draw_architecture(total_len, domains, idrs))
+
+
+def logo_png(pfm):
+    """PNG of the information-content logo for a PFM, rendered once per distinct matrix."""
+    import logomaker
+
+    def draw():
+        fig, ax = _pyplot().subplots(figsize=(8, 2.5))
+        logomaker.Logo(logomaker.transform_matrix(pfm, from_type='counts', to_type='information'), ax=ax)
+        return fig
+
+    return _cached_png("logo:" + content_hash(pfm), draw)
+
+
+def draw_mutation_heatmap(scan):
+    """Residue x position heatmap of a saturation scan; red raises disorder, blue lowers it."""
+    plt = _pyplot()
+    delta = np.ma.masked_invalid(scan.delta.T)
+    limit = max(float(np.abs(delta).max()) if delta.count() else 0.0, 1e-3)
+    cmap = plt.get_cmap("RdBu_r").copy()
+    cmap.set_bad("#dddddd")
+
+    fig, ax = plt.subplots(figsize=(12, 3.6))
+    first, last = int(scan.positions[0]), int(scan.positions[-1])
+    im = ax.imshow(delta, aspect="auto", cmap=cmap, vmin=-limit, vmax=limit, interpolation="nearest",
+                   extent=(first - 0.5, last + 0.5, len(scan.residues) - 0.5, -0.5))
+    ax.set_yticks(range(len(scan.residues)))
+    ax.set_yticklabels(list(scan.residues), fontsize=7)
+    ax.set_xlabel("Residue")
+    fig.colorbar(im, ax=ax, pad=0.01, label=f"Δ disorder ({scan.metric})")
+    return fig
+
+
+def mutation_heatmap_png(scan):
+    """PNG of a saturation-scan heatmap, rendered once per distinct result."""
+    key = "mut:" + content_hash(scan.to_frame(), scan.metric)
+    return _cached_png(key, lambda: draw_mutation_heatmap(scan))
+
+
+def minmax_downsample(values, n_buckets):
+    """
+    Indices of the min and max of each of `n_buckets` equal buckets, in order.
+    Keeps every local extreme that a line chart at that resolution could show.
+    """
+    n = len(values)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    width = int(np.max(np.diff(edges)))
+    # Pad each bucket to the same width so argmin/argmax run as one 2-D operation
+    idx = edges[:-1, None] + np.arange(width)
+    valid = idx < edges[1:, None]
+    idx = np.minimum(idx, n - 1)
+    v = np.asarray(values, dtype=float)[idx]
+    lo = np.where(valid, v, np.inf).argmin(axis=1)
+    hi = np.where(valid, v, -np.inf).argmax(axis=1)
+    rows = np.arange(n_buckets)
+    return np.unique(np.concatenate([idx[rows, lo], idx[rows, hi], [0, n - 1]]))
+
+
+def lttb_downsample(values, n_out):
+    """Largest-Triangle-Three-Buckets: indices of `n_out` visually representative points."""
+    n = len(values)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    y = np.asarray(values, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    picked = [0]
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt_lo, nxt_hi = edges[b + 1], edges[b + 2] if b + 2 < len(edges) else n
+        avg_x, avg_y = (nxt_lo + nxt_hi - 1) / 2, y[nxt_lo:nxt_hi].mean()
+        a = picked[-1]
+        xs = np.arange(lo, hi)
+        area = np.abs((a - avg_x) * (y[lo:hi] - y[a]) - (a - xs) * (avg_y - y[a]))
+        picked.append(lo + int(area.argmax()))
+    picked.append(n - 1)
+    return np.array(picked)
+
+
+def disorder_track(scores, start, end, idrs=(), max_points=1500, method="minmax"):
+    """
+    Level-of-detail view of the disorder scores for residues start..end (1-based).
+
+    Windows that fit in `max_points` are returned in full; larger ones are
+    reduced with min-max bucketing (or LTTB), and the residues on either side
+    of every IDR boundary inside the window are always kept so the threshold
+    crossings stay where they are. Returns (residue positions, scores).
+    """
+    window = np.asarray(scores, dtype=float)[start - 1:end]
+    if method == "lttb":
+        keep = lttb_downsample(window, max_points)
+    else:
+        keep = minmax_downsample(window, max(1, max_points // 2))
+
+    boundaries = []
+    for r in idrs:
+        for pos in (r['start'] - 1, r['start'], r['end'], r['end'] + 1):
+            if start <= pos <= end:
+                boundaries.append(pos - start)
+    keep = np.unique(np.concatenate([keep, np.array(boundaries, dtype=int)]))
+    return keep + start, window[keep]
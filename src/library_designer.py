@@ -0,0 +1,195 @@
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+# Same import setup as core_logic: resolve the api/analysis packages from here
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api.uniprot_fetcher import get_uniprot_data, get_uniprot_data_many
+from analysis.disorder_analyzer import analyze_disorder
+from analysis.primer_designer import get_optimized_dna, generate_primers, scan_restriction_sites
+from analysis.restriction_sites import ENZYMES
+
+DOMAIN_TYPES = ('Domain', 'Region', 'DNA_BIND', 'Zinc finger', 'Repeat', 'InterPro')
+
+COLUMNS = ["uniprot_id", "gene_name", "label", "start", "end", "aa_length", "insert_aa", "insert_dna",
+           "fwd", "rev", "tm_fwd", "tm_rev", "internal_sites", "duplicate_of"]
+
+
+def enumerate_boundaries(length, domains, idrs, flank_gap=10):
+    """
+    Truncation series for one protein: full length, every domain, every IDR,
+    and every domain extended into its flanking IDR(s) on the N side, C side
+    and both. An IDR flanks a domain if it starts/ends within `flank_gap`
+    residues of it. Returns unique (label, start, end) tuples, 1-based inclusive.
+    """
+    constructs = [("full", 1, length)]
+    for d in domains:
+        if d['type'] in DOMAIN_TYPES:
+            constructs.append((f"{d['label']}", d['start'], d['end']))
+    for i, idr in enumerate(idrs, start=1):
+        constructs.append((f"IDR{i}", idr['start'], idr['end']))
+
+    for d in domains:
+        if d['type'] not in DOMAIN_TYPES:
+            continue
+        n_side = [r for r in idrs if r['end'] < d['end'] and d['start'] - flank_gap <= r['end'] + 1]
+        c_side = [r for r in idrs if r['start'] > d['start'] and r['start'] - 1 <= d['end'] + flank_gap]
+        n_idr = min(n_side, key=lambda r: abs(d['start'] - r['end']), default=None)
+        c_idr = min(c_side, key=lambda r: abs(r['start'] - d['end']), default=None)
+        if n_idr:
+            constructs.append((f"IDR+{d['label']}", min(n_idr['start'], d['start']), d['end']))
+        if c_idr:
+            constructs.append((f"{d['label']}+IDR", d['start'], max(c_idr['end'], d['end'])))
+        if n_idr and c_idr:
+            constructs.append((f"IDR+{d['label']}+IDR", min(n_idr['start'], d['start']),
+                               max(c_idr['end'], d['end'])))
+
+    seen, unique = set(), []
+    for label, start, end in constructs:
+        start, end = max(1, int(start)), min(length, int(end))
+        if start <= end and (start, end) not in seen:
+            seen.add((start, end))
+            unique.append((label, start, end))
+    return unique
+
+
+@lru_cache(maxsize=4096)
+def _design_insert(insert_aa, organism, fwd_enzyme, rev_enzyme):
+    dna = get_optimized_dna(insert_aa, organism=organism, forbidden_sites=[fwd_enzyme, rev_enzyme])
+    primers = generate_primers(dna, ENZYMES[fwd_enzyme][0], ENZYMES[rev_enzyme][0])
+    sites = scan_restriction_sites(dna, {e: ENZYMES[e] for e in (fwd_enzyme, rev_enzyme)})
+    return dna, primers, sites
+
+
+def design_protein(uniprot_id, data, organism="Human", fwd_enzyme="EcoRI", rev_enzyme="BamHI"):
+    """All constructs for one protein, as rows in COLUMNS order (duplicate_of left empty)."""
+    if data is None:
+        data = get_uniprot_data(uniprot_id)
+    if not data or not data['sequence']:
+        return []
+    seq = data['sequence']
+    idrs = analyze_disorder(seq)
+
+    rows = []
+    for label, start, end in enumerate_boundaries(len(seq), data['domains'], idrs):
+        insert_aa = seq[start - 1:end]
+        dna, primers, sites = _design_insert(insert_aa, organism, fwd_enzyme, rev_enzyme)
+        rows.append({
+            "uniprot_id": uniprot_id, "gene_name": data['gene_name'],
+            "label": f"{uniprot_id}_{label}_{start}-{end}", "start": start, "end": end,
+            "aa_length": len(insert_aa), "insert_aa": insert_aa, "insert_dna": dna,
+            "fwd": primers['fwd'], "rev": primers['rev'],
+            "tm_fwd": round(primers['tm_fwd'], 1), "tm_rev": round(primers['tm_rev'], 1),
+            "internal_sites": ",".join(sites), "duplicate_of": "",
+        })
+    return rows
+
+
+class _RowWriter:
+    """Appends row batches to CSV, or to Parquet when the path ends in .parquet."""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet = path.endswith(".parquet")
+        self._writer = None
+        if not self._parquet:
+            self._fh = open(path, "w", newline="")
+            self._writer = csv.DictWriter(self._fh, fieldnames=COLUMNS)
+            self._writer.writeheader()
+
+    def write(self, rows):
+        if not rows:
+            return
+        if self._parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = pa.schema([(c, pa.int64() if c in ("start", "end", "aa_length") else
+                                 pa.float64() if c in ("tm_fwd", "tm_rev") else pa.string()) for c in COLUMNS])
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, schema)
+            self._writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+        else:
+            self._writer.writerows(rows)
+            self._fh.flush()
+
+    def close(self):
+        if self._parquet:
+            if self._writer is not None:
+                self._writer.close()
+        else:
+            self._fh.close()
+
+
+def design_library(uniprot_ids, out_path, organism="Human", fwd_enzyme="EcoRI", rev_enzyme="BamHI", workers=None):
+    """
+    Designs truncation libraries for many proteins and streams them to `out_path`.
+
+    Entries are fetched in one batch, proteins are processed in parallel, and
+    each protein's rows are written, in input order, as soon as it and every
+    protein before it have finished. An insert identical to one earlier in the
+    input is emitted with `duplicate_of` set and no DNA or primers, so the
+    output does not depend on which worker finishes first.
+    Returns the number of rows written.
+    """
+    for enzyme in (fwd_enzyme, rev_enzyme):
+        if enzyme not in ENZYMES:
+            raise ValueError(f"Unknown enzyme: {enzyme}")
+    entries = get_uniprot_data_many(uniprot_ids)
+    writer = _RowWriter(out_path)
+    seen = {}
+    written = 0
+
+    def emit(rows):
+        nonlocal written
+        for row in rows:
+            first = seen.setdefault(row['insert_aa'], row['label'])
+            if first != row['label']:
+                row.update(duplicate_of=first, insert_dna="", fwd="", rev="", tm_fwd=None, tm_rev=None)
+        writer.write(rows)
+        written += len(rows)
+
+    try:
+        if workers == 0:
+            for uid, data in entries.items():
+                emit(design_protein(uid, data, organism, fwd_enzyme, rev_enzyme))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(design_protein, uid, data, organism, fwd_enzyme, rev_enzyme)
+                           for uid, data in entries.items()]
+                for future in futures:  # submission order keeps `duplicate_of` deterministic
+                    emit(future.result())
+    finally:
+        writer.close()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Design domain/IDR truncation libraries for many proteins.")
+    parser.add_argument("ids", nargs="*", help="UniProt accessions")
+    parser.add_argument("--ids-file", help="File with one UniProt accession per line")
+    parser.add_argument("-o", "--out", default="library.csv", help="Output .csv or .parquet")
+    parser.add_argument("--organism", choices=["Human", "Yeast"], default="Human")
+    parser.add_argument("--fwd-enzyme", default="EcoRI")
+    parser.add_argument("--rev-enzyme", default="BamHI")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    ids = list(args.ids)
+    if args.ids_file:
+        with open(args.ids_file) as fh:
+            ids += [line.strip() for line in fh if line.strip()]
+    if not ids:
+        parser.error("no UniProt IDs given")
+
+    n = design_library(ids, args.out, organism=args.organism, fwd_enzyme=args.fwd_enzyme,
+                       rev_enzyme=args.rev_enzyme, workers=args.workers)
+    print(f"Wrote {n} constructs for {len(set(ids))} proteins to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
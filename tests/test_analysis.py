@@ -29,4 +29,586 @@ def test_crispr_coordinate_logic():
     guides = design_grnas(test_dna)
     assert len(guides) > 0
     assert "start_index" in guides[0]
-    assert guides[0]['pam'] == "NGG"
\ No newline at end of file
+    assert guides[0]['pam'] == "NGG"
+
+def test_proteome_pipeline_writes_parquet_and_resumes(tmp_path):
+    from src.analysis.proteome_pipeline import run_disorder_pipeline, iter_results
+
+    fasta = tmp_path / "mini.fasta"
+    fasta.write_text(">sp|P00001|A_HUMAN\nMSSSPPPGGS" * 1 + "MSSSPPPGGS" * 7 + "\n"
+                     ">sp|P00002|B_HUMAN\nMKVLAAGIVG\nMKVLAAGIVG\n"
+                     ">P00003 short\nMEEPQSDPSV\n")
+    out_dir = tmp_path / "scores"
+
+    stats = run_disorder_pipeline(str(fasta), str(out_dir), workers=0, batch_size=2)
+    assert stats == {"processed": 3, "skipped": 0}
+
+    results = {rid: (scores, idrs) for rid, scores, idrs in iter_results(str(out_dir))}
+    assert set(results) == {"P00001", "P00002", "P00003"}
+    assert len(results["P00002"][0]) == 20
+
+    # A second run finds every ID checkpointed and does no work
+    stats = run_disorder_pipeline(str(fasta), str(out_dir), workers=0, batch_size=2)
+    assert stats == {"processed": 0, "skipped": 3}
+
+
+def test_score_store_roundtrip_and_pipeline_import(tmp_path):
+    import numpy as np
+    from src.analysis.score_store import ScoreStore, import_pipeline_results
+    from src.analysis.proteome_pipeline import run_disorder_pipeline
+
+    store = ScoreStore(str(tmp_path / "store"))
+    store.put("MKV", [0.1, 0.5, 0.9])
+    assert store.get("mkv").tolist() == pytest.approx([0.1, 0.5, 0.9])
+    assert store.get("MKVL") is None
+    store.flush()
+
+    # Lookups from a fresh instance read the memory-mapped file directly
+    reopened = ScoreStore(str(tmp_path / "store"))
+    hit = reopened.get("MKV")
+    assert isinstance(hit.base, np.memmap) or isinstance(hit, np.memmap)
+
+    fasta = tmp_path / "mini.fasta"
+    fasta.write_text(">A\nMEEPQSDPSVEPPLSQETFSDLWKLL\n>B\nMKVLAAGIVGMKVLAAGIVG\n")
+    run_disorder_pipeline(str(fasta), str(tmp_path / "out"), workers=0)
+    assert import_pipeline_results(reopened, str(tmp_path / "out")) == 2
+    assert len(reopened.get("MKVLAAGIVGMKVLAAGIVG")) == 20
+    assert import_pipeline_results(reopened, str(tmp_path / "out")) == 0
+
+
+def test_score_store_put_is_cheap_and_flushes_soon(tmp_path, monkeypatch):
+    import time
+    import numpy as np
+    from src.analysis.score_store import ScoreStore
+
+    store = ScoreStore(str(tmp_path / "store"), flush_after_s=0.05)
+    store.bulk_import([("MKV", [0.1, 0.5, 0.9])])
+    loads = []
+    real_load = np.load
+    monkeypatch.setattr(np, "load", lambda *a, **kw: loads.append(a) or real_load(*a, **kw))
+    store.put("MKVL", [0.2] * 4)
+    assert loads == []  # the index file is unchanged, so it is not re-read
+
+    # Without an explicit flush, other processes see the entry shortly afterwards
+    deadline = time.monotonic() + 5
+    while ScoreStore(str(tmp_path / "store")).get("MKVL") is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def test_score_store_concurrent_writers(tmp_path):
+    import subprocess
+    import sys
+    from src.analysis.score_store import ScoreStore
+
+    path = str(tmp_path / "shared")
+    writer = ("import sys; sys.path.insert(0, {root!r})\n"
+              "from src.analysis.score_store import ScoreStore\n"
+              "store = ScoreStore({path!r}, flush_every=7)\n"
+              "w = {w}\n"
+              "for i in range(60):\n"
+              "    store.put('M' + 'ACDEFGHIK'[w] * (i + 1), [w + i / 100] * (i + 2))\n"
+              "store.bulk_import([('W' + 'ACDEFGHIK'[w] * (i + 1), [w] * (i + 2)) for i in range(40)])\n")
+    root = str(__import__("pathlib").Path(__file__).resolve().parents[1])
+    procs = [subprocess.Popen([sys.executable, "-c", writer.format(root=root, path=path, w=w)]) for w in range(4)]
+    assert all(p.wait() == 0 for p in procs)
+
+    store = ScoreStore(path)
+    assert len(store) == 4 * 100
+    for w in range(4):
+        for i in range(60):
+            assert store.get("M" + "ACDEFGHIK"[w] * (i + 1)).tolist() == pytest.approx([w + i / 100] * (i + 2))
+        assert store.get("W" + "ACDEFGHIK"[w] * 40).tolist() == [w] * 41
+
+
+def test_disorder_scores_served_from_store(tmp_path, monkeypatch):
+    from src.analysis import disorder_analyzer, score_store
+
+    monkeypatch.setattr(score_store, "_default_store", score_store.ScoreStore(str(tmp_path / "store")))
+    seq = "MEEPQSDPSVEPPLSQETFSDLWKLLPENNVLSPLPSQAMDDLMLSPDDIEQWFTEDPGP"
+    first = disorder_analyzer.get_disorder_scores(seq)
+
+    def no_prediction(sequence):
+        raise AssertionError("predictor should not run for a stored sequence")
+
+    monkeypatch.setattr(disorder_analyzer, "predict_disorder", no_prediction)
+    assert disorder_analyzer.get_disorder_scores(seq).tolist() == pytest.approx(list(first))
+    assert disorder_analyzer.analyze_disorder(seq) == disorder_analyzer.find_idrs(first)
+
+    # With a remote service the service writes the store; the client only reads it
+    monkeypatch.setattr(disorder_analyzer, "is_remote", lambda: True)
+    monkeypatch.setattr(disorder_analyzer, "predict_disorder", lambda s: [0.5] * len(s))
+    assert list(disorder_analyzer.get_disorder_scores("MKKP")) == [0.5] * 4
+    assert score_store.get_score_store().get("MKKP") is None
+
+
+def test_guide_scanner_both_strands_and_chunk_boundaries():
+    from src.analysis.crispr_designer import scan_guides
+
+    # One NGG site on each strand: ...AGG on +, CCT... (revcomp of AGG) on -
+    dna = "CCT" + "ACGTACGTACGTACGTACGTAC" + "CTTTTGCATGCATGCATGCA" + "AGG"
+    guides = list(scan_guides(dna))
+    assert {g["strand"] for g in guides} == {"+", "-"}
+    plus = next(g for g in guides if g["strand"] == "+")
+    assert plus["sequence"] == dna[plus["start"]:plus["end"]]
+    assert plus["poly_t"] and plus["cut_site"] == plus["end"] - 3
+
+    # Chunked scanning must neither lose nor duplicate sites at boundaries
+    assert list(scan_guides(dna, chunk_size=7)) == guides
+
+
+def test_guide_scanner_cas12a_and_fasta_stream(tmp_path):
+    from src.analysis.crispr_designer import scan_guides, scan_fasta_guides
+
+    dna = "TTTA" + "GATTACAGATTACAGATTACAGA" + "CCCC"
+    guides = list(scan_guides(dna, nuclease="Cas12a", strands="+"))
+    assert len(guides) == 1
+    assert guides[0]["pam_seq"] == "TTTA" and guides[0]["start"] == 4
+
+    fasta = tmp_path / "chr.fa"
+    fasta.write_text(">chrT\n" + "\n".join(dna[i:i + 5] for i in range(0, len(dna), 5)) + "\n")
+    streamed = list(scan_fasta_guides(str(fasta), nuclease="Cas12a", strands="+", chunk_size=6))
+    assert [g["start"] for g in streamed] == [4] and streamed[0]["chrom"] == "chrT"
+
+
+def test_offtarget_index_finds_planted_sites(tmp_path):
+    import random
+    from src.analysis.offtarget_index import build_offtarget_index
+
+    rng = random.Random(7)
+    background = "".join(rng.choices("ACGT", k=20000))
+    guide = "GACGTTACCGGATCAGTCAA"
+    two_mm = "GACGTTACCGGATGAGTGAA"
+    rc = lambda s: s.translate(str.maketrans("ACGT", "TGCA"))[::-1]
+    genome = background[:5000] + guide + "TGG" + background[5000:12000] + rc(two_mm + "AGG") + background[12000:]
+    (tmp_path / "g.fa").write_text(">chrS\n" + genome + "\n")
+
+    index = build_offtarget_index(str(tmp_path / "g.fa"), str(tmp_path / "idx"))
+    result = index.score_guides([{"sequence": guide}], max_mismatches=3)[0]
+
+    sites = {(s["position"], s["strand"], s["pam"]) for s in result["sites"]}
+    assert (5000, "+", "NGG") in sites
+    assert (12023, "-", "NGG") in sites
+    assert result["perfect_matches"] == 1
+    assert result["hit_counts"][2] >= 1 and result["specificity"] < 100
+
+    # The SpCas9 weights stop at 20 nt: longer (SaCas9) and Cas12a guides are refused, not mis-scored
+    sa_guide = guide + "T"
+    with pytest.raises(ValueError, match="20-nt"):
+        index.find_sites(sa_guide)
+    sa, cas12a = index.score_guides([{"sequence": sa_guide, "pam": "NNGRRT"}, {"sequence": guide, "pam": "TTTV"}])
+    assert sa["specificity"] is None and "21-nt" in sa["unsupported"]
+    assert cas12a["hit_counts"] is None and "TTTV" in cas12a["unsupported"]
+
+
+def test_restriction_sites_positions_strands_and_degenerate():
+    from src.analysis.primer_designer import scan_restriction_sites
+    from src.analysis.restriction_sites import find_restriction_sites
+
+    dna = "ATGGAATTCAAAGAGACCTTTGCCATTAGGGC"
+    hits = find_restriction_sites(dna)
+    eco = next(h for h in hits if h["enzyme"] == "EcoRI")
+    assert (eco["start"], eco["cut_fwd"], eco["cut_rev"], eco["frame"], eco["codon"]) == (3, 4, 8, 0, 2)
+
+    # BsaI (GGTCTC) is non-palindromic: GAGACC is its site on the reverse strand
+    bsa = next(h for h in hits if h["enzyme"] == "BsaI")
+    assert bsa["strand"] == "-" and bsa["cut_fwd"] == bsa["start"] - 5
+
+    # BglI is degenerate (GCCNNNNNGGC)
+    assert any(h["enzyme"] == "BglI" and h["start"] == 21 for h in hits)
+    assert scan_restriction_sites(dna.lower()) == ["EcoRI"]
+
+
+def test_rebase_list_with_n_rich_sites_compiles_and_matches(tmp_path):
+    import random
+    import re
+    from src.analysis.restriction_sites import (IUPAC_BASES, IUPAC_COMPLEMENT, compile_enzymes,
+                                                find_restriction_sites, load_rebase_emboss)
+
+    rebase = tmp_path / "emboss_e.sample"
+    rebase.write_text("# REBASE version 2xx\n"
+                      "EcoRI\tGAATTC\t6\t2\t0\t1\t5\t0\t0\n"
+                      "MwoI\tGCNNNNNNNGC\t11\t2\t0\t7\t4\t0\t0\n"
+                      "XcmI\tCCANNNNNNNNNTGG\t15\t2\t0\t8\t7\t0\t0\n"
+                      "BslI\tCCNNNNNNNGG\t11\t2\t0\t7\t4\t0\t0\n"
+                      "Bsp1286I\tGDGCHC\t6\t2\t0\t5\t1\t0\t0\n"
+                      "AjuI\tGAANNNNNNNTTGG\t14\t0\t0\t0\t0\t0\t0\n")
+    enzymes = load_rebase_emboss(str(rebase))
+    assert set(enzymes) == {"EcoRI", "MwoI", "XcmI", "BslI", "Bsp1286I"}
+    compile_enzymes(enzymes)
+
+    rng = random.Random(11)
+    dna = "".join(rng.choices("ACGT", k=3000)) + "GCAAANNAAGC" + "".join(rng.choices("ACGT", k=500))
+    expected = set()
+    for name, (site, _, _) in enzymes.items():
+        for strand, pattern in (("+", site), ("-", site.translate(IUPAC_COMPLEMENT)[::-1])):
+            regex = re.compile("(?=" + "".join(f"[{IUPAC_BASES[b]}]" for b in pattern) + ")")
+            expected |= {(name, m.start()) for m in regex.finditer(dna)}
+    hits = find_restriction_sites(dna, enzymes)
+    assert {(h["enzyme"], h["start"]) for h in hits} == expected
+    assert any(h["enzyme"] == "XcmI" for h in hits) and not any(h["start"] == 3000 for h in hits)
+
+
+def test_codon_optimizer_avoids_sites_and_keeps_protein():
+    from src.analysis.codon_optimizer import GENETIC_CODE
+    from src.analysis.primer_designer import get_optimized_dna, get_optimized_dna_many, scan_restriction_sites
+
+    # With the top human codons, W-I-P reads TGG ATC CCC and creates a BamHI site
+    protein = "MWIPKEFG" * 10
+    assert "BamHI" in scan_restriction_sites(get_optimized_dna(protein, forbidden_sites=[]))
+
+    dna = get_optimized_dna(protein)
+    assert scan_restriction_sites(dna) == []
+    assert "".join(GENETIC_CODE[dna[i:i + 3]] for i in range(0, len(dna), 3)) == protein
+
+    gly = get_optimized_dna("G" * 40)
+    window = gly[-48:]
+    assert (window.count("G") + window.count("C")) / len(window) <= 0.75
+
+    assert get_optimized_dna_many(["METVAL", "MWIPK"], workers=0) == [get_optimized_dna("METVAL"),
+                                                                        get_optimized_dna("MWIPK")]
+
+
+def test_nearest_neighbor_primer_design():
+    from src.analysis.primer_designer import calculate_tm, generate_primers_many, get_primer_quality
+
+    # GC-rich primers melt higher than AT-rich primers of the same length
+    assert calculate_tm("GCGCGGCCGCGCGGCCGCGC") > calculate_tm("ATATTAATATAATTATATAT") + 30
+
+    dna = "ATGGCTAGCAAAGGAGAAGAACTTTTCACTGGAGTTGTCCCAATTCTTGTTGAATTAGATGGTGATGTTAATGGGCACAAATTTTCTGTCAGTGGAGAGGGTGAAGG"
+    primers = generate_primers_many([dna, dna[:60]], "GAATTC", "GGATCC", target_tm=60)
+    for p in primers:
+        assert 16 <= len(p["fwd_bind"]) <= 35
+        assert abs(p["tm_fwd"] - 60) < 4 and abs(p["tm_fwd"] - p["tm_rev"]) < 4
+        assert p["tm_fwd"] == pytest.approx(calculate_tm(p["fwd_bind"]))
+
+    palindrome = get_primer_quality("GAATTCGCGCGCGCGCAAAAAAA", "GCGCGCGC")
+    assert "self-dimer" in palindrome["warnings"] and palindrome["status"] == "⚠️"
+
+    # N and short rows are not read as A: those prefixes have no Tm, direct calls refuse them
+    import numpy as np
+    from src.analysis.thermo import encode, tm_prefix_matrix
+
+    tm = tm_prefix_matrix(encode(["GCGCGNGCGC", "GCGC"], 10))
+    assert tm[0, 4] == pytest.approx(calculate_tm("GCGCG")) and np.isnan(tm[0, 5:]).all()
+    assert tm[1, 3] == pytest.approx(calculate_tm("GCGC")) and np.isnan(tm[1, 4:]).all()
+    with pytest.raises(ValueError):
+        calculate_tm("GCGCGNGCGC")
+    nnn = generate_primers_many(["NNN" + dna], "GAATTC", "GGATCC")[0]
+    assert np.isnan(nnn["tm_fwd"]) and abs(nnn["tm_rev"] - 60) < 4
+
+
+def test_library_designer_streams_deduplicated_rows(tmp_path, monkeypatch):
+    import csv
+    from src import library_designer
+
+    seq = "M" + "S" * 40 + "KRLEQLLKRLEQLLKRLEQLLKRLEQLL" + "P" * 40
+    domains = [{'label': 'Coiled coil', 'start': 42, 'end': 69, 'type': 'Region'}]
+    idrs = [{'start': 1, 'end': 41, 'type': 'IDR'}, {'start': 70, 'end': 109, 'type': 'IDR'}]
+
+    series = library_designer.enumerate_boundaries(len(seq), domains, idrs)
+    assert ("IDR+Coiled coil+IDR", 1, 109) not in series  # same span as full length, deduplicated
+    assert {(s, e) for _, s, e in series} == {(1, 109), (42, 69), (1, 41), (70, 109), (1, 69), (42, 109)}
+
+    entry = {"name": "Test", "gene_name": "TST", "sequence": seq, "domains": domains}
+    monkeypatch.setattr(library_designer, "get_uniprot_data_many", lambda ids: {i: entry for i in ids})
+    monkeypatch.setattr(library_designer, "analyze_disorder", lambda s: idrs)
+
+    out = tmp_path / "lib.csv"
+    assert library_designer.design_library(["P1", "P2"], str(out), workers=0) == 12
+    rows = list(csv.DictReader(out.open()))
+    assert sum(1 for r in rows if r["duplicate_of"]) == 6
+    first = next(r for r in rows if not r["duplicate_of"])
+    assert first["fwd"].startswith("GAATTC") and first["internal_sites"] == ""
+
+    # With a process pool the earlier accession still owns every shared insert
+    pooled = tmp_path / "pooled.csv"
+    assert library_designer.design_library(["P1", "P2"], str(pooled), workers=2) == 12
+    assert list(csv.DictReader(pooled.open())) == rows
+
+
+def test_motif_scanner_matches_brute_force_and_streams(tmp_path):
+    import random
+    import numpy as np
+    import pandas as pd
+    from src.analysis.motif_scanner import MotifScanner, pfm_to_pwm, scan_fasta_motifs, score_distribution
+
+    pfms = {
+        "EBOX": pd.DataFrame({"A": [0, 20, 0, 0, 0, 0], "C": [20, 0, 20, 0, 0, 0],
+                              "G": [0, 0, 0, 20, 0, 20], "T": [0, 0, 0, 0, 20, 0]}),
+        "GATA": {"A": [18, 1, 18, 0, 19, 16], "C": [0, 0, 0, 1, 0, 1], "G": [1, 19, 1, 0, 0, 3], "T": [1, 0, 1, 19, 1, 0]},
+    }
+    rng = random.Random(3)
+    dna = "".join(rng.choices("ACGT", k=3000))
+    dna = dna[:500] + "CACGTG" + dna[500:1500] + "TTATCT" + dna[1500:]  # E-box (+/-), GATA on the - strand
+
+    scanner = MotifScanner(pfms, pvalue=1e-3)
+    hits = scanner.scan(dna)
+    rc = lambda s: s.translate(str.maketrans("ACGT", "TGCA"))[::-1]
+    expected = set()
+    for i, (name, pfm) in enumerate(pfms.items()):
+        pwm = pfm_to_pwm(pfm)
+        threshold = scanner._thresholds[2 * i]
+        for pos in range(len(dna) - len(pwm) + 1):
+            for strand, site in (("+", dna[pos:pos + len(pwm)]), ("-", rc(dna[pos:pos + len(pwm)]))):
+                if sum(pwm[j, "ACGT".index(b)] for j, b in enumerate(site)) >= threshold - 1e-4:
+                    expected.add((name, pos, strand))
+    assert {(h["motif"], h["start"], h["strand"]) for h in hits} == expected
+    assert {("EBOX", 500, "+"), ("EBOX", 500, "-"), ("GATA", 1506, "-")} <= expected
+
+    grid, survival = score_distribution(pfm_to_pwm(pfms["GATA"]))
+    assert survival[0] == pytest.approx(1.0) and np.all(np.diff(survival) <= 1e-12)
+
+    fasta = tmp_path / "promoters.fa"
+    fasta.write_text(">p1\n" + "\n".join(dna[i:i + 60] for i in range(0, len(dna), 60)) + "\n")
+    streamed = list(scan_fasta_motifs(str(fasta), pfms, pvalue=1e-3, chunk_size=97))
+    assert {(h["motif"], h["start"], h["strand"]) for h in streamed} == expected
+    assert len(streamed) == len(hits) and streamed[0]["chrom"] == "p1"
+
+
+def test_annotation_track_queries_joins_and_linkers():
+    import random
+    from src.analysis.annotation_track import AnnotationTrack
+
+    data = {"sequence": "M" * 200, "domains": [
+        {"label": "DBD", "start": 20, "end": 80, "type": "Domain"},
+        {"label": "Zn", "start": 30, "end": 50, "type": "Zinc finger"},
+        {"label": "LZ", "start": 120, "end": 150, "type": "Region"},
+    ]}
+    idrs = [{"start": 1, "end": 25, "type": "IDR"}, {"start": 140, "end": 170, "type": "IDR"}]
+    track = AnnotationTrack.from_protein(data, idrs)
+
+    # Every containing interval is reported, not just the last one
+    hits = track.query_points([35, 100, 145])
+    assert sorted(h["label"] for h in hits[0]) == ["DBD", "Zn"]
+    assert hits[1] == [] and sorted(h["label"] for h in hits[2]) == ["IDR", "LZ"]
+
+    join = track.select(("Domain", "Region")).overlap_join(track.select(("IDR",)))
+    assert {(o["a"]["label"], o["start"], o["end"]) for o in join} == {("DBD", 20, 25), ("LZ", 140, 150)}
+    assert [(g["start"], g["end"]) for g in track.complement()] == [(81, 119), (171, 200)]
+
+    rng = random.Random(5)
+    ivs = [{"start": s, "end": s + rng.randint(0, 40)} for s in (rng.randint(1, 500) for _ in range(60))]
+    rand_track = AnnotationTrack(ivs, length=560)
+    qs = [rng.randint(1, 540) for _ in range(300)]
+    qe = [q + rng.randint(0, 20) for q in qs]
+    for s, e, found in zip(qs, qe, rand_track.query_ranges(qs, qe)):
+        expected = sorted((iv["start"], iv["end"]) for iv in ivs if iv["start"] <= e and iv["end"] >= s)
+        assert sorted((iv["start"], iv["end"]) for iv in found) == expected
+    covered = {p for iv in ivs for p in range(iv["start"], iv["end"] + 1)}
+    linkers = {p for g in rand_track.complement() for p in range(g["start"], g["end"] + 1)}
+    assert linkers == set(range(1, 561)) - covered
+
+
+def test_disorder_model_loads_once_in_background(monkeypatch):
+    import sys
+    import types
+    from src.analysis import disorder_model
+
+    imports = []
+    fake = types.ModuleType("metapredict")
+    fake.predict_disorder = lambda seq: imports.append(seq) or [0.9] * len(seq)
+    monkeypatch.setitem(sys.modules, "metapredict", fake)
+    monkeypatch.setattr(disorder_model, "_metapredict", None)
+    monkeypatch.setattr(disorder_model, "_warmup_thread", None)
+
+    thread = disorder_model.warm_in_background()
+    thread.join(5)
+    assert disorder_model.is_loaded() and set(disorder_model.load_times) == {"import_s", "warmup_s"}
+    assert disorder_model.warm_in_background() is None
+    assert disorder_model.predict_disorder("MKP") == [0.9] * 3
+    assert disorder_model.predict_disorder_batch(["MK", "P"]) == [[0.9] * 2, [0.9]]
+    assert imports == [disorder_model.WARMUP_SEQUENCE, "MKP", "MK", "P"]
+
+
+def test_analysis_service_micro_batches_and_dedupes(tmp_path):
+    import asyncio
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from src.analysis.score_store import ScoreStore
+    from src.analysis.service_client import ServiceClient
+    from src.analysis_service import AnalysisService, DisorderBatcher, Overloaded
+
+    batches = []
+
+    def predictor(seqs):
+        batches.append(list(seqs))
+        time.sleep(0.02)
+        return [[len(s) / 100] * len(s) for s in seqs]
+
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    holder = {}
+
+    async def start():
+        batcher = DisorderBatcher(predictor, store=ScoreStore(str(tmp_path / "scores")), window_ms=20)
+        holder["service"] = await AnalysisService(batcher, port=0).start()
+        ready.set()
+
+    thread = threading.Thread(target=lambda: (loop.run_until_complete(start()), loop.run_forever()), daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    service = holder["service"]
+    client = ServiceClient(f"http://127.0.0.1:{service.port}")
+    try:
+        seqs = [f"M{'K' * (i % 10)}P" for i in range(40)]  # 10 distinct sequences
+        with ThreadPoolExecutor(16) as pool:
+            results = list(pool.map(lambda s: client.disorder_scores([s])[0], seqs))
+        assert all(r.tolist() == pytest.approx([len(s) / 100] * len(s)) for r, s in zip(results, seqs))
+        assert sorted(s for b in batches for s in b) == sorted(set(seqs))  # each predicted once
+        assert len(batches) < 10
+
+        # Answered from the score store without predicting again
+        n = len(batches)
+        assert len(client.disorder_scores(seqs[:3])) == 3 and len(batches) == n
+        assert client.idrs("MKKP", threshold=0.01, min_length=1) == [{"start": 1, "end": 4, "type": "IDR"}]
+        assert client.health()["stats"]["store_hits"] >= 3
+
+        # Predict-only requests (mutagenesis windows) are not added to the store
+        assert len(client.disorder_scores(["MWWWW"], persist=False)[0]) == 5
+        assert service.batcher.store.get("MWWWW") is None
+        assert len(client.disorder_scores(["MWWWW"])[0]) == 5
+        assert service.batcher.store.get("MWWWW") is not None
+    finally:
+        asyncio.run_coroutine_threadsafe(service.stop(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+
+    async def overload():
+        batcher = DisorderBatcher(predictor, store=ScoreStore(str(tmp_path / "bp")), window_ms=50, max_pending=1)
+        batcher.start()
+        first = asyncio.ensure_future(batcher.score("MAAA"))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            await batcher.score("MCCC")
+        assert len(await first) == 4
+
+        # A request that does not fit is rejected whole, before any of it is queued
+        batcher.max_pending = 2
+        with pytest.raises(Overloaded):
+            await batcher.score_many(["MDDD", "MEEE", "MFFF"])
+        assert not batcher._waiting and not batcher._queue
+        assert [len(s) for s in await batcher.score_many(["MAAA", "MDDD", "MEEE", "MDDD"])] == [4, 4, 4, 4]
+        await batcher.stop()
+
+    asyncio.run(overload())
+
+
+def test_saturation_scan_batches_windows_and_matches_full_length():
+    import numpy as np
+    from src.analysis.mutagenesis import parse_mutation, saturation_scan, scan_mutations
+
+    # A toy predictor with a 3-residue receptive field: windows with flank >= 1 are exact
+    calls = []
+
+    def predictor(seqs):
+        calls.append(len(seqs))
+        out = []
+        for s in seqs:
+            hydro = np.array([c in "AILMFVW" for c in s], dtype=np.float32)
+            out.append(1 - np.convolve(np.pad(hydro, 1, mode="edge"), np.ones(3) / 3, mode="valid"))
+        return out
+
+    seq = "MKPAILSSEDKRWQPG" * 3
+    windowed = saturation_scan(seq, 5, 20, flank=4, include_deletions=True, predictor=predictor, batch_size=64)
+    assert len(calls) > 1 and max(calls) <= 64
+    full = saturation_scan(seq, 5, 20, flank=None, include_deletions=True, predictor=predictor)
+    assert windowed.delta.shape == (16, 21) and windowed.wild_type == seq[4:20]
+    subs = ~np.isnan(full.delta[:, :20])
+    assert np.allclose(windowed.delta[:, :20][subs], full.delta[:, :20][subs], atol=1e-6)
+    assert np.isnan(windowed.delta[0, "ACDEFGHIKLMNPQRSTVWY".index(seq[4])])
+
+    top = windowed.top(3)
+    assert abs(top[0]["delta"]) >= abs(top[-1]["delta"])
+
+    rows = scan_mutations(seq, ["A4L", "k2del"], flank=4, predictor=predictor)
+    assert rows[0]["delta_site"] == pytest.approx(0.0) and rows[1]["mutation"] == "K2del"
+    assert parse_mutation("K2del", seq) == (2, "K", "-")
+    with pytest.raises(ValueError):
+        parse_mutation("A2L", seq)
+
+
+def test_idr_segmentation_hysteresis_gaps_and_grid():
+    import numpy as np
+    from src.analysis.disorder_analyzer import find_idrs, idr_grid
+
+    scores = np.array([0.6] * 40 + [0.45] * 5 + [0.6] * 40 + [0.1] * 10 + [0.45] * 30 + [0.9] * 5, dtype=np.float32)
+    spans = lambda idrs: [(d["start"], d["end"]) for d in idrs]
+    assert spans(find_idrs(scores)) == [(1, 40), (46, 85)]
+    assert spans(find_idrs(scores, max_gap=5)) == [(1, 85)]
+    assert spans(find_idrs(scores, hysteresis=0.1)) == [(1, 85), (96, 130)]
+    assert spans(find_idrs(scores, min_length=41)) == []
+    assert spans(find_idrs([0.1, 0.1, 0.9, 0.1, 0.1], min_length=1, smooth=3)) == []
+    assert find_idrs([]) == [] and spans(find_idrs([0.9] * 3, min_length=1)) == [(1, 3)]
+
+    rng = np.random.default_rng(0)
+    noisy = np.clip(np.cumsum(rng.normal(0, 0.1, 5000)) * 0.3 + 0.5, 0, 1)
+    grid = idr_grid(noisy, (0.4, 0.5, 0.6), (10, 30), hysteresis=0.05, smooth=7, max_gap=3)
+    assert len(grid) == 6 and any(grid.values())
+    assert all(idrs == find_idrs(noisy, t, m, hysteresis=0.05, smooth=7, max_gap=3) for (t, m), idrs in grid.items())
+
+
+def test_encoded_sequences_match_string_inputs():
+    import random
+    from src.analysis.crispr_designer import scan_guides
+    from src.analysis.encoded_seq import EncodedSeq, PackedSeq
+    from src.analysis.primer_designer import generate_primers, reverse_complement, scan_restriction_sites
+    from src.analysis.restriction_sites import find_restriction_sites
+
+    rng = random.Random(5)
+    dna = "".join(rng.choices("ACGTacgt", k=10_000)) + "N" * 500 + "".join(rng.choices("ACGTRY", weights=[50] * 4 + [1, 1], k=9_500))
+    encoded, packed = EncodedSeq(dna), PackedSeq(dna)
+    assert str(encoded) == str(packed) == dna.upper() and packed.nbytes < len(dna) / 3
+    assert encoded == dna.upper() and encoded != dna and hash(encoded) == hash(dna.upper())
+
+    view = encoded[1000:1500]
+    assert view.count("GC") == sum(c in "GC" for c in dna[1000:1500].upper())
+    assert view.count("GC", 10, 30) == sum(c in "GC" for c in dna[1010:1030].upper())
+    assert view.window_counts("AT", 20).tolist() == [sum(c in "AT" for c in dna[i:i + 20].upper())
+                                                    for i in range(1000, 1481)]
+    assert str(reverse_complement(view)) == reverse_complement(dna[1000:1500].upper())
+    assert str(packed[19_990:25_000]) == dna[19_990:].upper()
+
+    expected = list(scan_guides(dna, chunk_size=3000))
+    assert list(scan_guides(encoded, chunk_size=3000)) == expected == list(scan_guides(packed, chunk_size=3000))
+    assert find_restriction_sites(view) == find_restriction_sites(dna[1000:1500])
+    assert scan_restriction_sites(view) == scan_restriction_sites(dna[1000:1500].upper())
+    assert generate_primers(view, "GAATTC", "GGATCC") == generate_primers(str(view), "GAATTC", "GGATCC")
+
+
+def test_primer_pool_matches_brute_force_and_flags_mispriming():
+    import itertools
+    import random
+    from src.analysis.primer_designer import reverse_complement
+    from src.analysis.primer_pool import PrimerPool, check_primer_set
+    from src.analysis.thermo import stack_dg
+
+    def worst_3p(a, b):  # every contiguous duplex containing a's 3' base, at every offset
+        pair = {"A": "T", "C": "G", "G": "C", "T": "A"}
+        best = 0.0
+        for j in range(len(b)):
+            run = 0
+            while run < len(a) and j + run < len(b) and pair[a[-1 - run]] == b[j + run]:
+                run += 1
+            if run >= 2:
+                best = min(best, stack_dg(a[len(a) - run:]))
+        return best
+
+    rng = random.Random(3)
+    primers = {f"p{i}": "".join(rng.choices("ACGT", k=rng.randint(18, 30))) for i in range(120)}
+    expected = {(a, b) for a, b in itertools.combinations_with_replacement(sorted(primers), 2)
+                if min(worst_3p(primers[a], primers[b]), worst_3p(primers[b], primers[a])) < -5.0}
+    issues = check_primer_set(primers)
+    assert expected and {(i["a"], i["b"]) for i in issues} == expected
+
+    template = "".join(rng.choices("ACGT", k=1200))
+    pool = PrimerPool()
+    assert pool.add_construct("A", template[:22], reverse_complement(template[-22:]), template) == []
+    # B's reverse primer ends in 18 nt of A's template: it primes there
+    other = "".join(rng.choices("ACGT", k=600))
+    new = pool.add_construct("B", other[:22], "TTTT" + reverse_complement(template[500:518]), other)
+    misprimes = [i for i in new if i["kind"] == "mispriming"]
+    assert misprimes and misprimes[0]["a"] == "B_R" and misprimes[0]["b"] == "A"
+    assert misprimes[0]["strand"] == "-" and misprimes[0]["position"] == 501 and misprimes[0]["length"] == 18
+    assert all(i in pool.issues for i in new)
@@ -32,4 +32,282 @@ def test_jaspar_motif_search():
     """Ensure JASPAR returns results for a major TF."""
     results = search_jaspar_motifs("JUN", tax_id="9606")
     assert len(results) > 0
-    assert "matrix_id" in results[0]
\ No newline at end of file
+    assert "matrix_id" in results[0]
+
+def test_response_cache_serves_repeats_from_disk(tmp_path, monkeypatch):
+    """A second lookup, even from a fresh cache object, must not hit the network."""
+    from src.api import cache
+
+    calls = []
+
+    def fake_fetch(url, params=None, timeout=None, limiter=None):
+        calls.append(url)
+        return {"results": [{"primaryAccession": "Q92908"}]}
+
+    monkeypatch.setattr(cache, "fetch_json", fake_fetch)
+    cache.configure_cache(cache_dir=str(tmp_path))
+    assert get_uniprot_id_from_symbol("GATA6") == "Q92908"
+    cache.configure_cache(cache_dir=str(tmp_path))
+    assert get_uniprot_id_from_symbol("GATA6") == "Q92908"
+    assert len(calls) == 1
+
+    # Offline mode serves what is on disk and nothing else
+    cache.configure_cache(cache_dir=str(tmp_path), offline=True)
+    assert get_uniprot_id_from_symbol("GATA6") == "Q92908"
+    assert get_uniprot_id_from_symbol("GATA4") is None
+    assert len(calls) == 1
+    cache.configure_cache()
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    from src.api import cache
+
+    monkeypatch.setattr(cache, "fetch_json", lambda url, params=None, timeout=None, limiter=None: {"pad": "x" * 400})
+    rc = cache.ResponseCache(cache_dir=str(tmp_path), max_bytes=2000, memory_entries=0)
+    for i in range(10):
+        rc.get_json("jaspar", f"https://example.org/{i}")
+    assert rc.disk_usage() <= 2000
+    assert rc._load(cache.make_key("jaspar", "https://example.org/9")) is not None
+    assert rc._load(cache.make_key("jaspar", "https://example.org/0")) is None
+
+
+def _uniprot_entry(acc):
+    return {
+        "primaryAccession": acc,
+        "sequence": {"value": "MKV" * 10},
+        "genes": [{"geneName": {"value": f"GENE_{acc}"}}],
+        "features": [{"type": "Domain", "description": "bZIP",
+                      "location": {"start": {"value": 5}, "end": {"value": 20}}}],
+    }
+
+
+@pytest.fixture
+def uniprot_stub(tmp_path):
+    """Serves the single-entry and multi-accession UniProt endpoints on localhost."""
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse, parse_qs
+    from src.api import cache
+
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            hits.append(parsed.path)
+            if parsed.path == "/uniprotkb/accessions":
+                query = parse_qs(parsed.query)
+                accs = query["accessions"][0].split(",")
+                # Paged like UniProt: 25 results unless `size` asks for more, up to 500
+                size = min(int(query.get("size", ["25"])[0]), 500)
+                body = {"results": [_uniprot_entry(a) for a in accs if a.startswith("P")][:size]}
+            elif parsed.path.endswith(".json") and "/uniprotkb/Q" in parsed.path:
+                body = _uniprot_entry(parsed.path.split("/")[-1][:-5])
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            raw = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cache.configure_cache(cache_dir=str(tmp_path))
+    yield f"http://127.0.0.1:{server.server_port}", hits
+    server.shutdown()
+    cache.configure_cache()
+
+
+def test_uniprot_batch_fetch_against_stub(uniprot_stub):
+    from src.api import uniprot_fetcher
+    from src.api.uniprot_fetcher import get_uniprot_data_many
+
+    base_url, hits = uniprot_stub
+    ids = [f"P{i:05d}" for i in range(250)] + ["Q99999", "P00001", "X00000"]
+    acquired = []
+    limiter = uniprot_fetcher._limiter
+    original = limiter.acquire
+    limiter.acquire = lambda: acquired.append(1) or original()
+    try:
+        results = get_uniprot_data_many(ids, base_url=base_url, chunk_size=100)
+    finally:
+        del limiter.acquire
+
+    assert list(results) == list(dict.fromkeys(ids))
+    assert results["P00001"]["gene_name"] == "GENE_P00001"
+    assert results["P00001"]["domains"][0]["label"] == "bZIP"
+    assert results["Q99999"]["sequence"] == "MKV" * 10  # single-entry fallback
+    assert results["X00000"] is None
+    assert hits.count("/uniprotkb/accessions") == 3
+    assert len(hits) == 5  # no page was cut short, so only Q99999 and X00000 went one at a time
+    assert len(acquired) == len(hits)  # the single-entry fallback shares the process-wide limiter
+
+    # Results are keyed by the IDs as the caller wrote them
+    mixed = get_uniprot_data_many([" p00001", "P00001", "p00002 "], base_url=base_url)
+    assert list(mixed) == [" p00001", "P00001", "p00002 "]
+    assert mixed[" p00001"] == mixed["P00001"] == results["P00001"]
+    assert mixed["p00002 "]["gene_name"] == "GENE_P00002"
+
+    # Batch results land in the shared cache used by the single-entry fetcher
+    before = len(hits)
+    assert get_uniprot_data("P00042", base_url=base_url)["gene_name"] == "GENE_P00042"
+    assert len(hits) == before
+
+
+def test_bulk_store_answers_string_and_jaspar_locally(tmp_path, monkeypatch):
+    import gzip
+    from src.api import bulk_store, jaspar_fetcher, string_fetcher
+
+    links = ["protein1 protein2 combined_score"]
+    edges = [("A", "B", 900), ("A", "C", 700), ("A", "D", 300), ("B", "E", 800), ("E", "F", 950)]
+    for a, b, s in edges:
+        links += [f"9606.ENSP{a} 9606.ENSP{b} {s}", f"9606.ENSP{b} 9606.ENSP{a} {s}"]
+    (tmp_path / "links.txt").write_text("\n".join(links) + "\n")
+    info = ["#string_protein_id\tpreferred_name\tprotein_size\tannotation"]
+    info += [f"9606.ENSP{n}\tGENE{n}\t100\t-" for n in "ABCDEF"]
+    (tmp_path / "info.txt").write_text("\n".join(info) + "\n")
+    with gzip.open(tmp_path / "aliases.txt.gz", "wt") as fh:
+        fh.write("#string_protein_id\talias\tsource\n9606.ENSPA\tc-Myc\tEnsembl\n")
+    (tmp_path / "jaspar.txt").write_text(
+        ">MA0147.2\tMYC\nA [ 0 20 0 ]\nC [ 20 0 20 ]\nG [ 0 0 0 ]\nT [ 0 0 0 ]\n"
+        ">MA0147.3\tMYC\nA [ 0 20 0 0 ]\nC [ 20 0 20 0 ]\nG [ 0 0 0 20 ]\nT [ 0 0 0 0 ]\n"
+        ">MA0058.3\tMAX::MYC\nA [ 1 ]\nC [ 0 ]\nG [ 0 ]\nT [ 0 ]\n")
+
+    out = tmp_path / "bulk"
+    bulk_store.main(["--out", str(out), "--string-links", str(tmp_path / "links.txt"),
+                     "--string-info", str(tmp_path / "info.txt"), "--string-aliases", str(tmp_path / "aliases.txt.gz"),
+                     "--jaspar", str(tmp_path / "jaspar.txt")])
+    monkeypatch.setattr(bulk_store, "_default_bulk_store", bulk_store.BulkStore(str(out)))
+
+    graph = bulk_store.get_bulk_store().string_graph("9606")
+    assert graph.partners("c-myc") == [("GENEB", 900), ("GENEC", 700)]
+    assert string_fetcher.get_interactions("GENEA", limit=1) == ["GENEB"]
+    assert string_fetcher.get_interactions_many(["GENEA", "GENEF"], limit=None)["GENEF"] == [("GENEE", 950)]
+    assert string_fetcher.get_network_neighborhood("GENEA", k=2) == {"GENEA": 0, "GENEB": 1, "GENEC": 1, "GENEE": 2}
+    assert string_fetcher.get_network_neighborhood("GENEA", k=2, min_score=0)["GENED"] == 1
+
+    motifs = jaspar_fetcher.search_jaspar_motifs("myc")
+    assert [m["matrix_id"] for m in motifs] == ["MA0147.3", "MA0058.3"]
+    assert list(jaspar_fetcher.get_pfm_data("MA0147.3")["G"]) == [0, 0, 0, 20]
+
+
+def test_jaspar_bundle_falls_back_online_for_uncovered_taxa(tmp_path, monkeypatch):
+    import json
+    from src.api import bulk_store, jaspar_fetcher
+
+    records = [{"matrix_id": "MA0147.3", "name": "MYC", "species": [{"tax_id": 9606}],
+                "pfm": {"A": [0], "C": [20], "G": [0], "T": [0]}}]
+    (tmp_path / "jaspar.json").write_text(json.dumps(records))
+    bulk_store.ingest_jaspar(str(tmp_path / "jaspar.json"), str(tmp_path / "bulk"))
+    monkeypatch.setattr(bulk_store, "_default_bulk_store", bulk_store.BulkStore(str(tmp_path / "bulk")))
+    online = []
+    monkeypatch.setattr(jaspar_fetcher, "cached_get_json",
+                        lambda ns, url, params=None: online.append(params) or {"results": [{"matrix_id": "MA9999.1"}]})
+
+    assert [m["matrix_id"] for m in jaspar_fetcher.search_jaspar_motifs("MYC", tax_id="9606")] == ["MA0147.3"]
+    assert jaspar_fetcher.search_jaspar_motifs("NOPE", tax_id="9606") == [] and online == []
+    assert jaspar_fetcher.search_jaspar_motifs("Myc", tax_id="10090") == [{"matrix_id": "MA9999.1"}]
+    assert online[0]["tax_id"] == "10090"
+
+
+def test_uniprot_store_ingests_flat_and_json_dumps(tmp_path, monkeypatch):
+    import gzip
+    import json
+    from src.api import bulk_store, uniprot_fetcher
+
+    flat = (
+        "ID   TST1_HUMAN              Reviewed;          12 AA.\n"
+        "AC   P11111; Q22222;\n"
+        "DE   RecName: Full=Test protein 1 {ECO:0000305};\n"
+        "GN   Name=TST1 {ECO:0000312|HGNC:1}; Synonyms=T1;\n"
+        "OX   NCBI_TaxID=9606;\n"
+        "FT   DOMAIN          2..8\n"
+        "FT                   /note=\"bHLH\"\n"
+        "FT                   /evidence=\"ECO:0000255\"\n"
+        "FT   REGION          <1..?12\n"
+        "SQ   SEQUENCE   12 AA;  1300 MW;  0 CRC64;\n"
+        "     MKRLEQ LLKRPS\n"
+        "//\n")
+    with gzip.open(tmp_path / "sprot.dat.gz", "wt") as fh:
+        fh.write(flat)
+    store = bulk_store.ingest_uniprot(str(tmp_path / "sprot.dat.gz"), str(tmp_path / "flat"))
+    entry = store.get("p11111")
+    assert entry == {"name": "Test protein 1", "gene_name": "TST1", "sequence": "MKRLEQLLKRPS",
+                     "domains": [{"label": "bHLH", "start": 2, "end": 8, "type": "Domain"}]}
+
+    json_entries = [_uniprot_entry(acc) for acc in ("P22222", "P33333")]
+    for e, gene in zip(json_entries, ("GENEB", "GENEC")):
+        e.update(genes=[{"geneName": {"value": gene}}], organism={"taxonId": 4932})
+    (tmp_path / "dump.json").write_text(json.dumps({"results": json_entries}, indent=1))
+    from src.api.uniprot_store import iter_uniprot_json
+    assert list(iter_uniprot_json(str(tmp_path / "dump.json"), read_size=7)) == json_entries
+
+    out = tmp_path / "bulk"
+    bulk_store.main(["--out", str(out), "--uniprot", str(tmp_path / "dump.json")])
+    monkeypatch.setattr(bulk_store, "_default_bulk_store", bulk_store.BulkStore(str(out)))
+    monkeypatch.setattr(uniprot_fetcher, "cached_get_json", lambda *a, **k: pytest.fail("network used"))
+
+    assert uniprot_fetcher.get_uniprot_id_from_symbol("genec", tax_id="4932") == "P33333"
+    assert uniprot_fetcher.get_uniprot_data("P22222") == uniprot_fetcher.parse_uniprot_entry(json_entries[0])
+    many = uniprot_fetcher.get_uniprot_data_many(["P33333", "P22222"])
+    assert list(many) == ["P33333", "P22222"] and many["P33333"]["sequence"] == json_entries[1]["sequence"]["value"]
+
+
+def test_telemetry_spans_counters_and_exports(tmp_path, monkeypatch):
+    import json
+    from src.api import cache, telemetry
+    from src.api.string_fetcher import get_interactions
+
+    monkeypatch.setattr(cache, "fetch_json", lambda url, params=None, timeout=None, limiter=None: [{"preferredName_B": "MAX"}])
+    monkeypatch.setattr(cache, "_default_cache", cache.ResponseCache(cache_dir=str(tmp_path / "cache")))
+    telemetry.reset()
+    assert telemetry.span("idle") is telemetry.span("other")  # shared no-op while disabled
+    get_interactions("MYC")
+    assert telemetry.snapshot() == {"timings": {}, "counters": []}
+
+    telemetry.enable()
+    try:
+        start = telemetry.mark()
+        with telemetry.span("report", uniprot_id="P01106"):
+            get_interactions("JUN")
+            get_interactions("JUN")
+    finally:
+        telemetry.disable()
+
+    spans = telemetry.spans_since(start)
+    assert [(s["name"], s["parent"]) for s in spans] == [
+        ("string_fetcher.get_interactions", "report"), ("string_fetcher.get_interactions", "report"), ("report", None)]
+    counters = {(c["metric"], c["labels"].get("source")): c["value"] for c in telemetry.snapshot()["counters"]}
+    assert counters == {("cache_misses", "string"): 1, ("cache_hits", "string"): 1}
+
+    text = telemetry.prometheus_text()
+    assert 'gene_weaving_span_calls_total{span="string_fetcher.get_interactions"} 2' in text
+    assert 'gene_weaving_cache_hits_total{source="string"} 1' in text
+    telemetry.export_jsonl(str(tmp_path / "trace.jsonl"), clear=True)
+    lines = [json.loads(line) for line in (tmp_path / "trace.jsonl").read_text().splitlines()]
+    assert [line["kind"] for line in lines].count("span") == 3 and telemetry.mark() == 0
+
+    # Two "sessions" on their own threads: one traces, the other and the process stay untraced
+    import threading
+    scopes = {}
+
+    def session(name, enabled):
+        scopes[name] = telemetry.trace_scope(enabled)
+        with telemetry.span(f"{name}.rerun"):
+            threading.Thread(target=lambda: telemetry.span("prefetch").__enter__()).start()
+
+    threads = [threading.Thread(target=session, args=("a", True)), threading.Thread(target=session, args=("b", False))]
+    for t in threads:
+        t.start()
+        t.join()
+    assert not telemetry.is_enabled()
+    assert [s["name"] for s in telemetry.spans_since(0, scope=scopes["a"])] == ["a.rerun"]
+    assert telemetry.spans_since(0, scope=scopes["b"]) == [] and len(telemetry.spans_since(0)) == 1
@@ -0,0 +1,29 @@
+import pytest
+
+from benchmarks import run
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = {"slow[1]": 0.100, "tiny[1]": 0.0005, "same[1]": 0.050}
+    results = {"slow[1]": 0.140, "tiny[1]": 0.0015, "same[1]": 0.060, "new[1]": 9.0}
+
+    # 40% slower; 3x but under the noise floor; 20% (within threshold); no baseline
+    assert run.compare(results, baseline, threshold=0.25) == [("slow[1]", 0.100, 0.140)]
+    assert [key for key, _, _ in run.compare(results, baseline, threshold=0.1)] == ["slow[1]", "same[1]"]
+    assert run.compare({"slow[1]": 0.1 + run.NOISE_FLOOR_S / 2}, {"slow[1]": 0.1}, threshold=0.0) == []
+
+
+def test_compare_needs_default_repeat_and_restores_bulk_store(monkeypatch):
+    from src.api import bulk_store
+
+    with pytest.raises(SystemExit):
+        run.main(["--compare", "--repeat", "1"])
+
+    def boom(**kwargs):
+        raise RuntimeError("benchmark failed")
+
+    monkeypatch.setattr(run, "run_suite", boom)
+    monkeypatch.setattr(bulk_store, "_default_bulk_store", None)
+    with pytest.raises(RuntimeError):
+        run.main(["-k", "nothing"])
+    assert bulk_store.get_bulk_store().path == bulk_store.BulkStore().path
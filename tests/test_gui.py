@@ -0,0 +1,100 @@
+import threading
+
+from src.gui.prefetch import Prefetcher
+
+
+def test_prefetcher_reuses_in_flight_work_and_stays_bounded():
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(x):
+        calls.append(x)
+        release.wait(5)
+        return x * 2
+
+    pf = Prefetcher(max_workers=2, max_entries=3)
+    pf.submit(("double", 21), slow_fetch, 21)
+    assert not pf.is_ready(("double", 21))
+    release.set()
+
+    # The GUI waits on the prefetch instead of running the fetch again
+    assert pf.get(("double", 21), slow_fetch, 21) == 42
+    assert calls == [21]
+
+    for i in range(10):
+        pf.store(("n", i), i)
+    assert pf.get(("n", 9), lambda: None) == 9
+    assert len(pf._futures) <= 3
+    pf.shutdown()
+
+
+def test_prefetcher_retries_failures_and_none_results():
+    import gc
+    import weakref
+
+    attempts = []
+
+    def flaky(x):
+        attempts.append(x)
+        if len(attempts) == 1:
+            raise ConnectionError("transient")
+        return None if len(attempts) == 2 else x
+
+    pf = Prefetcher(max_workers=1)
+    pf.submit(("entry", 1), flaky, 1).exception()
+    assert not pf.is_ready(("entry", 1))  # the failure is not cached
+    assert pf.get(("entry", 1), flaky, 1) is None  # recomputed, but None is not stored either
+    assert pf.get(("entry", 1), flaky, 1) == 1 and attempts == [1, 1, 1]
+    assert pf.get(("entry", 1), flaky, 1) == 1 and len(attempts) == 3
+
+    # Dropping the session's prefetcher stops its pool
+    pool = weakref.ref(pf._pool)
+    pf.submit(("entry", 2), lambda: 2).result()
+    del pf
+    gc.collect()
+    assert pool() is None or pool()._shutdown
+
+
+def test_architecture_png_is_cached_by_content():
+    from src.gui import render
+
+    domains = [{'label': 'InterPro: bZIP', 'start': 10, 'end': 60, 'type': 'InterPro'}]
+    first = render.architecture_png(200, domains, [{'start': 100, 'end': 180}])
+    assert first.startswith(b"\x89PNG")
+    assert render.architecture_png(200, [dict(d) for d in domains], [{'start': 100, 'end': 180}]) is first
+    assert render.architecture_png(201, domains, [{'start': 100, 'end': 180}]) is not first
+
+
+def test_disorder_track_downsampling_keeps_peaks_and_idr_edges():
+    import numpy as np
+    from src.gui.render import disorder_track, lttb_downsample
+
+    scores = np.full(35000, 0.2)
+    scores[12345] = 0.99  # a single-residue spike
+    idrs = [{'start': 20001, 'end': 20400}]
+    pos, vals = disorder_track(scores, 1, 35000, idrs, max_points=1000)
+
+    assert len(pos) < 1100
+    assert 12346 in pos and vals.max() == 0.99
+    assert {20000, 20001, 20400, 20401} <= set(pos.tolist())
+
+    # Zooming in returns every residue of a small window
+    pos, _ = disorder_track(scores, 100, 600, idrs, max_points=1000)
+    assert pos.tolist() == list(range(100, 601))
+
+    idx = lttb_downsample(np.sin(np.linspace(0, 20, 5000)), 300)
+    assert len(idx) == 300 and idx[0] == 0 and idx[-1] == 4999
+
+
+def test_cold_imports_leave_heavy_dependencies_unloaded():
+    import os
+    import subprocess
+    import sys
+    from benchmarks.suite import HEAVY_MODULES, SRC_DIR, module_imports
+
+    modules = [m for m in module_imports(os.path.join(SRC_DIR, "gui", "app.py"))
+               if m.split(".")[0] in ("api", "analysis", "gui")] + ["core_logic"]
+    code = (f"import sys; sys.path.insert(0, {SRC_DIR!r})\n" + "".join(f"import {m}\n" for m in modules)
+            + f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == ""